@@ -0,0 +1,27 @@
+"""add keyset pagination indexes
+
+Revision ID: 3c1f6a2d9e70
+Revises: b96cd1f49448
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f6a2d9e70'
+down_revision: Union[str, None] = 'b96cd1f49448'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_behaviors_user_created_at', 'behaviors', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_optimization_runs_user_created_at', 'optimization_runs', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_optimization_runs_user_created_at', table_name='optimization_runs')
+    op.drop_index('idx_behaviors_user_created_at', table_name='behaviors')
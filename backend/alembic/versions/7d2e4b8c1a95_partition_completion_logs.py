@@ -0,0 +1,132 @@
+"""partition completion_logs by month and add completion rollups
+
+Revision ID: 7d2e4b8c1a95
+Revises: 3c1f6a2d9e70
+Create Date: 2026-10-19 12:00:00.000000
+
+On PostgreSQL ``completion_logs`` becomes a table range partitioned by month
+on ``completed_at``. Partitions are created for every month that has data
+plus a few months ahead (``ensure_completion_log_partitions`` keeps adding
+them), and a default partition catches anything outside those ranges.
+Partitioned tables need the partition key in the primary key, so it becomes
+``(id, completed_at)``. Other databases keep a plain table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b8c1a95'
+down_revision: Union[str, None] = '3c1f6a2d9e70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+INDEXES = {
+    'idx_completion_logs_user_id': 'user_id',
+    'idx_completion_logs_behavior_id': 'behavior_id',
+    'idx_completion_logs_completed_at': 'completed_at',
+    'idx_completion_logs_optimization_run_id': 'optimization_run_id',
+    'idx_completion_logs_user_completed_at': 'user_id, completed_at',
+}
+
+COLUMNS = """
+    id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    behavior_id UUID NOT NULL REFERENCES behaviors (id) ON DELETE CASCADE,
+    optimization_run_id UUID REFERENCES optimization_runs (id) ON DELETE SET NULL,
+    actual_duration INTEGER NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    satisfaction_score INTEGER,
+    notes TEXT,
+    context JSON,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+"""
+
+
+COLUMN_NAMES = (
+    "id, user_id, behavior_id, optimization_run_id, actual_duration, "
+    "completed_at, satisfaction_score, notes, context, created_at"
+)
+
+
+def _swap_out_old_table() -> None:
+    op.execute("ALTER TABLE completion_logs RENAME TO completion_logs_old")
+    # The primary key's index name would clash with the new table's
+    op.execute("ALTER TABLE completion_logs_old RENAME CONSTRAINT completion_logs_pkey TO completion_logs_old_pkey")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_old")
+
+
+def _create_indexes() -> None:
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON completion_logs ({columns})")
+
+
+def upgrade() -> None:
+    op.create_table('completion_rollups',
+    sa.Column('behavior_id', sa.Uuid(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('completions', sa.Integer(), nullable=False),
+    sa.Column('total_duration', sa.Integer(), nullable=False),
+    sa.Column('satisfaction_total', sa.Integer(), nullable=False),
+    sa.Column('satisfaction_count', sa.Integer(), nullable=False),
+    sa.Column('last_completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['behavior_id'], ['behaviors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('behavior_id', 'month')
+    )
+    op.create_index('idx_completion_rollups_user_id', 'completion_rollups', ['user_id'], unique=False)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('idx_completion_logs_user_completed_at', 'completion_logs', ['user_id', 'completed_at'], unique=False)
+        return
+
+    _swap_out_old_table()
+    op.execute(f"""
+        CREATE TABLE completion_logs ({COLUMNS},
+            PRIMARY KEY (id, completed_at)
+        ) PARTITION BY RANGE (completed_at)
+    """)
+    op.execute("CREATE TABLE completion_logs_default PARTITION OF completion_logs DEFAULT")
+    # One partition per month from the oldest log (or now) to MONTHS_AHEAD ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start DATE := date_trunc('month', COALESCE(
+                (SELECT min(completed_at) FROM completion_logs_old), now()
+            ) AT TIME ZONE 'UTC')::date;
+            last_month DATE := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF completion_logs FOR VALUES FROM (%L) TO (%L)',
+                    'completion_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    month_start::timestamp AT TIME ZONE 'UTC',
+                    (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"INSERT INTO completion_logs ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM completion_logs_old")
+    op.execute("DROP TABLE completion_logs_old")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _swap_out_old_table()
+        op.execute(f"CREATE TABLE completion_logs ({COLUMNS}, PRIMARY KEY (id))")
+        op.execute(f"INSERT INTO completion_logs ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM completion_logs_old")
+        # Drops every partition with it
+        op.execute("DROP TABLE completion_logs_old")
+        _create_indexes()
+    op.drop_index('idx_completion_logs_user_completed_at', table_name='completion_logs')
+
+    op.drop_index('idx_completion_rollups_user_id', table_name='completion_rollups')
+    op.drop_table('completion_rollups')
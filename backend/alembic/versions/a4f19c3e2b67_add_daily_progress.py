@@ -0,0 +1,60 @@
+"""add daily progress totals
+
+Revision ID: a4f19c3e2b67
+Revises: 7d2e4b8c1a95
+Create Date: 2026-10-19 18:00:00.000000
+
+``daily_progress`` holds per-user daily completion totals, kept up to date
+as completions are logged. It is backfilled here from the completion logs
+still in ``completion_logs`` (archived months only exist as monthly
+rollups and are not spread back over days).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f19c3e2b67'
+down_revision: Union[str, None] = '7d2e4b8c1a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OBJECTIVE_TYPES = (
+    'health', 'productivity', 'learning', 'wellness',
+    'social', 'financial', 'creativity', 'mindfulness',
+)
+
+
+def upgrade() -> None:
+    op.create_table('daily_progress',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('completions', sa.Integer(), nullable=False),
+    sa.Column('total_duration', sa.Integer(), nullable=False),
+    sa.Column('energy_spent', sa.Float(), nullable=False),
+    *(sa.Column(f'impact_on_{obj_type}', sa.Float(), nullable=False) for obj_type in OBJECTIVE_TYPES),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        day = "(cl.completed_at AT TIME ZONE 'UTC')::date"
+    else:
+        day = "date(cl.completed_at)"
+    impact_columns = ", ".join(f"impact_on_{obj_type}" for obj_type in OBJECTIVE_TYPES)
+    impact_sums = ", ".join(
+        f"SUM(COALESCE(b.impact_on_{obj_type}, 0) * cl.actual_duration)" for obj_type in OBJECTIVE_TYPES
+    )
+    op.execute(f"""
+        INSERT INTO daily_progress (user_id, day, completions, total_duration, energy_spent, {impact_columns})
+        SELECT cl.user_id, {day}, COUNT(*), SUM(cl.actual_duration), SUM(COALESCE(b.energy_cost, 0)), {impact_sums}
+        FROM completion_logs cl
+        JOIN behaviors b ON b.id = cl.behavior_id
+        GROUP BY cl.user_id, {day}
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_progress')
@@ -0,0 +1,37 @@
+"""Analytics module."""
+from .engine import (
+    CompletionHistory,
+    ObjectiveSummary,
+    ProgressTotals,
+    adherence,
+    load_completion_history,
+    summarize_objectives,
+    trend_label,
+    trend_slopes,
+)
+from .periods import AnalyticsWindow, bucket_expression
+from .progress import (
+    load_progress_totals,
+    rebuild_daily_progress,
+    record_completions,
+    refresh_behavior_progress,
+    remove_completions,
+)
+
+__all__ = [
+    "AnalyticsWindow",
+    "CompletionHistory",
+    "ObjectiveSummary",
+    "ProgressTotals",
+    "adherence",
+    "bucket_expression",
+    "load_completion_history",
+    "load_progress_totals",
+    "rebuild_daily_progress",
+    "record_completions",
+    "refresh_behavior_progress",
+    "remove_completions",
+    "summarize_objectives",
+    "trend_label",
+    "trend_slopes",
+]
@@ -0,0 +1,272 @@
+"""Vectorized analytics over a user's completion history.
+
+``load_completion_history`` fetches the completions of a date window in one
+narrow query (plus the user's behaviors with their energy cost and impacts)
+and keeps them column-wise as NumPy arrays. Every aggregate is then a
+``bincount`` or a matrix product over those arrays rather than a query or a
+Python loop per day, behavior or objective. The daily_progress rollup
+``/analytics`` reads is computed this way (see ``progress``).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Behavior, CompletionLog
+from app.optimization.impacts import IMPACT_COLUMNS, OBJECTIVE_INDEX, OBJECTIVE_TYPES, ImpactMatrix
+
+# Trends are fitted over the trailing TREND_WINDOW_DAYS of the window, so long
+# periods still report the recent direction
+TREND_WINDOW_DAYS = 28
+
+# Relative change over the trend window (fitted slope x days / mean) that counts as a trend
+TREND_THRESHOLD = 0.1
+
+
+def utc_ordinal(completed_at: datetime) -> int:
+    """Ordinal of the UTC day of a timestamp (naive timestamps are taken as UTC)."""
+    if completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(timezone.utc)
+    return completed_at.toordinal()
+
+
+@dataclass
+class CompletionHistory:
+    """Completions of a date window, one array per column.
+
+    ``day`` is the UTC day's offset from ``start`` and ``behavior_index`` indexes
+    ``behavior_ids`` (and so ``energy_cost`` and the rows of ``impacts``).
+    """
+
+    start: date
+    days: int
+    day: np.ndarray
+    behavior_index: np.ndarray
+    duration: np.ndarray
+    satisfaction: np.ndarray
+    behavior_ids: List[UUID]
+    energy_cost: np.ndarray
+    impacts: ImpactMatrix
+
+    @classmethod
+    def from_rows(
+        cls,
+        start: date,
+        days: int,
+        completions: Sequence[Sequence],
+        behaviors: Sequence[Sequence],
+    ) -> "CompletionHistory":
+        """Build from ``(completed_at, behavior_id, actual_duration, satisfaction_score)``
+        and ``(id, energy_cost, impact_on_health, ..., impact_on_mindfulness)`` rows.
+
+        Completions outside the window or of unknown behaviors are dropped.
+        """
+        behavior_ids = [row[0] for row in behaviors]
+        impacts = ImpactMatrix.from_rows([(row[0], *row[2:]) for row in behaviors])
+        energy_cost = np.array([row[1] or 0.0 for row in behaviors], dtype=np.float64)
+
+        count = len(completions)
+        if count:
+            completed_at, behavior_id, duration, satisfaction = zip(*completions)
+        else:
+            completed_at = behavior_id = duration = satisfaction = ()
+        index_of = impacts.index
+        origin = start.toordinal()
+        day = np.fromiter((utc_ordinal(c) - origin for c in completed_at), dtype=np.int32, count=count)
+        behavior_index = np.fromiter((index_of.get(b, -1) for b in behavior_id), dtype=np.int32, count=count)
+        duration = np.fromiter(duration, dtype=np.float64, count=count)
+        satisfaction = np.fromiter(
+            (np.nan if s is None else s for s in satisfaction), dtype=np.float64, count=count
+        )
+
+        keep = (day >= 0) & (day < days) & (behavior_index >= 0)
+        return cls(
+            start=start,
+            days=days,
+            day=day[keep],
+            behavior_index=behavior_index[keep],
+            duration=duration[keep],
+            satisfaction=satisfaction[keep],
+            behavior_ids=behavior_ids,
+            energy_cost=energy_cost,
+            impacts=impacts,
+        )
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @property
+    def dates(self) -> List[date]:
+        """Dates of the window, in order."""
+        return [self.start + timedelta(days=i) for i in range(self.days)]
+
+    def daily_completions(self) -> np.ndarray:
+        """Completions per day."""
+        return np.bincount(self.day, minlength=self.days)
+
+    def daily_minutes(self) -> np.ndarray:
+        """Minutes spent per day."""
+        return np.bincount(self.day, weights=self.duration, minlength=self.days)
+
+    def daily_energy(self) -> np.ndarray:
+        """Energy spent per day (energy cost of each completed behavior)."""
+        return np.bincount(self.day, weights=self.energy_cost[self.behavior_index], minlength=self.days)
+
+    def daily_behavior_minutes(self) -> np.ndarray:
+        """``(days, behaviors)`` matrix of minutes per behavior per day."""
+        behaviors = len(self.behavior_ids)
+        flat = np.bincount(
+            self.day.astype(np.int64) * behaviors + self.behavior_index,
+            weights=self.duration,
+            minlength=self.days * behaviors,
+        )
+        return flat.reshape(self.days, behaviors)
+
+    def daily_objective_impact(self) -> np.ndarray:
+        """``(days, objective types)`` impact x actual duration per day."""
+        return self.daily_behavior_minutes() @ self.impacts.values
+
+    def average_satisfaction(self) -> Optional[float]:
+        """Mean satisfaction score of rated completions."""
+        rated = self.satisfaction[~np.isnan(self.satisfaction)]
+        return float(rated.mean()) if rated.size else None
+
+
+@dataclass
+class ProgressTotals:
+    """Completion totals per bucket (day, week or month), one array per column.
+
+    ``dates`` are the first day of each bucket and ``impact`` is a
+    ``(buckets, objective types)`` matrix of impact x minutes.
+    """
+
+    dates: List[date]
+    completions: np.ndarray
+    minutes: np.ndarray
+    energy: np.ndarray
+    impact: np.ndarray
+
+    @classmethod
+    def from_rows(cls, dates: Sequence[date], rows: Sequence[Sequence]) -> "ProgressTotals":
+        """Build from ``(bucket, completions, total_duration, energy_spent, impact_on_health, ...)`` rows.
+
+        Buckets without a row are zero; rows of other buckets are dropped.
+        """
+        index = {day: i for i, day in enumerate(dates)}
+        values = np.zeros((len(dates), 3 + len(OBJECTIVE_TYPES)), dtype=np.float64)
+        for bucket, *totals in rows:
+            i = index.get(bucket)
+            if i is not None:
+                values[i] = totals
+        return cls(
+            dates=list(dates),
+            completions=values[:, 0].astype(np.int64),
+            minutes=values[:, 1],
+            energy=values[:, 2],
+            impact=values[:, 3:],
+        )
+
+
+def trend_slopes(series: np.ndarray) -> np.ndarray:
+    """Least-squares slope per row (day or bucket) of each column of a ``(rows, k)`` series."""
+    days = series.shape[0]
+    if days < 2:
+        return np.zeros(series.shape[1:])
+    x = np.arange(days, dtype=np.float64)
+    x -= x.mean()
+    centered = series - series.mean(axis=0)
+    return (x @ centered) / (x @ x)
+
+
+def trend_label(slope: float, mean: float, days: int) -> str:
+    """Classify a fitted slope as up / down / stable relative to the series mean."""
+    scale = abs(mean)
+    if days < 2 or scale < 1e-9:
+        return "stable"
+    change = slope * (days - 1) / scale
+    if change > TREND_THRESHOLD:
+        return "up"
+    if change < -TREND_THRESHOLD:
+        return "down"
+    return "stable"
+
+
+@dataclass
+class ObjectiveSummary:
+    """Progress of one objective type over the window."""
+
+    objective_type: str
+    impact: float  # impact x minutes summed over the window
+    progress: float  # share of the window's positive impact, in percent
+    slope: float
+    trend: str
+
+
+def summarize_objectives(
+    series: np.ndarray,
+    objective_types: Iterable[str],
+    trend_series: Optional[np.ndarray] = None,
+) -> List[ObjectiveSummary]:
+    """Impact, share and trend of each requested objective type.
+
+    ``series`` is a ``(days or buckets, objective types)`` matrix of impact x
+    minutes, as in ``ProgressTotals.impact`` or
+    ``CompletionHistory.daily_objective_impact()``. Trends are fitted over
+    ``trend_series``, by default the trailing TREND_WINDOW_DAYS rows.
+    """
+    totals = series.sum(axis=0)
+    positive_total = np.clip(totals, 0, None).sum()
+    recent = series[-TREND_WINDOW_DAYS:] if trend_series is None else trend_series
+    slopes = trend_slopes(recent)
+    means = recent.mean(axis=0) if len(recent) else np.zeros(len(OBJECTIVE_TYPES))
+
+    summaries = []
+    for obj_type in objective_types:
+        column = OBJECTIVE_INDEX.get(obj_type)
+        if column is None:
+            continue
+        impact = float(totals[column])
+        summaries.append(ObjectiveSummary(
+            objective_type=obj_type,
+            impact=impact,
+            progress=100 * max(impact, 0.0) / positive_total if positive_total > 0 else 0.0,
+            slope=float(slopes[column]),
+            trend=trend_label(float(slopes[column]), float(means[column]), len(recent)),
+        ))
+    return summaries
+
+
+def adherence(completed: np.ndarray, scheduled: np.ndarray) -> Optional[float]:
+    """Share of scheduled behaviors completed, counting at most the schedule per day."""
+    total = scheduled.sum()
+    if total <= 0:
+        return None
+    return float(np.minimum(completed, scheduled).sum() / total)
+
+
+async def load_completion_history(db: AsyncSession, user_id, start: date, days: int) -> CompletionHistory:
+    """Fetch a user's completions of ``[start, start + days)`` column-wise."""
+    behaviors = await db.execute(
+        select(Behavior.id, Behavior.energy_cost, *(getattr(Behavior, column) for column in IMPACT_COLUMNS))
+        .where(Behavior.user_id == user_id)
+    )
+    window_start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    completions = await db.execute(
+        select(
+            CompletionLog.completed_at,
+            CompletionLog.behavior_id,
+            CompletionLog.actual_duration,
+            CompletionLog.satisfaction_score,
+        )
+        .where(
+            CompletionLog.user_id == user_id,
+            CompletionLog.completed_at >= window_start,
+            CompletionLog.completed_at < window_start + timedelta(days=days),
+        )
+    )
+    return CompletionHistory.from_rows(start, days, completions.all(), behaviors.all())
+
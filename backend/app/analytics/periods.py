@@ -0,0 +1,149 @@
+"""Analytics periods and the time buckets they are reported in.
+
+A period such as ``14d``, ``6w``, ``3m`` or ``1y`` ends today. Its length
+picks the bucket size (day, week or month) so a response never has more
+than about a hundred points. Totals are grouped into buckets in SQL
+(``date_trunc`` on PostgreSQL, ``date()`` modifiers on SQLite) over the
+daily_progress rollup, so the rows read are bounded too.
+"""
+import re
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import Date, cast, func, literal_column, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.partitions import add_months, month_start
+
+from .engine import TREND_WINDOW_DAYS
+
+DEFAULT_PERIOD_DAYS = 7
+
+# Longest period served; at month buckets that is 121 points
+MAX_PERIOD_DAYS = 3660
+
+# Longest period reported per day / per week; anything longer is per month
+DAY_BUCKET_MAX_DAYS = 62
+WEEK_BUCKET_MAX_DAYS = 371
+
+# Trailing complete buckets trends are fitted over
+TREND_BUCKETS = {"day": TREND_WINDOW_DAYS, "week": 13, "month": 12}
+
+PERIOD_PATTERN = re.compile(r"^\s*(\d+)\s*([dwmy])\s*$", re.IGNORECASE)
+
+
+def period_start(period: str, today: date) -> date:
+    """First day of a period ending today; unparseable periods are the last week."""
+    match = PERIOD_PATTERN.match(period or "")
+    count = int(match.group(1)) if match else 0
+    if count < 1:
+        return today - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+
+    unit = match.group(2).lower()
+    if unit in ("d", "w"):
+        days = count * 7 if unit == "w" else count
+        start = today - timedelta(days=min(days, MAX_PERIOD_DAYS) - 1)
+    else:
+        months = count * 12 if unit == "y" else count
+        if months > MAX_PERIOD_DAYS // 28:
+            return today - timedelta(days=MAX_PERIOD_DAYS - 1)
+        shifted = add_months(month_start(today), -months)
+        # Same day of the month, clamped to the end of shorter months
+        day = min(today.day, monthrange(shifted.year, shifted.month)[1])
+        start = shifted.replace(day=day) + timedelta(days=1)
+    return max(start, today - timedelta(days=MAX_PERIOD_DAYS - 1))
+
+
+def choose_bucket(days: int) -> str:
+    """Bucket size for a period of ``days`` days."""
+    if days <= DAY_BUCKET_MAX_DAYS:
+        return "day"
+    if days <= WEEK_BUCKET_MAX_DAYS:
+        return "week"
+    return "month"
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the bucket containing ``day`` (weeks start on Monday)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return month_start(day)
+    return day
+
+
+def next_bucket(start: date, bucket: str) -> date:
+    """First day of the bucket after the one starting on ``start``."""
+    if bucket == "week":
+        return start + timedelta(weeks=1)
+    if bucket == "month":
+        return add_months(start, 1)
+    return start + timedelta(days=1)
+
+
+def bucket_expression(column, bucket: str, dialect: str) -> ColumnElement:
+    """SQL expression for the first day of the bucket containing a date column."""
+    if bucket == "day":
+        return column
+    # Literals rather than bound parameters, so the expression in SELECT and
+    # GROUP BY compiles to the same SQL
+    if dialect == "postgresql":
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), column), Date)
+    if bucket == "week":
+        # Forward to Sunday (or stay on it), then back to that week's Monday
+        return type_coerce(func.date(column, literal_column("'weekday 0'"), literal_column("'-6 days'")), Date)
+    return type_coerce(func.date(column, literal_column("'start of month'")), Date)
+
+
+@dataclass
+class AnalyticsWindow:
+    """Date range of an analytics request and the buckets it is reported in.
+
+    ``start`` is aligned to the start of its bucket, so every bucket but the
+    last (which holds today) is complete.
+    """
+
+    start: date
+    end: date  # inclusive
+    bucket: str
+
+    @classmethod
+    def from_period(cls, period: str, today: Optional[date] = None) -> "AnalyticsWindow":
+        """Window of a period ending today, bucketed by its length."""
+        today = today or date.today()
+        start = period_start(period, today)
+        bucket = choose_bucket((today - start).days + 1)
+        return cls(start=bucket_start(start, bucket), end=today, bucket=bucket)
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    @property
+    def bucket_dates(self) -> List[date]:
+        """First day of every bucket, in order."""
+        dates = []
+        current = self.start
+        while current <= self.end:
+            dates.append(current)
+            current = next_bucket(current, self.bucket)
+        return dates
+
+    def bucket_days(self) -> np.ndarray:
+        """Days of each bucket that fall in the window."""
+        starts = self.bucket_dates
+        ends = starts[1:] + [self.end + timedelta(days=1)]
+        return np.array([(e - s).days for s, e in zip(starts, ends)], dtype=np.int64)
+
+    def trend_series(self, series: np.ndarray) -> np.ndarray:
+        """Trailing rows of a per-bucket series to fit trends over.
+
+        The in-progress bucket is left out when buckets are weeks or months,
+        where a partial last point would read as a drop.
+        """
+        if self.bucket != "day":
+            series = series[:-1]
+        return series[-TREND_BUCKETS[self.bucket]:]
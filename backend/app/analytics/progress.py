@@ -0,0 +1,228 @@
+"""Daily progress totals maintained incrementally from completion logs.
+
+Every write to completion_logs calls ``record_completions`` (or
+``remove_completions``) in the same transaction. Added logs are bucketed by
+UTC day and added to ``daily_progress`` with one upsert, so /analytics reads
+(and buckets, see ``periods``) at most one row per day of its window instead
+of scanning completion_logs. Removals, and edits to a behavior's energy or
+impacts, recompute the affected days from the logs, so totals always use the
+behaviors' current values. Months archived out of completion_logs keep the
+totals they had: their logs are gone. Per-day totals are computed with the
+engine's ``CompletionHistory``.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import add_months
+from app.models import Behavior, CompletionLog, CompletionRollup, DailyProgress
+from app.optimization.impacts import IMPACT_COLUMNS
+
+from .engine import CompletionHistory, ProgressTotals, load_completion_history, utc_ordinal
+from .periods import AnalyticsWindow, bucket_expression
+
+# Stored columns, in the column order of the totals arrays
+TOTAL_COLUMNS: Tuple[str, ...] = ("completions", "total_duration", "energy_spent", *IMPACT_COLUMNS)
+
+# Rows per upsert statement, well under the drivers' bound parameter limits
+UPSERT_BATCH_SIZE = 1000
+
+
+def history_totals(history: CompletionHistory) -> Tuple[List[date], np.ndarray]:
+    """Days of a history that have completions and their ``(days, TOTAL_COLUMNS)`` totals."""
+    completions = history.daily_completions()
+    active = np.flatnonzero(completions)
+    totals = np.column_stack([
+        completions,
+        history.daily_minutes(),
+        history.daily_energy(),
+        history.daily_objective_impact(),
+    ])
+    return [history.start + timedelta(days=int(i)) for i in active], totals[active]
+
+
+def totals_by_day(completions: Sequence, behaviors: Sequence[Sequence]) -> Tuple[List[date], np.ndarray]:
+    """Sum completions per UTC day.
+
+    ``completions`` have ``completed_at``, ``behavior_id`` and
+    ``actual_duration`` attributes (models or rows); ``behaviors`` are
+    ``(id, energy_cost, impact_on_health, ..., impact_on_mindfulness)`` rows.
+    Returns the distinct days and a ``(days, TOTAL_COLUMNS)`` matrix.
+    Completions of unknown behaviors are ignored.
+    """
+    if not completions:
+        return [], np.zeros((0, len(TOTAL_COLUMNS)))
+    ordinals = [utc_ordinal(c.completed_at) for c in completions]
+    history = CompletionHistory.from_rows(
+        date.fromordinal(min(ordinals)),
+        max(ordinals) - min(ordinals) + 1,
+        [(c.completed_at, c.behavior_id, c.actual_duration, None) for c in completions],
+        behaviors,
+    )
+    return history_totals(history)
+
+
+async def _add_daily_totals(db: AsyncSession, user_id, days: List[date], totals: np.ndarray) -> None:
+    """Add per-day totals to daily_progress, summing into existing rows."""
+    rows = []
+    for day, values in zip(days, totals.tolist()):
+        row = dict(zip(TOTAL_COLUMNS, values), user_id=user_id, day=day)
+        row["completions"] = int(row["completions"])
+        row["total_duration"] = int(round(row["total_duration"]))
+        rows.append(row)
+
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    columns = DailyProgress.__table__.c
+    for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+        statement = insert(DailyProgress).values(rows[offset:offset + UPSERT_BATCH_SIZE])
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[columns.user_id, columns.day],
+            set_={name: columns[name] + statement.excluded[name] for name in TOTAL_COLUMNS},
+        ))
+
+
+async def _add_completions(db: AsyncSession, user_id, completions: Sequence, sign: int = 1) -> List[date]:
+    """Add (or with ``sign=-1`` subtract) completions at their behaviors' current values."""
+    behaviors = await db.execute(
+        select(Behavior.id, Behavior.energy_cost, *(getattr(Behavior, column) for column in IMPACT_COLUMNS))
+        .where(Behavior.id.in_({c.behavior_id for c in completions}))
+    )
+    days, totals = totals_by_day(completions, behaviors.all())
+    await _add_daily_totals(db, user_id, days, sign * totals)
+    return days
+
+
+async def archived_until(db: AsyncSession) -> Optional[date]:
+    """First day after the last month archived out of completion_logs, if any.
+
+    Totals of earlier days can no longer be recomputed from the logs.
+    """
+    last = (await db.execute(select(func.max(CompletionRollup.month)))).scalar()
+    return add_months(last, 1) if last is not None else None
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def _recompute_days(db: AsyncSession, user_id, days: Set[date], excluded: Set = frozenset()) -> int:
+    """Replace the user's totals of some days with totals of their logs, skipping ``excluded`` ids."""
+    if not days:
+        return 0
+    await db.execute(
+        delete(DailyProgress).where(DailyProgress.user_id == user_id, DailyProgress.day.in_(sorted(days)))
+    )
+    logs = await db.execute(
+        select(CompletionLog.id, CompletionLog.completed_at, CompletionLog.behavior_id, CompletionLog.actual_duration)
+        .where(
+            CompletionLog.user_id == user_id,
+            CompletionLog.completed_at >= _day_start(min(days)),
+            CompletionLog.completed_at < _day_start(max(days) + timedelta(days=1)),
+        )
+    )
+    ordinals = {day.toordinal() for day in days}
+    completions = [
+        log for log in logs.all() if log.id not in excluded and utc_ordinal(log.completed_at) in ordinals
+    ]
+    if not completions:
+        return 0
+    return len(await _add_completions(db, user_id, completions))
+
+
+async def record_completions(db: AsyncSession, user_id, completions: Iterable) -> None:
+    """Add newly logged completions to the user's daily totals.
+
+    Call in the transaction that writes the logs; the caller commits.
+    """
+    completions = list(completions)
+    if completions:
+        await _add_completions(db, user_id, completions)
+
+
+async def remove_completions(db: AsyncSession, user_id, completions: Iterable) -> None:
+    """Take completions out of the user's daily totals.
+
+    Call in the transaction that deletes the logs, before deleting them; the
+    caller commits. The days they fall on are recomputed from the remaining
+    logs, so they follow the behaviors' current energy and impacts. Days in
+    archived months only have the removed completions subtracted.
+    """
+    completions = list(completions)
+    if not completions:
+        return
+    since = await archived_until(db)
+    cutoff = since.toordinal() if since is not None else 0
+    archived = [c for c in completions if utc_ordinal(c.completed_at) < cutoff]
+    if archived:
+        days = await _add_completions(db, user_id, archived, sign=-1)
+        # Days with nothing left would otherwise keep rounding residue
+        await db.execute(
+            delete(DailyProgress).where(
+                DailyProgress.user_id == user_id,
+                DailyProgress.day.in_(days),
+                DailyProgress.completions <= 0,
+            )
+        )
+    ordinals = {utc_ordinal(c.completed_at) for c in completions}
+    live = {date.fromordinal(ordinal) for ordinal in ordinals if ordinal >= cutoff}
+    await _recompute_days(db, user_id, live, excluded={c.id for c in completions})
+
+
+async def refresh_behavior_progress(db: AsyncSession, user_id, behavior_id) -> int:
+    """Recompute the days a behavior was completed on after its energy or impacts change.
+
+    Days in archived months keep the values they were recorded with. Returns
+    the number of days written; the caller commits.
+    """
+    since = await archived_until(db)
+    query = select(CompletionLog.completed_at).where(CompletionLog.behavior_id == behavior_id)
+    if since is not None:
+        query = query.where(CompletionLog.completed_at >= _day_start(since))
+    days = {date.fromordinal(utc_ordinal(completed_at)) for completed_at in (await db.execute(query)).scalars()}
+    return await _recompute_days(db, user_id, days)
+
+
+async def rebuild_daily_progress(db: AsyncSession, user_id) -> int:
+    """Recompute a user's daily totals from their completion logs.
+
+    Days in months already archived out of completion_logs are kept as they
+    are: their logs only remain in the archive files. Returns the number of
+    days written; the caller commits.
+    """
+    since = await archived_until(db)
+    stale = delete(DailyProgress).where(DailyProgress.user_id == user_id)
+    span = select(func.min(CompletionLog.completed_at), func.max(CompletionLog.completed_at)).where(
+        CompletionLog.user_id == user_id
+    )
+    if since is not None:
+        stale = stale.where(DailyProgress.day >= since)
+        span = span.where(CompletionLog.completed_at >= _day_start(since))
+    await db.execute(stale)
+    first, last = (await db.execute(span)).one()
+    if first is None:
+        return 0
+
+    start = date.fromordinal(utc_ordinal(first))
+    history = await load_completion_history(db, user_id, start, utc_ordinal(last) - start.toordinal() + 1)
+    days, totals = history_totals(history)
+    await _add_daily_totals(db, user_id, days, totals)
+    return len(days)
+
+
+async def load_progress_totals(db: AsyncSession, user_id, window: AnalyticsWindow) -> ProgressTotals:
+    """Read the user's totals of a window, summed per bucket in SQL."""
+    bucket = bucket_expression(DailyProgress.day, window.bucket, db.bind.dialect.name).label("bucket")
+    result = await db.execute(
+        select(bucket, *(func.sum(getattr(DailyProgress, column)) for column in TOTAL_COLUMNS))
+        .where(
+            DailyProgress.user_id == user_id,
+            DailyProgress.day >= window.start,
+            DailyProgress.day <= window.end,
+        )
+        .group_by(bucket)
+    )
+    return ProgressTotals.from_rows(window.bucket_dates, result.all())
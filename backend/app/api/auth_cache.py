@@ -0,0 +1,235 @@
+"""Caches for decoded access tokens and authenticated user principals."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core import settings, verify_token
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+# Columns snapshotted into the principal cache (password hash deliberately excluded)
+PRINCIPAL_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "status",
+    "created_at",
+    "updated_at",
+    "last_login",
+)
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_size: int):
+        """Initialize cache."""
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry, dropping it if expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store an entry, evicting the least recently used ones past max_size."""
+        self._data[key] = (time.monotonic() + ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TokenCache:
+    """Memoizes JWT verification for the remaining lifetime of each token."""
+
+    def __init__(self, max_size: int):
+        """Initialize cache."""
+        self._cache = TTLCache(max_size)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Return the verified payload, only checking the signature on a miss."""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        payload = self._cache.get(key)
+        if payload is not None:
+            return payload
+
+        payload = verify_token(token)
+        remaining = payload.get("exp", 0) - time.time()
+        if remaining > 0:
+            self._cache.set(key, payload, remaining)
+        return payload
+
+    def clear(self) -> None:
+        """Forget all memoized tokens."""
+        self._cache.clear()
+
+
+class UserPrincipalCache:
+    """Short-TTL cache of user rows keyed by user id.
+
+    Entries live in process memory, or only in Redis when ``REDIS_URL`` is
+    configured: a per-process copy could not be evicted from other workers,
+    so a suspended user would keep access there until it expired. Redis
+    errors fall back to the database lookup instead of failing requests.
+    """
+
+    key_prefix = "user_principal:"
+
+    def __init__(self, ttl_seconds: int, max_size: int, redis_url: Optional[str] = None):
+        """Initialize cache."""
+        self.ttl_seconds = ttl_seconds
+        self._local = TTLCache(max_size)
+        self._redis = None
+        self._pending: Set[asyncio.Task] = set()
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+
+                self._redis = redis.from_url(str(redis_url))
+            except ImportError:
+                logger.warning("redis package not installed; user cache is process-local")
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    async def get(self, user_id: UUID) -> Optional[User]:
+        """Get a cached user principal."""
+        if self.ttl_seconds <= 0:
+            return None
+
+        key = self._key(user_id)
+        if self._redis is None:
+            data = self._local.get(key)
+        else:
+            try:
+                raw = await self._redis.get(key)
+            except Exception as e:
+                logger.warning(f"User cache read failed: {str(e)}")
+                raw = None
+            data = _deserialize(raw) if raw else None
+
+        return User(**data) if data else None
+
+    async def set(self, user: User) -> None:
+        """Cache a user principal loaded from the database."""
+        if self.ttl_seconds <= 0:
+            return
+
+        key = self._key(user.id)
+        data = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+        if self._redis is None:
+            self._local.set(key, data, self.ttl_seconds)
+            return
+        try:
+            await self._redis.set(key, _serialize(data), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"User cache write failed: {str(e)}")
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user from the cache (in Redis when shared)."""
+        key = self._key(user_id)
+        self._local.delete(key)
+        if self._redis is not None:
+            try:
+                task = asyncio.get_running_loop().create_task(self._delete_shared(key))
+            except RuntimeError:
+                # No running loop (e.g. sync scripts); Redis entry expires via TTL
+                return
+            # The loop only keeps weak references to tasks
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _delete_shared(self, key: str) -> None:
+        try:
+            await self._redis.delete(key)
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Forget all process-local entries."""
+        self._local.clear()
+
+
+def _serialize(data: Dict[str, Any]) -> str:
+    return json.dumps({
+        k: v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v
+        for k, v in data.items()
+    })
+
+
+def _deserialize(raw) -> Dict[str, Any]:
+    data = json.loads(raw)
+    data["id"] = UUID(data["id"])
+    for field in ("created_at", "updated_at", "last_login"):
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+user_cache = UserPrincipalCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+)
+
+
+PENDING_INVALIDATIONS = "invalidated_user_ids"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_invalidation(mapper, connection, target: User) -> None:
+    """Note changed users on their session, to evict once the change commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Evict cached principals of users changed by a committed transaction.
+
+    Evicting at flush time would let a concurrent request re-cache the
+    uncommitted (old) row right away.
+    """
+    for user_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_invalidations(session: Session, previous_transaction) -> None:
+    """Nothing changed if the transaction rolled back."""
+    if not session.in_transaction():
+        session.info.pop(PENDING_INVALIDATIONS, None)
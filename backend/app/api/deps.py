@@ -1,6 +1,6 @@
 """Dependency injection utilities."""
 import logging
-from typing import Annotated, Optional
+from typing import Annotated, AsyncGenerator, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
@@ -8,8 +8,9 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core import verify_token, AuthenticationError, settings
-from app.db.database import get_db as get_db_session
+from app.core import AuthenticationError, settings
+from app.api.auth_cache import token_cache, user_cache
+from app.db.database import get_analytics_db, get_db as get_db_session, replica_router
 from app.models import User
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,20 @@ security = HTTPBearer()
 
 # Type aliases for dependency injection
 SessionDep = Annotated[AsyncSession, Depends(get_db_session)]
+AnalyticsSessionDep = Annotated[AsyncSession, Depends(get_analytics_db)]
+
+
+async def load_user(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """Load a user principal, serving it from the short-TTL cache when possible."""
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if user is not None:
+        await user_cache.set(user)
+    return user
 
 
 async def get_current_user(
@@ -33,13 +48,14 @@ async def get_current_user(
         )
 
     try:
-        payload = verify_token(credentials.credentials)
+        payload = token_cache.decode(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token",
             )
+        user_id = UUID(user_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,8 +63,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(User).where(User.id == UUID(user_id)))
-    user = result.scalars().first()
+    user = await load_user(db, user_id)
 
     if user is None:
         raise HTTPException(
@@ -56,6 +71,8 @@ async def get_current_user(
             detail="User not found",
         )
 
+    # Lets bulk writes on this session be attributed for read-your-writes routing
+    db.info["user_id"] = user.id
     return user
 
 
@@ -71,6 +88,44 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    """Get current user if listed in ADMIN_EMAILS."""
+    if current_user.email.lower() not in {email.lower() for email in settings.ADMIN_EMAILS}:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+    return current_user
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session: a replica when configured, else the primary session."""
+    replica = await replica_router.replica_for(current_user.id)
+    if replica is None:
+        yield db
+        return
+    async with replica() as session:
+        yield session
+
+
+async def get_analytics_read_db(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_analytics_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read-only analytics session: a replica when configured, else the analytics pool."""
+    replica = await replica_router.replica_for(current_user.id)
+    if replica is None:
+        yield db
+        return
+    async with replica() as session:
+        yield session
+
+
 async def get_optional_user(
     db: AsyncSession = Depends(get_db_session),
     credentials = Depends(security),
@@ -80,20 +135,22 @@ async def get_optional_user(
         return None
 
     try:
-        payload = verify_token(credentials.credentials)
+        payload = token_cache.decode(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
+        user_id = UUID(user_id)
     except Exception:
         return None
 
-    result = await db.execute(select(User).where(User.id == UUID(user_id)))
-    return result.scalars().first()
+    return await load_user(db, user_id)
 
 
 # Re-export for convenience
 CurrentUserDep = Annotated[User, Depends(get_current_active_user)]
 OptionalUserDep = Annotated[Optional[User], Depends(get_optional_user)]
+AdminUserDep = Annotated[User, Depends(get_current_admin_user)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
 
 # Export get_db_session as get_db for backward compatibility
 get_db = get_db_session
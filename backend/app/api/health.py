@@ -0,0 +1,128 @@
+"""Liveness and readiness probes."""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Tuple
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.api.responses import model_response
+from app.core import cache, settings
+from app.db.database import ENGINES, pool_status
+from app.optimization import solver_pool
+from app.schemas import HealthCheckResponse, HealthCheckResult, ReadinessResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+
+async def timed_check(probe: Callable[[], Awaitable], failure: str) -> Tuple[bool, float, str]:
+    """Run a probe with the configured timeout; return (ok, latency ms, error).
+
+    Probes are unauthenticated, so errors are logged and reported as the
+    fixed ``failure`` message rather than driver text naming hosts.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        ok, error = True, None
+    except asyncio.TimeoutError:
+        ok, error = False, f"timed out after {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"
+    except Exception:
+        logger.exception(f"Health check failed: {failure}")
+        ok, error = False, failure
+    return ok, round((time.perf_counter() - started) * 1000, 2), error
+
+
+async def check_database(db: AsyncSession) -> HealthCheckResult:
+    """Ping the database; waiting on an exhausted pool counts against the timeout."""
+    ok, latency, error = await timed_check(lambda: db.execute(text("SELECT 1")), "database unavailable")
+    return HealthCheckResult(status="ok" if ok else "fail", latencyMs=latency, detail=error)
+
+
+def check_pool() -> HealthCheckResult:
+    """Fail when the OLTP pool is exhausted; other exhausted pools only degrade."""
+    statuses = {workload: pool_status(workload) for workload in ENGINES}
+    exhausted = [
+        workload for workload, status in statuses.items()
+        if status["size"] is not None and status["checked_out"] >= status["size"] + status["max_overflow"]
+    ]
+    if "oltp" in exhausted:
+        result = "fail"
+    elif exhausted:
+        result = "degraded"
+    else:
+        result = "ok"
+    return HealthCheckResult(
+        status=result,
+        detail=f"connection pool exhausted: {', '.join(exhausted)}" if exhausted else None,
+        metrics=statuses,
+    )
+
+
+def check_solver() -> HealthCheckResult:
+    """Report solver queue saturation (only solves are affected, so degraded)."""
+    metrics = solver_pool.metrics()
+    saturated = metrics["in_flight"] + metrics["queued"] >= metrics["max_pending"]
+    return HealthCheckResult(
+        status="degraded" if saturated else "ok",
+        detail="solver queue full" if saturated else None,
+        metrics=metrics,
+    )
+
+
+async def check_cache() -> HealthCheckResult:
+    """Ping the cache backend (an outage only costs performance, so degraded)."""
+    ok, latency, error = await timed_check(cache.backend.ping, "cache unavailable")
+    return HealthCheckResult(
+        status="ok" if ok else "degraded",
+        latencyMs=latency,
+        detail=error,
+        metrics=cache.metrics(),
+    )
+
+
+@router.get("", response_model=HealthCheckResponse)
+async def health_check(db: AsyncSession = Depends(get_db)):
+    """Health check endpoint."""
+    database = await check_database(db)
+    return HealthCheckResponse(
+        status="healthy" if database.status == "ok" else "degraded",
+        version=settings.APP_VERSION,
+        environment=settings.ENVIRONMENT,
+        database="connected" if database.status == "ok" else "unavailable",
+    )
+
+
+@router.get("/live")
+async def liveness() -> dict:
+    """Liveness probe: the process is up and serving the event loop."""
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness(db: AsyncSession = Depends(get_db)):
+    """Readiness probe: 503 while the database is unreachable or the pool is exhausted."""
+    checks = {
+        # Pool first so the probe's own connection is not counted
+        "pool": check_pool(),
+        "database": await check_database(db),
+        "solver": check_solver(),
+        "cache": await check_cache(),
+    }
+    statuses = {check.status for check in checks.values()}
+    if "fail" in statuses:
+        status = "not_ready"
+    elif "degraded" in statuses:
+        status = "degraded"
+    else:
+        status = "ready"
+
+    return model_response(
+        ReadinessResponse(status=status, version=settings.APP_VERSION, checks=checks),
+        status_code=503 if status == "not_ready" else 200,
+    )
@@ -0,0 +1,63 @@
+"""Request metrics middleware and the /metrics endpoint."""
+import time
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import (
+    db_queries_per_request,
+    db_query_seconds_per_request,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    render_metrics,
+)
+from app.db.instrumentation import track_queries
+
+router = APIRouter(tags=["health"])
+
+
+def route_template(scope) -> str:
+    """Get the matched route template (bounded label cardinality)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route template."""
+
+    def __init__(self, app):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            with track_queries() as stats:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec()
+            route = route_template(scope)
+            http_request_duration_seconds.labels(
+                method=scope["method"], route=route, status=str(status_code)
+            ).observe(time.perf_counter() - started)
+            db_queries_per_request.labels(route=route).observe(stats.count)
+            db_query_seconds_per_request.labels(route=route).observe(stats.total_seconds)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
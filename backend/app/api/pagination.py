@@ -0,0 +1,69 @@
+"""Keyset (cursor) pagination utilities."""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, or_
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode the sort key of the last item on a page as an opaque token."""
+    raw = json.dumps([created_at.isoformat(), str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor token back into its (created_at, id) sort key."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate_by_created_at(
+    query: Select,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    """Apply stable (created_at, id) ordering and keyset filtering to a query.
+
+    Fetches ``limit + 1`` rows so callers can tell whether another page exists.
+    """
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        if descending:
+            query = query.where(
+                or_(
+                    model.created_at < created_at,
+                    and_(model.created_at == created_at, model.id < item_id),
+                )
+            )
+        else:
+            query = query.where(
+                or_(
+                    model.created_at > created_at,
+                    and_(model.created_at == created_at, model.id > item_id),
+                )
+            )
+
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+
+    return query.limit(limit + 1)
+
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    """Return the cursor for the page after ``items`` (fetched with ``limit + 1``)."""
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,133 @@
+"""Request profiling middleware and admin endpoints for stored profiles."""
+import asyncio
+import logging
+import time
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+
+from app.api.deps import get_current_admin_user
+from app.api.metrics import route_template
+from app.core.profiling import choose_trigger, profile_request, profile_store
+from app.db.instrumentation import track_queries
+from app.schemas import ApiResponse, ProfileReport, ProfileSummary
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin_user)],
+)
+
+SORT_KEYS = {"cumulative", "tottime", "ncalls", "name"}
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled or explicitly requested requests.
+
+    The profile covers the whole request: dependencies, the handler (and any
+    solver run it starts), response serialization and the coroutine side of
+    DB awaits. Time spent waiting on the database is reported separately from
+    the query tracker, since a suspended coroutine accrues no profiler time.
+    """
+
+    def __init__(self, app):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = choose_trigger(Headers(scope=scope))
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries() as stats, profile_request(trigger) as profile:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+
+        if profile is None:
+            return
+
+        summary = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_template(scope),
+            "status": status_code,
+            "durationMs": round(duration_ms, 2),
+            "dbQueries": stats.count,
+            "dbMs": round(stats.total_seconds * 1000, 2),
+            "topQueries": [
+                {"sql": sql, "count": count, "ms": round(seconds * 1000, 2)}
+                for sql, count, seconds in stats.top()
+            ],
+        }
+        try:
+            saved = await asyncio.to_thread(profile_store.save, profile, summary)
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']} ({trigger}) in {duration_ms:.1f}ms: profile {saved['id']}"
+            )
+        except OSError as e:
+            logger.warning(f"Failed to store request profile: {e}")
+
+
+def _summary_or_404(profile_id: str) -> dict:
+    summary = profile_store.get(profile_id) if profile_id.isalnum() else None
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+
+@router.get("", response_model=ApiResponse[List[ProfileSummary]])
+async def list_profiles(limit: int = Query(50, ge=1, le=500)) -> ApiResponse:
+    """List stored profiles, newest first."""
+    summaries = (await asyncio.to_thread(profile_store.list))[:limit]
+    return ApiResponse(
+        data=[ProfileSummary(**summary) for summary in summaries],
+        message=f"Retrieved {len(summaries)} profiles",
+    )
+
+
+@router.get("/{profile_id}", response_model=ApiResponse[ProfileReport])
+async def get_profile(
+    profile_id: str,
+    sort: str = Query("cumulative"),
+    limit: int = Query(50, ge=1, le=1000),
+) -> ApiResponse:
+    """Get a profile with the pstats report of its top functions."""
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(SORT_KEYS)}")
+    summary = _summary_or_404(profile_id)
+    report = await asyncio.to_thread(profile_store.report, profile_id, sort, limit)
+    return ApiResponse(
+        data=ProfileReport(**summary, report=report),
+        message="Profile retrieved successfully",
+    )
+
+
+@router.get("/{profile_id}/raw")
+async def download_profile(profile_id: str) -> Response:
+    """Download the raw pstats dump (open with snakeviz or ``pstats``)."""
+    _summary_or_404(profile_id)
+    return FileResponse(
+        profile_store.prof_path(profile_id),
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.prof",
+    )
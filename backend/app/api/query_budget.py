@@ -0,0 +1,48 @@
+"""Per-request query budget middleware."""
+import logging
+
+from app.api.metrics import route_template
+from app.core.config import settings
+from app.db.instrumentation import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware logging requests that exceed the SQL query budget.
+
+    A request is over budget when it executes more than
+    ``QUERY_BUDGET_MAX_QUERIES`` statements or spends more than
+    ``QUERY_BUDGET_MAX_DB_MS`` in the database; the log line lists the most
+    expensive statement fingerprints so N+1 patterns are easy to spot.
+    """
+
+    def __init__(self, app, max_queries: int = None, max_db_ms: float = None):
+        """Initialize middleware."""
+        self.app = app
+        self.max_queries = settings.QUERY_BUDGET_MAX_QUERIES if max_queries is None else max_queries
+        self.max_db_ms = settings.QUERY_BUDGET_MAX_DB_MS if max_db_ms is None else max_db_ms
+
+    def over_budget(self, count: int, db_ms: float) -> bool:
+        """Check a request's totals against the configured limits."""
+        return bool(
+            (self.max_queries and count > self.max_queries)
+            or (self.max_db_ms and db_ms > self.max_db_ms)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                db_ms = stats.total_seconds * 1000
+                if self.over_budget(stats.count, db_ms):
+                    logger.warning(
+                        f"Query budget exceeded: {scope['method']} {route_template(scope)} "
+                        f"ran {stats.count} queries in {db_ms:.1f}ms "
+                        f"(budget {self.max_queries} queries / {self.max_db_ms:g}ms)\n{stats.summary()}"
+                    )
@@ -0,0 +1,282 @@
+"""Token-bucket rate limiting middleware."""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.core import settings
+from app.api.auth_cache import token_cache
+
+logger = logging.getLogger(__name__)
+
+# Paths that are never rate limited (probes and docs)
+EXEMPT_PATHS = {"/", "/api/health", "/api/health/live", "/api/health/ready", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+
+@dataclass
+class RateLimitRule:
+    """Bucket parameters: refill rate and burst capacity."""
+
+    name: str
+    requests_per_minute: int
+
+    @property
+    def rate(self) -> float:
+        """Tokens refilled per second."""
+        return self.requests_per_minute / 60.0
+
+    @property
+    def capacity(self) -> float:
+        """Maximum burst size."""
+        return float(self.requests_per_minute)
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+class InMemoryRateLimitBackend:
+    """Process-local token buckets.
+
+    Each key holds a single ``(tokens, updated_at)`` pair. Keys are kept in
+    last-access order, so idle buckets (which would have refilled anyway) and
+    overflow past ``max_keys`` are evicted from the front in O(1) per request.
+    """
+
+    def __init__(self, max_keys: int, idle_seconds: float):
+        """Initialize backend."""
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens from a bucket; return (allowed, tokens left).
+
+        A negative cost returns tokens, up to the capacity.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens = min(capacity, tokens - cost)
+        self._buckets[key] = (tokens, now)
+        self._evict(now)
+        return allowed, tokens
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            _, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_seconds and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+    def reset(self) -> None:
+        """Drop all buckets."""
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Atomic refill-and-take so all uvicorn workers share one bucket per key
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = math.min(capacity, tokens - cost)
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets stored in Redis hashes, shared across worker processes.
+
+    Buckets expire once they would be full again. Redis failures fail open so
+    a cache outage does not take the API down.
+    """
+
+    key_prefix = "rate_limit:"
+
+    def __init__(self, redis_url: str):
+        """Initialize backend."""
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(str(redis_url))
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens from a bucket; return (allowed, tokens left)."""
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"{self.key_prefix}{key}"],
+                args=[rate, capacity, time.time(), cost],
+            )
+            return bool(allowed), float(tokens)
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return True, capacity
+
+    def reset(self) -> None:
+        """Redis buckets expire on their own."""
+
+
+class RateLimiter:
+    """Applies the default budget plus any stricter per-route budgets."""
+
+    def __init__(self, backend, default_rule: RateLimitRule, route_rules: Optional[Dict[str, RateLimitRule]] = None):
+        """Initialize limiter."""
+        self.backend = backend
+        self.default_rule = default_rule
+        self.route_rules = route_rules or {}
+
+    def rules_for(self, path: str) -> List[RateLimitRule]:
+        """Get rules for a path, most specific first."""
+        route_rule = self.route_rules.get(path.rstrip("/"))
+        return [route_rule, self.default_rule] if route_rule else [self.default_rule]
+
+    async def check(self, identity: str, path: str) -> RateLimitDecision:
+        """Consume one token from every bucket that applies to the request.
+
+        If a bucket denies the request, tokens already taken from the buckets
+        before it are given back, so rejected requests cost nothing.
+        """
+        decision = None
+        consumed: List[RateLimitRule] = []
+        for rule in self.rules_for(path):
+            allowed, tokens = await self.backend.consume(f"{rule.name}:{identity}", rule.rate, rule.capacity)
+            decision = RateLimitDecision(
+                allowed=allowed,
+                limit=rule.requests_per_minute,
+                remaining=max(0, int(tokens)),
+                retry_after=0.0 if allowed else (1.0 - tokens) / rule.rate,
+            )
+            if not allowed:
+                for taken in consumed:
+                    await self.backend.consume(f"{taken.name}:{identity}", taken.rate, taken.capacity, cost=-1.0)
+                break
+            consumed.append(rule)
+        return decision
+
+    def reset(self) -> None:
+        """Drop all bucket state."""
+        self.backend.reset()
+
+
+def get_request_identity(scope) -> str:
+    """Identify the caller by user id when authenticated, otherwise by client IP."""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    user_id = token_cache.decode(token).get("sub")
+                    if user_id:
+                        return f"user:{user_id}"
+                except Exception:
+                    pass
+            break
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing RATE_LIMIT_* settings."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        """Initialize middleware."""
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.check(get_request_identity(scope), scope["path"])
+        headers = {
+            "X-RateLimit-Limit": str(decision.limit),
+            "X-RateLimit-Remaining": str(decision.remaining),
+        }
+
+        if not decision.allowed:
+            headers["Retry-After"] = str(max(1, int(decision.retry_after + 0.999)))
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": "RateLimitExceededError",
+                    "detail": "Rate limit exceeded, please retry later",
+                    "status_code": 429,
+                },
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (k.lower().encode(), v.encode()) for k, v in headers.items()
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def build_rate_limiter() -> RateLimiter:
+    """Create the rate limiter configured by settings."""
+    default_rule = RateLimitRule("default", settings.RATE_LIMIT_REQUESTS_PER_MINUTE)
+    solve_rule = RateLimitRule("solve", settings.RATE_LIMIT_SOLVE_REQUESTS_PER_MINUTE)
+    route_rules = {
+        "/api/v1/optimization/solve": solve_rule,
+        "/api/v1/optimization/solve/stream": solve_rule,
+    }
+
+    backend = None
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if settings.REDIS_URL:
+            try:
+                backend = RedisRateLimitBackend(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("redis package not installed; using in-memory rate limiting")
+        else:
+            logger.warning("RATE_LIMIT_BACKEND=redis but REDIS_URL is not set; using in-memory rate limiting")
+
+    if backend is None:
+        rules = [default_rule, solve_rule]
+        backend = InMemoryRateLimitBackend(
+            max_keys=settings.RATE_LIMIT_MAX_KEYS,
+            idle_seconds=max(rule.capacity / rule.rate for rule in rules),
+        )
+
+    return RateLimiter(backend, default_rule, route_rules)
+
+
+rate_limiter = build_rate_limiter()
@@ -0,0 +1,56 @@
+"""Fast JSON responses.
+
+By default FastAPI dumps a returned model to a dict, validates that dict
+against ``response_model`` again and then encodes it with the standard
+library. Handlers that already hold a fully built response model can return
+``model_response(...)`` instead: the model is serialized once by Pydantic's
+native encoder and FastAPI skips re-validation (``response_model`` is still
+used for the OpenAPI schema). Everything else is rendered with orjson.
+"""
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode a model (by alias, nulls kept) or plain content to JSON bytes."""
+    if isinstance(content, BaseModel):
+        # Same output as FastAPI's response_model serialization
+        return content.model_dump_json(by_alias=True).encode()
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendering models natively and other content with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        """Encode content to JSON bytes."""
+        return encode_json(content)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Format one Server-Sent Events message."""
+    return b"event: " + event.encode() + b"\ndata: " + encode_json(data) + b"\n\n"
+
+
+def model_response(
+    model: BaseModel,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+) -> FastJSONResponse:
+    """Serialize an already validated model, skipping response_model re-validation.
+
+    Pass the route's injected ``Response`` so headers set by dependencies
+    (e.g. ETag from ``ConditionalGet``) are carried over.
+    """
+    fast = FastJSONResponse(model, status_code=status_code)
+    if response is not None:
+        fast.headers.raw.extend(
+            (name, value) for name, value in response.headers.raw if name != b"content-length"
+        )
+    return fast
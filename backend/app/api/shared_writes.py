@@ -0,0 +1,34 @@
+"""Read-your-writes across workers."""
+from app.db import database
+
+
+class SharedWriteMiddleware:
+    """ASGI middleware publishing a request's write markers before it responds.
+
+    A user's writes pin their reads to the primary (see ``ReplicaRouter``).
+    The marker other workers check is written to the shared cache before the
+    response starts, so a follow-up read handled elsewhere cannot reach a
+    lagging replica. Writes committed while a response body streams are
+    shared once the response ends.
+    """
+
+    def __init__(self, app):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with database.defer_shared_writes() as writers:
+            async def send_after_sharing(message):
+                if message["type"] == "http.response.start" and writers:
+                    await database.replica_router.share_writes(writers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_after_sharing)
+            finally:
+                if writers:
+                    await database.replica_router.share_writes(writers)
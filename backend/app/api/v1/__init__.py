@@ -4,6 +4,7 @@ from .behaviors import router as behaviors_router
 from .optimization import router as optimization_router
 from .schedule import router as schedule_router
 from .analytics import router as analytics_router
+from .exports import router as exports_router
 
 __all__ = [
     "auth_router",
@@ -11,4 +12,5 @@ __all__ = [
     "optimization_router",
     "schedule_router",
     "analytics_router",
+    "exports_router",
 ]
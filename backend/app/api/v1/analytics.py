@@ -1,16 +1,21 @@
 """Analytics routes."""
 import logging
-from datetime import datetime, timezone, timedelta, date
+from datetime import datetime, time, timezone, timedelta, date
 from typing import List
-from sqlalchemy import select, func, and_
+import numpy as np
+from sqlalchemy import Float, select, func, and_, cast
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends
 
-from app.api.deps import get_db, get_current_active_user
+from app.analytics import AnalyticsWindow, adherence, bucket_expression, load_progress_totals, summarize_objectives
+from app.api.conditional import ConditionalGet
+from app.api.deps import get_analytics_read_db, get_current_active_user
+from app.core import cache
 from app.models import (
     User, 
     Behavior, 
     CompletionLog, 
+    CompletionRollup,
     OptimizationRun, 
     ScheduledBehavior,
     Objective,
@@ -26,48 +31,76 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
+def day_start(day: date) -> datetime:
+    """UTC midnight of a day.
+
+    Filtering on the raw ``completed_at`` column (instead of
+    ``date(completed_at)``) lets PostgreSQL prune completion_logs partitions
+    and use the (user_id, completed_at) index.
+    """
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+# Initial lookback of the streak query (about a month, one or two partitions)
+STREAK_WINDOW_DAYS = 32
+
+# Window for "recently completed" behaviors on the dashboard
+RECENT_BEHAVIORS_DAYS = 90
+
+# Energy budget shown against daily energy spent (sum of completed behaviors' energy cost)
+DAILY_ENERGY_BUDGET = 100
+
+
 async def calculate_streak(db: AsyncSession, user_id) -> int:
     """Calculate current streak of days with completed behaviors."""
-    # Get all completion dates for the user, ordered by date descending
-    result = await db.execute(
-        select(func.date(CompletionLog.completed_at))
-        .where(CompletionLog.user_id == user_id)
-        .group_by(func.date(CompletionLog.completed_at))
-        .order_by(func.date(CompletionLog.completed_at).desc())
-    )
-    completion_dates = [row[0] for row in result.all()]
-    
-    if not completion_dates:
-        return 0
-    
-    # Check if there's activity today or yesterday
     today = date.today()
     yesterday = today - timedelta(days=1)
-    
-    if completion_dates[0] not in (today, yesterday):
-        return 0
-    
-    # Count consecutive days
-    streak = 1
-    current_date = completion_dates[0]
-    
-    for completion_date in completion_dates[1:]:
-        expected_prev_date = current_date - timedelta(days=1)
-        if completion_date == expected_prev_date:
-            streak += 1
-            current_date = completion_date
-        else:
-            break
-    
-    return streak
+    window = STREAK_WINDOW_DAYS
 
+    # Only scan recent partitions; widen the window while the streak reaches its edge
+    while True:
+        since = today - timedelta(days=window)
+        result = await db.execute(
+            select(func.date(CompletionLog.completed_at))
+            .where(
+                CompletionLog.user_id == user_id,
+                CompletionLog.completed_at >= day_start(since),
+            )
+            .group_by(func.date(CompletionLog.completed_at))
+            .order_by(func.date(CompletionLog.completed_at).desc())
+        )
+        completion_dates = [row[0] for row in result.all()]
 
-@router.get("/summary", response_model=ApiResponse[DashboardSummary])
-async def get_dashboard_summary(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> ApiResponse[DashboardSummary]:
-    """Get dashboard summary with real data."""
+        if not completion_dates:
+            return 0
+
+        # Check if there's activity today or yesterday
+        if completion_dates[0] not in (today, yesterday):
+            return 0
+
+        # Count consecutive days
+        streak = 1
+        current_date = completion_dates[0]
+
+        for completion_date in completion_dates[1:]:
+            expected_prev_date = current_date - timedelta(days=1)
+            if completion_date == expected_prev_date:
+                streak += 1
+                current_date = completion_date
+            else:
+                break
+
+        if current_date > since or len(completion_dates) > streak:
+            return streak
+        window *= 4
+
+
+# Cached analytics depend on these per-user tags
+ANALYTICS_TAGS = ("behaviors", "objectives", "runs", "completions")
+
+
+async def load_dashboard_summary(db: AsyncSession, current_user: User) -> DashboardSummary:
+    """Build the dashboard summary from the database."""
     # Total and active behaviors
     total_behaviors_result = await db.execute(
         select(func.count(Behavior.id)).where(Behavior.user_id == current_user.id)
@@ -114,10 +147,22 @@ async def get_dashboard_summary(
     
     completion_rate = (total_completed / total_scheduled) if total_scheduled > 0 else 0.0
     
-    # Average satisfaction score
-    avg_score_result = await db.execute(
-        select(func.avg(CompletionLog.satisfaction_score))
+    # Average satisfaction score, including archived months kept as rollups
+    def user_sum(column, where):
+        return select(func.coalesce(func.sum(column), 0)).where(where).scalar_subquery()
+
+    score_total = (
+        user_sum(CompletionLog.satisfaction_score, CompletionLog.user_id == current_user.id)
+        + user_sum(CompletionRollup.satisfaction_total, CompletionRollup.user_id == current_user.id)
+    )
+    score_count = (
+        select(func.count(CompletionLog.satisfaction_score))
         .where(CompletionLog.user_id == current_user.id)
+        .scalar_subquery()
+        + user_sum(CompletionRollup.satisfaction_count, CompletionRollup.user_id == current_user.id)
+    )
+    avg_score_result = await db.execute(
+        select(cast(score_total, Float) / func.nullif(score_count, 0))
     )
     avg_score = avg_score_result.scalar() or 0.0
     avg_score_normalized = (float(avg_score) / 5.0) if avg_score > 0 else 0.0  # Normalize to 0-1
@@ -138,7 +183,10 @@ async def get_dashboard_summary(
     recent_behaviors_result = await db.execute(
         select(Behavior, func.max(CompletionLog.completed_at))
         .join(CompletionLog, CompletionLog.behavior_id == Behavior.id)
-        .where(Behavior.user_id == current_user.id)
+        .where(
+            Behavior.user_id == current_user.id,
+            CompletionLog.completed_at >= day_start(date.today() - timedelta(days=RECENT_BEHAVIORS_DAYS)),
+        )
         .group_by(Behavior.id)
         .order_by(func.max(CompletionLog.completed_at).desc())
         .limit(5)
@@ -182,54 +230,73 @@ async def get_dashboard_summary(
     )
     completed_behavior_ids = {row[0] for row in completion_result.all()}
 
+    return DashboardSummary(
+        stats=DashboardStats(
+            total_behaviors=total_behaviors,
+            active_behaviors=active_behaviors,
+            total_optimization_runs=total_runs,
+            completion_rate=round(completion_rate, 2),
+            average_score=round(avg_score_normalized, 2),
+            streak_days=streak_days,
+        ),
+        recent_optimizations=[
+            OptimizationSummary(
+                id=opt.id,
+                status=opt.status.value if hasattr(opt.status, 'value') else str(opt.status),
+                score=round(opt.total_objective_value or 0, 2),
+                created_at=opt.created_at
+            )
+            for opt in recent_opts
+        ],
+        recent_behaviors=[
+            DashboardBehavior(
+                id=b.id,
+                name=b.name,
+                category=b.category.value if hasattr(b.category, 'value') else str(b.category),
+                is_active=b.is_active,
+                created_at=b.created_at
+            )
+            for b in recent_behaviors
+        ],
+        today_schedule=[
+            DashboardScheduledBehavior(
+                id=sb.id,
+                behavior_name=b.name,
+                time_slot="flexible", # Default for dashboard
+                start_time=period_to_time(sb.time_period % 96), # Map to day's period
+                is_completed=sb.behavior_id in completed_behavior_ids
+            )
+            for sb, b in today_schedule_raw
+        ],
+    )
+
+
+@router.get(
+    "/summary",
+    response_model=ApiResponse[DashboardSummary],
+    dependencies=[Depends(ConditionalGet(*ANALYTICS_TAGS))],
+)
+async def get_dashboard_summary(
+    db: AsyncSession = Depends(get_analytics_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[DashboardSummary]:
+    """Get dashboard summary with real data."""
+    summary = await cache.get_or_set_model(
+        cache.user_key(current_user.id, "summary", date.today().isoformat()),
+        DashboardSummary,
+        lambda: load_dashboard_summary(db, current_user),
+        tags=[cache.user_tag(current_user.id, name) for name in ANALYTICS_TAGS],
+    )
     return ApiResponse(
         success=True,
         message="Summary retrieved",
-        data=DashboardSummary(
-            stats=DashboardStats(
-                total_behaviors=total_behaviors,
-                active_behaviors=active_behaviors,
-                total_optimization_runs=total_runs,
-                completion_rate=round(completion_rate, 2),
-                average_score=round(avg_score_normalized, 2),
-                streak_days=streak_days,
-            ),
-            recent_optimizations=[
-                OptimizationSummary(
-                    id=opt.id,
-                    status=opt.status.value if hasattr(opt.status, 'value') else str(opt.status),
-                    score=round(opt.total_objective_value or 0, 2),
-                    created_at=opt.created_at
-                )
-                for opt in recent_opts
-            ],
-            recent_behaviors=[
-                DashboardBehavior(
-                    id=b.id,
-                    name=b.name,
-                    category=b.category.value if hasattr(b.category, 'value') else str(b.category),
-                    is_active=b.is_active,
-                    created_at=b.created_at
-                )
-                for b in recent_behaviors
-            ],
-            today_schedule=[
-                DashboardScheduledBehavior(
-                    id=sb.id,
-                    behavior_name=b.name,
-                    time_slot="flexible", # Default for dashboard
-                    start_time=period_to_time(sb.time_period % 96), # Map to day's period
-                    is_completed=sb.behavior_id in completed_behavior_ids
-                )
-                for sb, b in today_schedule_raw
-            ],
-        )
+        data=summary
     )
 
 
 @router.get("/stats", response_model=ApiResponse[DashboardStats])
 async def get_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_analytics_read_db),
     current_user: User = Depends(get_current_active_user),
 ) -> ApiResponse[DashboardStats]:
     """Get dashboard stats."""
@@ -242,65 +309,39 @@ async def get_stats(
     )
 
 
-@router.get("", response_model=ApiResponse[AnalyticsData])
-async def get_analytics(
-    period: str = "7d",
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> ApiResponse[AnalyticsData]:
-    """Get detailed analytics."""
-    # Parse period
-    days = 7
-    if period.endswith("d"):
-        try:
-            days = int(period[:-1])
-        except ValueError:
-            days = 7
-    
-    start_date = date.today() - timedelta(days=days)
-    
-    # Behavior completions by date
-    completions_result = await db.execute(
-        select(
-            func.date(CompletionLog.completed_at).label("date"),
-            func.count(CompletionLog.id).label("completed")
-        )
-        .where(
-            and_(
-                CompletionLog.user_id == current_user.id,
-                func.date(CompletionLog.completed_at) >= start_date
-            )
-        )
-        .group_by(func.date(CompletionLog.completed_at))
-        .order_by(func.date(CompletionLog.completed_at))
-    )
-    completions = completions_result.all()
-    
-    # Get scheduled counts by date
+async def load_analytics(db: AsyncSession, current_user: User, period: str) -> AnalyticsData:
+    """Build detailed analytics from the database."""
+    # Periods end today and are reported per day, week or month depending on length
+    window = AnalyticsWindow.from_period(period)
+
+    # Precomputed totals of the window, summed per bucket in SQL
+    totals = await load_progress_totals(db, current_user.id, window)
+
+    # Scheduled behaviors per bucket
+    run_bucket = bucket_expression(OptimizationRun.start_date, window.bucket, db.bind.dialect.name).label("bucket")
     scheduled_result = await db.execute(
-        select(
-            OptimizationRun.start_date.label("date"),
-            func.count(ScheduledBehavior.id).label("scheduled")
-        )
+        select(run_bucket, func.count(ScheduledBehavior.id).label("scheduled"))
         .join(ScheduledBehavior, ScheduledBehavior.optimization_run_id == OptimizationRun.id)
         .where(
             and_(
                 OptimizationRun.user_id == current_user.id,
-                OptimizationRun.start_date >= start_date
+                OptimizationRun.start_date >= window.start,
+                OptimizationRun.start_date <= window.end,
             )
         )
-        .group_by(OptimizationRun.start_date)
-        .order_by(OptimizationRun.start_date)
+        .group_by(run_bucket)
     )
-    scheduled_counts = {row[0]: row[1] for row in scheduled_result.all()}
-    
+    bucket_index = {day: i for i, day in enumerate(totals.dates)}
+    scheduled = np.zeros(len(totals.dates), dtype=np.int64)
+    for bucket, count in scheduled_result.all():
+        if bucket in bucket_index:
+            scheduled[bucket_index[bucket]] = count
+
+    completed = totals.completions
     behavior_completions = [
-        BehaviorCompletion(
-            date=row[0],
-            completed=row[1],
-            scheduled=scheduled_counts.get(row[0], 0),
-        )
-        for row in completions
+        BehaviorCompletion(date=day, completed=done, scheduled=planned)
+        for day, done, planned in zip(totals.dates, completed.tolist(), scheduled.tolist())
+        if done or planned
     ]
     
     # Category distribution
@@ -329,39 +370,58 @@ async def get_analytics(
         for row in categories
     ]
     
-    # Objective progress (simplified - showing average impact scores)
+    # Objective progress: impact x actual duration, with the fitted trend
     objectives_result = await db.execute(
-        select(Objective).where(Objective.user_id == current_user.id)
+        select(Objective.type).where(Objective.user_id == current_user.id)
     )
-    objectives = objectives_result.scalars().all()
-    
-    objective_progress = []
-    for obj in objectives:
-        obj_name = obj.type.value if hasattr(obj.type, 'value') else str(obj.type)
-        objective_progress.append(ObjectiveProgress(
-            objective_name=obj_name.capitalize(),
-            progress=round(obj.weight * 100, 1),
-            trend="stable",
-        ))
-    
-    # Energy usage (mock for now)
+    objective_types = [t.value if hasattr(t, 'value') else str(t) for t in objectives_result.scalars().all()]
+    objective_progress = [
+        ObjectiveProgress(
+            objective_name=summary.objective_type.capitalize(),
+            progress=round(summary.progress, 1),
+            trend=summary.trend,
+        )
+        for summary in summarize_objectives(
+            totals.impact, objective_types, trend_series=window.trend_series(totals.impact)
+        )
+    ]
+
+    energy_budgets = DAILY_ENERGY_BUDGET * window.bucket_days()
     energy_usage = [
         EnergyUsage(
-            date=start_date + timedelta(days=i),
-            energy_spent=0,
-            energy_budget=100,
+            date=day,
+            energy_spent=round(spent),
+            energy_budget=budget,
         )
-        for i in range(days)
+        for day, spent, budget in zip(totals.dates, totals.energy.tolist(), energy_budgets.tolist())
     ]
     
+    return AnalyticsData(
+        period=period,
+        bucket=window.bucket,
+        behavior_completions=behavior_completions,
+        objective_progress=objective_progress,
+        category_distribution=category_distribution,
+        energy_usage=energy_usage,
+        adherence=adherence(completed, scheduled),
+    )
+
+
+@router.get("", response_model=ApiResponse[AnalyticsData])
+async def get_analytics(
+    period: str = "7d",
+    db: AsyncSession = Depends(get_analytics_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ApiResponse[AnalyticsData]:
+    """Get detailed analytics."""
+    analytics = await cache.get_or_set_model(
+        cache.user_key(current_user.id, "analytics", period, date.today().isoformat()),
+        AnalyticsData,
+        lambda: load_analytics(db, current_user, period),
+        tags=[cache.user_tag(current_user.id, name) for name in ANALYTICS_TAGS],
+    )
     return ApiResponse(
         success=True,
         message="Analytics retrieved",
-        data=AnalyticsData(
-            period=period,
-            behavior_completions=behavior_completions,
-            objective_progress=objective_progress,
-            category_distribution=category_distribution,
-            energy_usage=energy_usage,
-        )
+        data=analytics
     )
@@ -10,8 +10,9 @@ from app.api.deps import get_db, CurrentUserDep, get_current_active_user
 from app.core import (
     create_access_token,
     create_refresh_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     verify_token,
     AuthenticationError,
 )
@@ -48,7 +49,7 @@ async def register(
     user = User(
         email=request.email,
         username=request.email,  # Using email as username for now
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password_async(request.password),
     )
     user.name = request.name
     db.add(user)
@@ -95,9 +96,13 @@ async def login(
     )
     user = result.scalars().first()
 
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # Transparently upgrade hashes created with a different cost factor
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(request.password)
+
     # Update last login
     user.last_login = datetime.now(timezone.utc)
     await db.commit()
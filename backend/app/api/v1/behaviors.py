@@ -1,15 +1,23 @@
 """Behavior routes."""
 import logging
-from typing import List, Dict
-from uuid import UUID
+from collections import Counter
+from typing import List, Dict, Mapping, Optional, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
+from app.analytics import refresh_behavior_progress, remove_completions
+from app.api.conditional import ConditionalGet
 from app.api.deps import get_db, get_current_active_user
-from app.models import User, Behavior, CompletionLog, Objective
+from app.api.responses import model_response
+from app.core import cache
+from app.api.pagination import paginate_by_created_at, next_cursor
+from app.models import User, Behavior, CompletionLog, CompletionRollup, Objective
+from app.optimization import IMPACT_COLUMNS, OBJECTIVE_INDEX, ImpactMatrix, objective_impacts
 from app.schemas.api import ApiResponse
 from app.schemas.behavior import (
     BehaviorCreate,
@@ -17,6 +25,9 @@ from app.schemas.behavior import (
     BehaviorResponse,
     BehaviorListResponse,
     BehaviorStatistics,
+    BehaviorImportRequest,
+    BehaviorImportItemResult,
+    BehaviorImportResponse,
     ObjectiveImpactCreate,
     ObjectiveImpactResponse,
 )
@@ -26,28 +37,151 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/behaviors", tags=["behaviors"])
 
 
-async def get_objective_map(db: AsyncSession, user_id: UUID) -> Dict[str, UUID]:
-    """Get mapping of objective type to its ID."""
-    result = await db.execute(select(Objective).where(Objective.user_id == user_id))
-    objectives = result.scalars().all()
+def build_objective_map(objectives: List[Objective]) -> Dict[str, UUID]:
+    """Build mapping of objective type to its ID from loaded objectives."""
     # Handle cases where objective names might be stored as enum values
     return {obj.type.value if hasattr(obj.type, "value") else str(obj.type): obj.id for obj in objectives}
 
 
-def map_behavior_to_response(behavior: Behavior, stats: tuple = None, objective_map: Dict[str, UUID] = None) -> BehaviorResponse:
-    """Map behavior model to BehaviorResponse schema."""
-    impacts = []
-    if objective_map:
-        for obj_type, obj_id in objective_map.items():
-            impact_score = behavior.get_impact(obj_type)
-            if impact_score != 0:
-                impacts.append(
-                    ObjectiveImpactResponse(
-                        objectiveId=obj_id,
-                        objectiveName=obj_type.capitalize(),
-                        impactScore=impact_score
-                    )
-                )
+async def get_objective_map(db: AsyncSession, user_id: UUID) -> Dict[str, UUID]:
+    """Get mapping of objective type to its ID."""
+    async def load():
+        result = await db.execute(select(Objective).where(Objective.user_id == user_id))
+        return {k: str(v) for k, v in build_objective_map(result.scalars().all()).items()}
+
+    cached = await cache.get_or_set(
+        cache.user_key(user_id, "objective_map"),
+        load,
+        tags=[cache.user_tag(user_id, "objectives")],
+    )
+    return {k: UUID(v) for k, v in cached.items()}
+
+
+def apply_objective_impacts(
+    behavior: Behavior,
+    impacts: List[ObjectiveImpactCreate],
+    objective_types: Mapping[UUID, str],
+) -> List[UUID]:
+    """Set ``impact_on_<type>`` columns from impacts keyed by objective id.
+
+    ``objective_types`` maps the user's objective ids to their types; ids not
+    in it are skipped and returned.
+    """
+    unknown = []
+    for impact in impacts:
+        obj_type = objective_types.get(impact.objectiveId)
+        if obj_type in OBJECTIVE_INDEX:
+            setattr(behavior, f"impact_on_{obj_type}", impact.impactScore)
+        else:
+            unknown.append(impact.objectiveId)
+    return unknown
+
+
+def progress_values(behavior: Behavior) -> Tuple:
+    """Energy cost and impacts, the values daily progress totals are computed from."""
+    return (behavior.energy_cost, *(getattr(behavior, column) or 0.0 for column in IMPACT_COLUMNS))
+
+
+def build_behavior(user_id: UUID, request: BehaviorCreate) -> Behavior:
+    """New behavior from a create request (impacts are applied separately)."""
+    return Behavior(
+        user_id=user_id,
+        name=request.name,
+        description=request.description,
+        category=request.category,
+        min_duration=request.durationMin,
+        typical_duration=request.durationMin,  # Mapping to min since typical is gone in new schema
+        max_duration=request.durationMax,
+        energy_cost=request.energyCost,
+        preferred_time_slots=request.preferredTimeSlots or ["flexible"],
+        is_active=request.isActive,
+    )
+
+
+async def load_behavior_statistics(db: AsyncSession, behavior_ids: List[UUID]) -> Dict[UUID, tuple]:
+    """Completion statistics per behavior, merging live logs with archived rollups.
+
+    Returns ``(total_completions, avg_duration, avg_satisfaction,
+    last_completed, total_duration)`` for behaviors that have any completions.
+    """
+    if not behavior_ids:
+        return {}
+
+    totals: Dict[UUID, list] = {}
+
+    def add(behavior_id, count, duration, satisfaction_total, satisfaction_count, last_completed):
+        entry = totals.setdefault(behavior_id, [0, 0, 0, 0, None])
+        entry[0] += count or 0
+        entry[1] += duration or 0
+        entry[2] += satisfaction_total or 0
+        entry[3] += satisfaction_count or 0
+        if last_completed is not None and (entry[4] is None or last_completed > entry[4]):
+            entry[4] = last_completed
+
+    live = await db.execute(
+        select(
+            CompletionLog.behavior_id,
+            func.count(CompletionLog.id),
+            func.sum(CompletionLog.actual_duration),
+            func.sum(CompletionLog.satisfaction_score),
+            func.count(CompletionLog.satisfaction_score),
+            func.max(CompletionLog.completed_at),
+        )
+        .where(CompletionLog.behavior_id.in_(behavior_ids))
+        .group_by(CompletionLog.behavior_id)
+    )
+    for row in live.all():
+        add(*row)
+
+    archived = await db.execute(
+        select(
+            CompletionRollup.behavior_id,
+            func.sum(CompletionRollup.completions),
+            func.sum(CompletionRollup.total_duration),
+            func.sum(CompletionRollup.satisfaction_total),
+            func.sum(CompletionRollup.satisfaction_count),
+            func.max(CompletionRollup.last_completed_at),
+        )
+        .where(CompletionRollup.behavior_id.in_(behavior_ids))
+        .group_by(CompletionRollup.behavior_id)
+    )
+    for row in archived.all():
+        add(*row)
+
+    return {
+        behavior_id: (
+            count,
+            duration / count if count else None,
+            satisfaction_total / satisfaction_count if satisfaction_count else None,
+            last_completed,
+            duration,
+        )
+        for behavior_id, (count, duration, satisfaction_total, satisfaction_count, last_completed) in totals.items()
+        if count
+    }
+
+
+def map_behavior_to_response(
+    behavior: Behavior,
+    stats: tuple = None,
+    objective_map: Dict[str, UUID] = None,
+    impact_matrix: Optional[ImpactMatrix] = None,
+) -> BehaviorResponse:
+    """Map behavior model to BehaviorResponse schema.
+
+    Pass ``impact_matrix`` when mapping many behaviors so impacts are read
+    from one shared matrix.
+    """
+    if impact_matrix is None or behavior.id not in impact_matrix:
+        impact_matrix = ImpactMatrix.from_behaviors([behavior])
+    impacts = [
+        ObjectiveImpactResponse(
+            objectiveId=obj_id,
+            objectiveName=obj_type.capitalize(),
+            impactScore=impact_score
+        )
+        for obj_type, obj_id, impact_score in objective_impacts(impact_matrix, behavior.id, objective_map)
+    ]
 
     statistics = None
     if stats:
@@ -79,54 +213,71 @@ def map_behavior_to_response(behavior: Behavior, stats: tuple = None, objective_
     )
 
 
-@router.get("", response_model=ApiResponse[BehaviorListResponse])
+@router.get(
+    "",
+    response_model=ApiResponse[BehaviorListResponse],
+    dependencies=[Depends(ConditionalGet("behaviors", "objectives", "completions"))],
+)
 async def list_behaviors(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-) -> dict:
-    """List user's behaviors."""
-    # Get total count
-    result = await db.execute(
-        select(func.count(Behavior.id)).where(Behavior.user_id == current_user.id)
-    )
-    total = result.scalar() or 0
+    cursor: Optional[str] = Query(None),
+    include_total: Optional[bool] = Query(None),
+) -> Response:
+    """List user's behaviors.
+
+    Pass the returned ``nextCursor`` as ``cursor`` to page with keyset
+    pagination; ``skip`` is still honoured when no cursor is given. The total
+    is counted on the first page only unless ``include_total`` is set.
+    """
+    total = None
+    if include_total or (include_total is None and cursor is None):
+        result = await db.execute(
+            select(func.count(Behavior.id)).where(Behavior.user_id == current_user.id)
+        )
+        total = result.scalar() or 0
 
     # Get paginated behaviors
-    result = await db.execute(
-        select(Behavior)
-        .where(Behavior.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
+    query = paginate_by_created_at(
+        select(Behavior).where(Behavior.user_id == current_user.id),
+        Behavior,
+        cursor,
+        limit,
     )
-    behaviors = result.scalars().all()
+    if skip and not cursor:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    behaviors = rows[:limit]
     
     objective_map = await get_objective_map(db, current_user.id)
 
-    # Build responses with statistics
-    items = []
-    for behavior in behaviors:
-        stats_result = await db.execute(
-            select(
-                func.count(CompletionLog.id).label("total_completions"),
-                func.avg(CompletionLog.actual_duration).label("avg_duration"),
-                func.avg(CompletionLog.satisfaction_score).label("avg_satisfaction"),
-                func.max(CompletionLog.completed_at).label("last_completed"),
-                func.sum(CompletionLog.actual_duration).label("total_duration"),
-            ).where(CompletionLog.behavior_id == behavior.id)
-        )
-        stats = stats_result.first()
-        items.append(map_behavior_to_response(behavior, stats, objective_map))
-
-    return ApiResponse(
-        data=BehaviorListResponse(
-            total=total,
-            skip=skip,
-            limit=limit,
-            data=items
+    # Statistics for the whole page in grouped queries
+    stats_by_behavior = await load_behavior_statistics(db, [b.id for b in behaviors])
+
+    # Behaviors without completions get zeroed statistics, as before
+    empty_stats = (0, None, None, None, None)
+    impact_matrix = ImpactMatrix.from_behaviors(behaviors)
+    items = [
+        map_behavior_to_response(behavior, stats_by_behavior.get(behavior.id, empty_stats), objective_map, impact_matrix)
+        for behavior in behaviors
+    ]
+
+    return model_response(
+        ApiResponse[BehaviorListResponse](
+            data=BehaviorListResponse(
+                total=total,
+                skip=skip,
+                limit=limit,
+                nextCursor=next_cursor(rows, limit),
+                data=items
+            ),
+            message=f"Retrieved {len(items)} behaviors"
         ),
-        message=f"Retrieved {len(items)} behaviors"
+        response,
     )
 
 
@@ -137,60 +288,97 @@ async def create_behavior(
     current_user: User = Depends(get_current_active_user),
 ) -> dict:
     """Create a new behavior."""
-    behavior = Behavior(
-        user_id=current_user.id,
-        name=request.name,
-        description=request.description,
-        category=request.category,
-        min_duration=request.durationMin,
-        typical_duration=request.durationMin,  # Mapping to min since typical is gone in new schema
-        max_duration=request.durationMax,
-        energy_cost=request.energyCost,
-        preferred_time_slots=request.preferredTimeSlots or ["flexible"],
-        is_active=request.isActive,
+    behavior = build_behavior(current_user.id, request)
+    objective_map = await get_objective_map(db, current_user.id)
+    apply_objective_impacts(
+        behavior, request.objectiveImpacts, {obj_id: obj_type for obj_type, obj_id in objective_map.items()}
     )
-    
-    # Map impacts from array to flat fields
-    # We need objective types for this
-    obj_result = await db.execute(select(Objective).where(Objective.user_id == current_user.id))
-    objectives = {obj.id: obj.type.value if hasattr(obj.type, "value") else str(obj.type) for obj in obj_result.scalars().all()}
-    
-    if request.objectiveImpacts:
-        for impact in request.objectiveImpacts:
-            obj_type = objectives.get(impact.objectiveId)
-            if obj_type == "health": behavior.impact_on_health = impact.impactScore
-            elif obj_type == "productivity": behavior.impact_on_productivity = impact.impactScore
-            elif obj_type == "learning": behavior.impact_on_learning = impact.impactScore
-            elif obj_type == "wellness": behavior.impact_on_wellness = impact.impactScore
-            elif obj_type == "social": behavior.impact_on_social = impact.impactScore
-            elif obj_type == "financial": behavior.impact_on_financial = impact.impactScore
-            elif obj_type == "creativity": behavior.impact_on_creativity = impact.impactScore
-            elif obj_type == "mindfulness": behavior.impact_on_mindfulness = impact.impactScore
 
     db.add(behavior)
     await db.commit()
     await db.refresh(behavior)
+    await cache.invalidate_user(current_user.id, "behaviors")
 
-    objective_map = {v: k for k, v in objectives.items()}
     return ApiResponse(
         data=map_behavior_to_response(behavior, objective_map=objective_map),
         message="Behavior created successfully"
     )
 
 
+@router.post("/import", response_model=ApiResponse[BehaviorImportResponse])
+async def import_behaviors(
+    request: BehaviorImportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Create many behaviors in one transaction.
+
+    Each item is validated like a single create. Invalid items, items with
+    objectives the user does not have and names the user already has (case
+    insensitive, including earlier items of the batch) are reported and
+    skipped; the rest are inserted together.
+    """
+    objective_map = await get_objective_map(db, current_user.id)
+    objective_types = {obj_id: obj_type for obj_type, obj_id in objective_map.items()}
+    names_result = await db.execute(select(Behavior.name).where(Behavior.user_id == current_user.id))
+    taken_names = {name.casefold() for name in names_result.scalars().all()}
+
+    behaviors = []
+    results = []
+    for index, item in enumerate(request.items):
+        try:
+            data = BehaviorCreate.model_validate(item)
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()]
+            results.append(BehaviorImportItemResult(index=index, status="invalid", errors=errors))
+            continue
+
+        behavior = build_behavior(current_user.id, data)
+        behavior.id = uuid4()
+        unknown = apply_objective_impacts(behavior, data.objectiveImpacts, objective_types)
+        if unknown:
+            errors = [f"objectiveImpacts: unknown objective {objective_id}" for objective_id in unknown]
+            results.append(BehaviorImportItemResult(index=index, status="invalid", errors=errors))
+            continue
+
+        name = data.name.casefold()
+        if name in taken_names:
+            results.append(BehaviorImportItemResult(index=index, status="duplicate"))
+            continue
+        taken_names.add(name)
+
+        behaviors.append(behavior)
+        results.append(BehaviorImportItemResult(index=index, status="created", id=behavior.id))
+
+    if behaviors:
+        # One flush: a multi-row INSERT for the whole batch
+        db.add_all(behaviors)
+        await db.commit()
+        await cache.invalidate_user(current_user.id, "behaviors")
+
+    counts = Counter(r.status for r in results)
+    return ApiResponse(
+        data=BehaviorImportResponse(
+            created=counts["created"],
+            invalid=counts["invalid"],
+            duplicates=counts["duplicate"],
+            results=results,
+        ),
+        message=f"Imported {counts['created']} of {len(results)} behaviors"
+    )
+
+
 @router.get("/objectives", response_model=ApiResponse[List[dict]])
 async def list_objectives(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> dict:
     """List user objectives."""
-    result = await db.execute(
-        select(Objective).where(Objective.user_id == current_user.id)
-    )
-    objectives = result.scalars().all()
-
-    return ApiResponse(
-        data=[
+    async def load():
+        result = await db.execute(
+            select(Objective).where(Objective.user_id == current_user.id)
+        )
+        return [
             {
                 "id": str(obj.id),
                 "userId": str(obj.user_id),
@@ -199,8 +387,17 @@ async def list_objectives(
                 "priority": int((obj.weight or 0.5) * 10),
                 "createdAt": obj.created_at.isoformat(),
             }
-            for obj in objectives
-        ],
+            for obj in result.scalars().all()
+        ]
+
+    objectives = await cache.get_or_set(
+        cache.user_key(current_user.id, "objectives"),
+        load,
+        tags=[cache.user_tag(current_user.id, "objectives")],
+    )
+
+    return ApiResponse(
+        data=objectives,
         message="Objectives retrieved successfully"
     ).dict(exclude_none=True)
 
@@ -246,6 +443,8 @@ async def update_behavior(
     if not behavior:
         raise HTTPException(status_code=404, detail="Behavior not found")
 
+    previous_values = progress_values(behavior)
+
     # Update fields
     if request.name is not None:
         behavior.name = request.name
@@ -264,25 +463,22 @@ async def update_behavior(
     if request.isActive is not None:
         behavior.is_active = request.isActive
 
+    objective_map = await get_objective_map(db, current_user.id)
     if request.objectiveImpacts is not None:
-        obj_result = await db.execute(select(Objective).where(Objective.user_id == current_user.id))
-        objectives = {obj.id: obj.type.value if hasattr(obj.type, "value") else str(obj.type) for obj in obj_result.scalars().all()}
-        
-        for impact in request.objectiveImpacts:
-            obj_type = objectives.get(impact.objectiveId)
-            if obj_type == "health": behavior.impact_on_health = impact.impactScore
-            elif obj_type == "productivity": behavior.impact_on_productivity = impact.impactScore
-            elif obj_type == "learning": behavior.impact_on_learning = impact.impactScore
-            elif obj_type == "wellness": behavior.impact_on_wellness = impact.impactScore
-            elif obj_type == "social": behavior.impact_on_social = impact.impactScore
-            elif obj_type == "financial": behavior.impact_on_financial = impact.impactScore
-            elif obj_type == "creativity": behavior.impact_on_creativity = impact.impactScore
-            elif obj_type == "mindfulness": behavior.impact_on_mindfulness = impact.impactScore
+        apply_objective_impacts(
+            behavior, request.objectiveImpacts, {obj_id: obj_type for obj_type, obj_id in objective_map.items()}
+        )
+
+    # Daily totals are valued at the behavior's current energy and impacts;
+    # clients resend unchanged values with every edit, so compare them
+    progress_changed = progress_values(behavior) != previous_values
+    if progress_changed:
+        await refresh_behavior_progress(db, current_user.id, behavior.id)
 
     await db.commit()
     await db.refresh(behavior)
+    await cache.invalidate_user(current_user.id, "behaviors", *(["completions"] if progress_changed else []))
 
-    objective_map = await get_objective_map(db, current_user.id)
     return ApiResponse(
         data=map_behavior_to_response(behavior, objective_map=objective_map),
         message="Behavior updated successfully"
@@ -306,8 +502,16 @@ async def delete_behavior(
     if not behavior:
         raise HTTPException(status_code=404, detail="Behavior not found")
 
+    # Its completion logs go with it, so they leave the daily totals too
+    logs = await db.execute(
+        select(CompletionLog.id, CompletionLog.completed_at, CompletionLog.behavior_id, CompletionLog.actual_duration)
+        .where(CompletionLog.behavior_id == behavior_id)
+    )
+    await remove_completions(db, current_user.id, logs.all())
     await db.delete(behavior)
     await db.commit()
+    # Scheduled entries and completion logs cascade with the behavior
+    await cache.invalidate_user(current_user.id, "behaviors", "runs", "completions")
 
     return ApiResponse(
         success=True,
@@ -0,0 +1,228 @@
+"""Streaming exports of a user's full history.
+
+Rows are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and written to the response one batch of
+EXPORT_BATCH_SIZE rows at a time as NDJSON or CSV, so memory stays constant
+however long the history is. Completion logs archived past the retention
+window are not included: they only remain as monthly rollups and the
+archive files.
+
+Each running export holds an analytics connection until the download ends,
+so at most EXPORT_MAX_CONCURRENT run per worker; further ones get a 429
+rather than starving the analytics endpoints of connections.
+"""
+import csv
+import io
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import AsyncIterator, List, Literal, Optional, Sequence
+
+import orjson
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_analytics_read_db, get_current_active_user
+from app.api.responses import ORJSON_OPTIONS
+from app.api.v1.analytics import day_start
+from app.core import settings
+from app.core.exceptions import RateLimitExceededError
+from app.models import Behavior, CompletionLog, OptimizationRun, ScheduledBehavior, User
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ExportSlots:
+    """Counts running exports and rejects new ones past the limit."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.running = 0
+        self.rejected = 0
+
+    def claim(self) -> None:
+        """Take a slot, or raise RateLimitExceededError if all are in use."""
+        if self.running >= settings.EXPORT_MAX_CONCURRENT:
+            self.rejected += 1
+            raise RateLimitExceededError(
+                "Too many exports in progress",
+                detail="Exports are busy, please retry shortly",
+            )
+        self.running += 1
+
+    def release(self) -> None:
+        """Give a slot back."""
+        self.running -= 1
+
+
+export_slots = ExportSlots()
+
+
+class ExportResponse(StreamingResponse):
+    """Streaming response that frees its export slot however the download ends."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Runs stream_rows' cleanup when the client leaves mid-download
+            await self.body_iterator.aclose()
+            export_slots.release()
+
+
+def _csv_value(value):
+    """Flatten a column value for a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value, option=ORJSON_OPTIONS).decode()
+    return value
+
+
+def encode_rows(rows: Sequence[Sequence], columns: List[str], export_format: ExportFormat) -> bytes:
+    """Encode a batch of rows as NDJSON lines or CSV records."""
+    if export_format == "ndjson":
+        return b"".join(
+            orjson.dumps(dict(zip(columns, row)), option=ORJSON_OPTIONS) + b"\n" for row in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(db: AsyncSession, query: Select, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """Encode the rows of a query batch by batch from a server-side cursor."""
+    try:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+        if export_format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(columns)
+            yield buffer.getvalue().encode()
+        async for rows in result.partitions():
+            yield encode_rows(rows, columns, export_format)
+    finally:
+        # The request's session outlives the dependency while the body streams
+        await db.close()
+
+
+def export_response(db: AsyncSession, query: Select, export_format: ExportFormat, name: str) -> StreamingResponse:
+    """Stream a query as a downloadable NDJSON or CSV file, if an export slot is free."""
+    filename = f"{name}-{date.today():%Y%m%d}.{export_format}"
+    export_slots.claim()
+    return ExportResponse(
+        stream_rows(db, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/completions", response_class=StreamingResponse)
+async def export_completions(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_analytics_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """Export completion logs, oldest first (``since``/``until`` are inclusive days)."""
+    query = (
+        select(
+            CompletionLog.id,
+            CompletionLog.completed_at,
+            CompletionLog.behavior_id,
+            Behavior.name.label("behavior_name"),
+            CompletionLog.optimization_run_id,
+            CompletionLog.actual_duration,
+            CompletionLog.satisfaction_score,
+            CompletionLog.notes,
+            CompletionLog.context,
+        )
+        .join(Behavior, Behavior.id == CompletionLog.behavior_id)
+        .where(CompletionLog.user_id == current_user.id)
+        .order_by(CompletionLog.completed_at, CompletionLog.id)
+    )
+    if since is not None:
+        query = query.where(CompletionLog.completed_at >= day_start(since))
+    if until is not None:
+        query = query.where(CompletionLog.completed_at < day_start(until + timedelta(days=1)))
+    return export_response(db, query, export_format, "completions")
+
+
+@router.get("/runs", response_class=StreamingResponse)
+async def export_runs(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_analytics_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """Export optimization runs (without their packed results), oldest first."""
+    query = (
+        select(
+            OptimizationRun.id,
+            OptimizationRun.status,
+            OptimizationRun.solver,
+            OptimizationRun.start_date,
+            OptimizationRun.end_date,
+            OptimizationRun.time_periods,
+            OptimizationRun.total_objective_value,
+            OptimizationRun.execution_time_seconds,
+            OptimizationRun.created_at,
+        )
+        .where(OptimizationRun.user_id == current_user.id)
+        .order_by(OptimizationRun.start_date, OptimizationRun.created_at, OptimizationRun.id)
+    )
+    if since is not None:
+        query = query.where(OptimizationRun.start_date >= since)
+    if until is not None:
+        query = query.where(OptimizationRun.start_date <= until)
+    return export_response(db, query, export_format, "runs")
+
+
+@router.get("/schedules", response_class=StreamingResponse)
+async def export_schedules(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    since: Optional[date] = Query(None),
+    until: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_analytics_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """Export scheduled behaviors of every run, by run date and time period."""
+    query = (
+        select(
+            ScheduledBehavior.id,
+            ScheduledBehavior.optimization_run_id,
+            OptimizationRun.start_date.label("date"),
+            ScheduledBehavior.behavior_id,
+            Behavior.name.label("behavior_name"),
+            ScheduledBehavior.time_period,
+            ScheduledBehavior.scheduled_duration,
+            ScheduledBehavior.is_scheduled,
+        )
+        .join(OptimizationRun, OptimizationRun.id == ScheduledBehavior.optimization_run_id)
+        .join(Behavior, Behavior.id == ScheduledBehavior.behavior_id)
+        .where(OptimizationRun.user_id == current_user.id)
+        .order_by(OptimizationRun.start_date, OptimizationRun.id, ScheduledBehavior.time_period, ScheduledBehavior.id)
+    )
+    if since is not None:
+        query = query.where(OptimizationRun.start_date >= since)
+    if until is not None:
+        query = query.where(OptimizationRun.start_date <= until)
+    return export_response(db, query, export_format, "schedules")
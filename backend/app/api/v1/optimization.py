@@ -1,15 +1,20 @@
 """Optimization routes."""
+import asyncio
 import logging
 from datetime import datetime, timezone, date as date_class
 from uuid import uuid4, UUID
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert
 
-from app.api.deps import get_db, get_current_active_user
-from app.core import settings
+from app.api.conditional import ConditionalGet
+from app.api.deps import get_db, get_read_db, get_current_active_user
+from app.api.responses import model_response, sse_event
+from app.api.pagination import paginate_by_created_at, next_cursor
+from app.core import settings, cache, BehaviorOptimizationException, RateLimitExceededError
 from app.models import (
     User,
     Behavior,
@@ -21,8 +26,14 @@ from app.models import (
 from app.optimization import (
     LinearSolver,
     OptimizationProblem,
+    OptimizationSolution,
     BehaviorScheduleInput,
     ConstraintInput,
+    SolverProgress,
+    ImpactMatrix,
+    decode_results,
+    encode_results,
+    solver_pool,
 )
 from app.schemas.api import ApiResponse
 from app.schemas.optimization import (
@@ -30,29 +41,29 @@ from app.schemas.optimization import (
     OptimizationResult,
     OptimizationRunResponse,
     OptimizationHistoryResponse,
+    OptimizationProgress,
     ScheduledBehaviorResponse,
     ObjectiveContributionSchema,
 )
-from app.api.v1.behaviors import map_behavior_to_response, get_objective_map
+from app.api.v1.behaviors import map_behavior_to_response, get_objective_map, build_objective_map
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/optimization", tags=["optimization"])
 
 
-async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User, include_schedule: bool = True) -> OptimizationRunResponse:
-    """Map OptimizationRun model to OptimizationRunResponse schema."""
-    # Fetch scheduled behaviors with their behavior details
-    scheduled_result = await db.execute(
-        select(ScheduledBehavior, Behavior)
-        .join(Behavior)
-        .where(ScheduledBehavior.optimization_run_id == run.id)
-        .order_by(ScheduledBehavior.time_period)
-    )
-    scheduled_items = scheduled_result.all()
-    
-    objective_map = await get_objective_map(db, user.id)
-    
+def build_run_response(
+    run: OptimizationRun,
+    scheduled_items: List[Tuple[UUID, Behavior, int, int]],
+    objective_map: Dict[str, UUID],
+    include_schedule: bool = True,
+    impact_matrix: Optional[ImpactMatrix] = None,
+):
+    """Build OptimizationRunResponse (and schedule) from already-loaded data.
+
+    ``scheduled_items`` holds ``(scheduled_behavior_id, behavior, time_period,
+    scheduled_duration)`` tuples ordered by time period.
+    """
     # helper for time calculation (15min periods)
     def period_to_time(p):
         total_mins = p * 15
@@ -61,19 +72,21 @@ async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User
         m = day_mins % 60
         return f"{h:02d}:{m:02d}"
 
+    if impact_matrix is None:
+        impact_matrix = ImpactMatrix.from_behaviors({b.id: b for _, b, _, _ in scheduled_items}.values())
+
     scheduled_behaviors = []
     total_duration = 0
     total_energy = 0
-    for s, b in scheduled_items:
-        duration = s.scheduled_duration
-        start_time = period_to_time(s.time_period)
-        end_time = period_to_time(s.time_period + (duration // 15))
-        
+    for scheduled_id, b, time_period, duration in scheduled_items:
+        start_time = period_to_time(time_period)
+        end_time = period_to_time(time_period + (duration // 15))
+
         scheduled_behaviors.append(
             ScheduledBehaviorResponse(
-                id=s.id,
-                behaviorId=s.behavior_id,
-                behavior=map_behavior_to_response(b, objective_map=objective_map),
+                id=scheduled_id,
+                behaviorId=b.id,
+                behavior=map_behavior_to_response(b, objective_map=objective_map, impact_matrix=impact_matrix),
                 scheduledDate=run.start_date,
                 timeSlot="flexible", # Standardized for generated schedule
                 startTime=start_time,
@@ -86,9 +99,10 @@ async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User
         total_energy += b.energy_cost
 
     # Reconstruct contributions from results JSON
+    results = decode_results(run.results)
     contributions = []
-    if run.results and "objective_contributions" in run.results:
-        for obj_type, data in run.results["objective_contributions"].items():
+    if results:
+        for obj_type, data in results.objective_contributions.items():
             obj_id = objective_map.get(obj_type)
             if obj_id:
                 contributions.append(
@@ -104,7 +118,7 @@ async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User
         id=run.id,
         user_id=run.user_id,
         status=run.status.value if hasattr(run.status, "value") else str(run.status),
-        solver_status=run.results.get("status") if run.results else None,
+        solver_status=results.status if results else None,
         scheduled_behaviors=scheduled_behaviors,
         objective_contributions=contributions,
         total_score=run.total_objective_value or 0.0,
@@ -114,14 +128,14 @@ async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User
         created_at=run.created_at,
         completed_at=run.updated_at,
     )
-    
+
     if not include_schedule:
         return run_response
 
     from app.schemas.schedule import DailySchedule
     schedule = DailySchedule(
         id=run.id,
-        user_id=user.id,
+        user_id=run.user_id,
         date=run.start_date,
         scheduled_behaviors=scheduled_behaviors,
         total_duration=total_duration,
@@ -129,137 +143,202 @@ async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User
         objective_scores=contributions,
         created_at=run.created_at,
     )
-    
+
     return run_response, schedule
 
 
-@router.post("/solve", response_model=ApiResponse[OptimizationResult])
-async def solve_optimization(
+async def map_run_to_response(db: AsyncSession, run: OptimizationRun, user: User, include_schedule: bool = True) -> OptimizationRunResponse:
+    """Map OptimizationRun model to OptimizationRunResponse schema."""
+    # Fetch scheduled behaviors with their behavior details
+    scheduled_result = await db.execute(
+        select(ScheduledBehavior, Behavior)
+        .join(Behavior)
+        .where(ScheduledBehavior.optimization_run_id == run.id)
+        .order_by(ScheduledBehavior.time_period)
+    )
+    scheduled_items = [
+        (s.id, b, s.time_period, s.scheduled_duration)
+        for s, b in scheduled_result.all()
+    ]
+
+    objective_map = await get_objective_map(db, user.id)
+
+    return build_run_response(run, scheduled_items, objective_map, include_schedule)
+
+
+async def load_optimization_problem(
+    db: AsyncSession,
+    current_user: User,
     request: OptimizationRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> dict:
-    """Solve optimization problem for user."""
-    try:
-        # Load user data
-        behaviors_result = await db.execute(
-            select(Behavior).where(
-                (Behavior.user_id == current_user.id) & (Behavior.is_active == True)
-            )
+) -> Tuple[OptimizationProblem, List[Behavior], List[Objective]]:
+    """Load the user's behaviors, objectives and constraints into a problem."""
+    behaviors_result = await db.execute(
+        select(Behavior).where(
+            (Behavior.user_id == current_user.id) & (Behavior.is_active == True)
         )
-        behaviors_db = behaviors_result.scalars().all()
-
-        if not behaviors_db:
-            raise HTTPException(
-                status_code=422,
-                detail="No active behaviors found. Please create behaviors first.",
-            )
+    )
+    behaviors_db = behaviors_result.scalars().all()
 
-        objectives_result = await db.execute(
-            select(Objective).where(Objective.user_id == current_user.id)
+    if not behaviors_db:
+        raise HTTPException(
+            status_code=422,
+            detail="No active behaviors found. Please create behaviors first.",
         )
-        objectives_db = objectives_result.scalars().all()
 
-        if not objectives_db:
-            raise HTTPException(
-                status_code=422,
-                detail="No objectives found. Please set objectives first.",
-            )
+    objectives_result = await db.execute(
+        select(Objective).where(Objective.user_id == current_user.id)
+    )
+    objectives_db = objectives_result.scalars().all()
 
-        constraints_result = await db.execute(
-            select(Constraint).where(
-                (Constraint.user_id == current_user.id) & (Constraint.is_active == True)
-            )
+    if not objectives_db:
+        raise HTTPException(
+            status_code=422,
+            detail="No objectives found. Please set objectives first.",
         )
-        constraints_db = constraints_result.scalars().all()
-
-        # Convert to optimization inputs
-        behaviors = [
-            BehaviorScheduleInput(
-                id=b.id,
-                name=b.name,
-                min_duration=b.min_duration,
-                typical_duration=b.typical_duration,
-                max_duration=b.max_duration,
-                energy_cost=b.energy_cost,
-                impacts=b.get_all_impacts(),
-                preferred_time_slots=[s.value if hasattr(s, "value") else s for s in b.preferred_time_slots],
-            )
-            for b in behaviors_db
-        ]
-
-        objectives = {obj.type.value if hasattr(obj.type, "value") else str(obj.type): obj.weight for obj in objectives_db}
 
-        constraints = [
-            ConstraintInput(
-                type=c.type.value if hasattr(c.type, "value") else str(c.type),
-                parameters=c.parameters,
-                is_active=c.is_active,
-            )
-            for c in constraints_db
-        ]
-
-        # Determine time periods and dates
-        start_date = request.targetDate or date_class.today()
-        # For simplicity, optimize for 1 day if not specified. Original was session setting.
-        time_periods = 1
-        end_date = start_date
-
-        # Create optimization problem
-        problem = OptimizationProblem(
-            user_id=current_user.id,
-            behaviors=behaviors,
-            objectives=objectives,
-            constraints=constraints,
-            start_date=start_date,
-            end_date=end_date,
-            time_periods=time_periods,
+    constraints_result = await db.execute(
+        select(Constraint).where(
+            (Constraint.user_id == current_user.id) & (Constraint.is_active == True)
         )
+    )
+    constraints_db = constraints_result.scalars().all()
+
+    # Convert to optimization inputs; the impact matrix is shared with the solver
+    # and the response mapping
+    impact_matrix = ImpactMatrix.from_behaviors(behaviors_db)
+    behaviors = [
+        BehaviorScheduleInput(
+            id=b.id,
+            name=b.name,
+            min_duration=b.min_duration,
+            typical_duration=b.typical_duration,
+            max_duration=b.max_duration,
+            energy_cost=b.energy_cost,
+            impacts=impact_matrix.impacts(b.id),
+            preferred_time_slots=[s.value if hasattr(s, "value") else s for s in b.preferred_time_slots],
+        )
+        for b in behaviors_db
+    ]
 
-        # Solve
-        optimization_run_id = uuid4()
-        solver = LinearSolver(timeout_seconds=settings.OPTIMIZATION_TIMEOUT_SECONDS)
-        solution = solver.solve(problem, optimization_run_id)
-
-        # Save to database
-        run = OptimizationRun(
-            id=optimization_run_id,
-            user_id=current_user.id,
-            status="completed" if solution.status == "optimal" else "feasible",
-            solver="linear",
-            start_date=start_date,
-            end_date=end_date,
-            time_periods=time_periods,
-            total_objective_value=solution.total_objective_value,
-            execution_time_seconds=solution.execution_time_seconds,
-            results=solution.to_dict(),
-            diagnostics=solution.diagnostics,
+    objectives = {obj.type.value if hasattr(obj.type, "value") else str(obj.type): obj.weight for obj in objectives_db}
+
+    constraints = [
+        ConstraintInput(
+            type=c.type.value if hasattr(c.type, "value") else str(c.type),
+            parameters=c.parameters,
+            is_active=c.is_active,
         )
-        db.add(run)
-
-        # Save scheduled behaviors
-        for item in solution.schedule_items:
-            scheduled = ScheduledBehavior(
-                optimization_run_id=optimization_run_id,
-                behavior_id=item.behavior_id,
-                time_period=item.time_period,
-                scheduled_duration=item.scheduled_duration,
-                is_scheduled=item.is_scheduled,
+        for c in constraints_db
+    ]
+
+    # Determine time periods and dates
+    start_date = request.targetDate or date_class.today()
+    # For simplicity, optimize for 1 day if not specified. Original was session setting.
+    time_periods = 1
+    end_date = start_date
+
+    problem = OptimizationProblem(
+        user_id=current_user.id,
+        behaviors=behaviors,
+        objectives=objectives,
+        constraints=constraints,
+        start_date=start_date,
+        end_date=end_date,
+        time_periods=time_periods,
+        impact_matrix=impact_matrix,
+    )
+    return problem, behaviors_db, objectives_db
+
+
+async def save_optimization_result(
+    db: AsyncSession,
+    current_user: User,
+    problem: OptimizationProblem,
+    solution: OptimizationSolution,
+    behaviors_db: List[Behavior],
+    objectives_db: List[Objective],
+) -> OptimizationResult:
+    """Persist a solved run with its schedule and build the API result."""
+    run = OptimizationRun(
+        id=solution.optimization_run_id,
+        user_id=current_user.id,
+        status="completed" if solution.status == "optimal" else "feasible",
+        solver="linear",
+        start_date=problem.start_date,
+        end_date=problem.end_date,
+        time_periods=problem.time_periods,
+        total_objective_value=solution.total_objective_value,
+        execution_time_seconds=solution.execution_time_seconds,
+        results=encode_results(solution),
+        diagnostics=solution.diagnostics,
+    )
+    db.add(run)
+
+    # Save scheduled behaviors in a single executemany round trip.
+    # IDs are generated client-side so the response can be built from
+    # memory instead of re-reading the rows after commit.
+    behaviors_by_id = {b.id: b for b in behaviors_db}
+    scheduled_rows = [
+        {
+            "id": uuid4(),
+            "optimization_run_id": run.id,
+            "behavior_id": item.behavior_id,
+            "time_period": item.time_period,
+            "scheduled_duration": item.scheduled_duration,
+            "is_scheduled": item.is_scheduled,
+        }
+        for item in sorted(solution.schedule_items, key=lambda i: i.time_period)
+    ]
+    await db.flush()
+    if scheduled_rows:
+        await db.execute(insert(ScheduledBehavior), scheduled_rows)
+
+    await db.commit()
+    await cache.invalidate_user(current_user.id, "runs")
+
+    # Build response from the solution and the behaviors already loaded
+    run_response, schedule = build_run_response(
+        run,
+        [
+            (
+                row["id"],
+                behaviors_by_id[row["behavior_id"]],
+                row["time_period"],
+                row["scheduled_duration"],
             )
-            db.add(scheduled)
+            for row in scheduled_rows
+        ],
+        build_objective_map(objectives_db),
+        impact_matrix=problem.impact_matrix,
+    )
+    return OptimizationResult(run=run_response, schedule=schedule)
+
 
+@router.post("/solve", response_model=ApiResponse[OptimizationResult])
+async def solve_optimization(
+    request: OptimizationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Solve optimization problem for user."""
+    try:
+        problem, behaviors_db, objectives_db = await load_optimization_problem(db, current_user, request)
+        # End the read transaction so the connection goes back to the pool
+        # instead of idling for the whole solve (loaded objects stay usable)
         await db.commit()
-        await db.refresh(run)
 
-        # Build response using helper
-        run_response, schedule = await map_run_to_response(db, run, current_user)
-        
+        # Solve in the worker pool so the event loop stays responsive
+        solver = LinearSolver(timeout_seconds=settings.OPTIMIZATION_TIMEOUT_SECONDS)
+        solution = await solver_pool.solve(solver, problem, uuid4())
+
+        result = await save_optimization_result(db, current_user, problem, solution, behaviors_db, objectives_db)
+
         return ApiResponse(
-            data=OptimizationResult(run=run_response, schedule=schedule),
+            data=result,
             message="Optimization completed successfully"
         ).dict(exclude_none=True)
 
-    except HTTPException:
+    except (HTTPException, RateLimitExceededError):
         raise
     except Exception as e:
         logger.exception(f"Optimization error: {str(e)}")
@@ -269,54 +348,171 @@ async def solve_optimization(
         )
 
 
+async def optimization_events(
+    db: AsyncSession,
+    current_user: User,
+    problem: OptimizationProblem,
+    behaviors_db: List[Behavior],
+    objectives_db: List[Objective],
+) -> AsyncIterator[bytes]:
+    """Run a solve and yield its status, progress and result as SSE messages."""
+    run_id = uuid4()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_start() -> None:
+        events.put_nowait(("status", OptimizationProgress(runId=run_id, status="running")))
+
+    def on_progress(progress: SolverProgress) -> None:
+        events.put_nowait((
+            "progress",
+            OptimizationProgress(
+                runId=run_id,
+                status="running",
+                objective=progress.objective,
+                bestBound=progress.best_bound,
+                gap=progress.gap,
+                nodes=progress.nodes,
+                elapsedSeconds=round(progress.elapsed_seconds, 3),
+            ),
+        ))
+
+    solver = LinearSolver(timeout_seconds=settings.OPTIMIZATION_TIMEOUT_SECONDS)
+    task = asyncio.ensure_future(solver_pool.solve(solver, problem, run_id, on_start, on_progress))
+    try:
+        yield sse_event("status", OptimizationProgress(runId=run_id, status="queued"))
+        while not task.done() or not events.empty():
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait(
+                {getter, task},
+                timeout=settings.SOLVER_STREAM_KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getter in done:
+                yield sse_event(*getter.result())
+            else:
+                getter.cancel()
+                if not done:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n"
+
+        solution = task.result()
+        yield sse_event("status", OptimizationProgress(runId=run_id, status="saving"))
+        result = await save_optimization_result(db, current_user, problem, solution, behaviors_db, objectives_db)
+    except Exception as e:
+        # A save that failed part way must not leave its transaction open
+        await db.rollback()
+        if isinstance(e, BehaviorOptimizationException):
+            error = {"error": e.__class__.__name__, "detail": e.detail, "status_code": e.status_code}
+        else:
+            logger.exception(f"Optimization error: {str(e)}")
+            error = {"error": "OptimizationError", "detail": f"Optimization failed: {str(e)}", "status_code": 500}
+        yield sse_event("status", OptimizationProgress(runId=run_id, status="failed"))
+        yield sse_event("error", error)
+        return
+    finally:
+        if not task.done():
+            # Client went away; the solve finishes in the pool but is not saved
+            logger.info(f"Optimization stream {run_id} closed before the solver finished")
+        # The request's session outlives the dependency while the body streams
+        await db.close()
+
+    yield sse_event("result", ApiResponse[OptimizationResult](data=result, message="Optimization completed successfully"))
+    yield sse_event("status", OptimizationProgress(runId=run_id, status="completed"))
+
+
+@router.post("/solve/stream", response_class=StreamingResponse)
+async def stream_optimization(
+    request: OptimizationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """Solve like ``/solve`` but stream progress as Server-Sent Events.
+
+    Emits ``status`` events (queued, running, saving, completed, failed),
+    ``progress`` events with the incumbent objective, best bound and gap as
+    the solver improves, then a ``result`` event carrying the same payload
+    as ``/solve`` (or an ``error`` event).
+    """
+    # Overload and validation errors (no behaviors/objectives) are reported before streaming starts
+    solver_pool.ensure_capacity()
+    problem, behaviors_db, objectives_db = await load_optimization_problem(db, current_user, request)
+    # Release the connection while the solver runs; saving checks out a new one
+    await db.commit()
+
+    return StreamingResponse(
+        optimization_events(db, current_user, problem, behaviors_db, objectives_db),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/history", response_model=ApiResponse[OptimizationHistoryResponse])
 async def get_optimization_history(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-) -> dict:
-    """Get optimization run history."""
-    # Get total count
-    result = await db.execute(
-        select(func.count(OptimizationRun.id)).where(
-            OptimizationRun.user_id == current_user.id
+    cursor: Optional[str] = Query(None),
+    include_total: Optional[bool] = Query(None),
+) -> Response:
+    """Get optimization run history, newest first.
+
+    Supports keyset pagination through ``cursor``/``nextCursor`` in the same
+    way as the behaviors list.
+    """
+    total = None
+    if include_total or (include_total is None and cursor is None):
+        result = await db.execute(
+            select(func.count(OptimizationRun.id)).where(
+                OptimizationRun.user_id == current_user.id
+            )
         )
-    )
-    total = result.scalar() or 0
+        total = result.scalar() or 0
 
     # Get paginated runs
-    result = await db.execute(
-        select(OptimizationRun)
-        .where(OptimizationRun.user_id == current_user.id)
-        .order_by(OptimizationRun.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    query = paginate_by_created_at(
+        select(OptimizationRun).where(OptimizationRun.user_id == current_user.id),
+        OptimizationRun,
+        cursor,
+        limit,
+        descending=True,
     )
-    runs = result.scalars().all()
+    if skip and not cursor:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    runs = rows[:limit]
 
     items = []
     for run in runs:
         run_response = await map_run_to_response(db, run, current_user, include_schedule=False)
         items.append(run_response)
 
-    return ApiResponse(
-        data=OptimizationHistoryResponse(
-            total=total,
-            skip=skip,
-            limit=limit,
-            data=items
-        ),
-        message=f"Retrieved {len(items)} optimization runs"
-    ).dict(exclude_none=True)
+    return model_response(
+        ApiResponse[OptimizationHistoryResponse](
+            data=OptimizationHistoryResponse(
+                total=total,
+                skip=skip,
+                limit=limit,
+                nextCursor=next_cursor(rows, limit),
+                data=items
+            ),
+            message=f"Retrieved {len(items)} optimization runs"
+        )
+    )
 
 
-@router.get("/history/{optimization_run_id}", response_model=ApiResponse[OptimizationResult])
+@router.get(
+    "/history/{optimization_run_id}",
+    response_model=ApiResponse[OptimizationResult],
+    dependencies=[Depends(ConditionalGet("runs", "behaviors", "objectives"))],
+)
 async def get_optimization_run(
     optimization_run_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
-) -> dict:
+) -> Response:
     """Get a specific optimization run with full details."""
     result = await db.execute(
         select(OptimizationRun).where(
@@ -331,6 +527,7 @@ async def get_optimization_run(
 
     run_response, schedule = await map_run_to_response(db, run, current_user)
     
-    return ApiResponse(
-        data=OptimizationResult(run=run_response, schedule=schedule)
-    ).dict(exclude_none=True)
+    return model_response(
+        ApiResponse[OptimizationResult](data=OptimizationResult(run=run_response, schedule=schedule)),
+        response,
+    )
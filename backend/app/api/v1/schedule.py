@@ -1,18 +1,28 @@
 """Schedule routes."""
 import logging
+from collections import Counter
 from datetime import date, datetime, timezone
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, delete
 
+from app.analytics import record_completions, remove_completions
+from app.api.conditional import ConditionalGet
 from app.api.deps import get_db, get_current_active_user
+from app.core import cache
 from app.models import User, ScheduledBehavior, OptimizationRun, Behavior, CompletionLog
+from app.optimization import ImpactMatrix, decode_results
 from app.schemas.api import ApiResponse
 from app.schemas.schedule import DailySchedule
 from app.schemas.optimization import ScheduledBehaviorResponse, ObjectiveContributionSchema
-from app.schemas.tracking import CompletionLogCreate
+from app.schemas.tracking import (
+    CompletionLogCreate,
+    BulkCompletionRequest,
+    BulkCompletionItemResult,
+    BulkCompletionResponse,
+)
 from app.api.v1.behaviors import map_behavior_to_response, get_objective_map
 
 logger = logging.getLogger(__name__)
@@ -20,15 +30,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
 
-@router.get("", response_model=ApiResponse[DailySchedule])
-async def get_daily_schedule(
-    date_str: str = Query(None, alias="date"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> dict:
-    """Get daily schedule."""
-    target_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else date.today()
+# Cached schedules depend on these per-user tags
+SCHEDULE_TAGS = ("runs", "completions", "behaviors", "objectives")
+
 
+async def load_daily_schedule(db: AsyncSession, current_user: User, target_date: date) -> ApiResponse[DailySchedule]:
+    """Build the daily schedule response from the database."""
     # 1. Find active run covering the date
     result = await db.execute(
         select(OptimizationRun).where(
@@ -92,6 +99,7 @@ async def get_daily_schedule(
     )
     completed_behaviors = { (str(c.optimization_run_id), str(c.behavior_id)) for c in completion_result.all() }
 
+    impact_matrix = ImpactMatrix.from_behaviors({behavior.id: behavior for _, behavior in items}.values())
     for sb, behavior in items:
         if sb.time_period >= start_p and sb.time_period < end_p:
             start_time = period_to_time(sb.time_period)
@@ -103,7 +111,7 @@ async def get_daily_schedule(
                 ScheduledBehaviorResponse(
                     id=sb.id,
                     behaviorId=behavior.id,
-                    behavior=map_behavior_to_response(behavior, objective_map=objective_map),
+                    behavior=map_behavior_to_response(behavior, objective_map=objective_map, impact_matrix=impact_matrix),
                     scheduledDate=target_date,
                     timeSlot="flexible",
                     startTime=start_time,
@@ -116,9 +124,10 @@ async def get_daily_schedule(
             total_energy += behavior.energy_cost
 
     # Reconstruct contributions for objective_scores
+    results = decode_results(run.results)
     contributions = []
-    if run.results and "objective_contributions" in run.results:
-        for obj_type, data in run.results["objective_contributions"].items():
+    if results:
+        for obj_type, data in results.objective_contributions.items():
             obj_id = objective_map.get(obj_type)
             if obj_id:
                 contributions.append(
@@ -145,6 +154,135 @@ async def get_daily_schedule(
     )
 
 
+@router.get(
+    "",
+    response_model=ApiResponse[DailySchedule],
+    dependencies=[Depends(ConditionalGet(*SCHEDULE_TAGS))],
+)
+async def get_daily_schedule(
+    date_str: str = Query(None, alias="date"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Get daily schedule."""
+    target_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else date.today()
+
+    async def load():
+        response = await load_daily_schedule(db, current_user, target_date)
+        return {"message": response.message, "data": response.data.model_dump(mode="json")}
+
+    cached = await cache.get_or_set(
+        cache.user_key(current_user.id, "schedule", target_date.isoformat()),
+        load,
+        tags=[cache.user_tag(current_user.id, name) for name in SCHEDULE_TAGS],
+    )
+    return ApiResponse(
+        data=DailySchedule.model_validate(cached["data"]),
+        message=cached["message"]
+    )
+
+
+@router.post("/completions", response_model=ApiResponse[BulkCompletionResponse])
+async def sync_completions(
+    request: BulkCompletionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Mark many scheduled behaviors complete/incomplete in one transaction."""
+    # Last write wins when a client sends the same scheduled behavior twice
+    latest = {item.scheduledBehaviorId: item for item in request.items}
+
+    # 1. Resolve scheduled behaviors, restricted to runs owned by the user
+    scheduled_result = await db.execute(
+        select(ScheduledBehavior)
+        .join(OptimizationRun, ScheduledBehavior.optimization_run_id == OptimizationRun.id)
+        .where(
+            (ScheduledBehavior.id.in_(latest.keys())) &
+            (OptimizationRun.user_id == current_user.id)
+        )
+    )
+    scheduled_by_id = {sb.id: sb for sb in scheduled_result.scalars().all()}
+
+    # 2. Load existing logs for every (run, behavior) pair touched by the batch
+    existing = {}
+    if scheduled_by_id:
+        run_ids = {sb.optimization_run_id for sb in scheduled_by_id.values()}
+        behavior_ids = {sb.behavior_id for sb in scheduled_by_id.values()}
+        log_result = await db.execute(
+            select(
+                CompletionLog.id,
+                CompletionLog.optimization_run_id,
+                CompletionLog.behavior_id,
+                CompletionLog.completed_at,
+                CompletionLog.actual_duration,
+            )
+            .where(
+                (CompletionLog.user_id == current_user.id) &
+                (CompletionLog.optimization_run_id.in_(run_ids)) &
+                (CompletionLog.behavior_id.in_(behavior_ids))
+            )
+        )
+        for log in log_result.all():
+            existing.setdefault((log.optimization_run_id, log.behavior_id), []).append(log)
+
+    # 3. Diff requested state against stored state
+    now = datetime.now(timezone.utc)
+    new_logs = {}
+    stale_logs = []
+    results = []
+    for scheduled_id, item in latest.items():
+        scheduled = scheduled_by_id.get(scheduled_id)
+        if not scheduled:
+            results.append(BulkCompletionItemResult(scheduledBehaviorId=scheduled_id, status="not_found"))
+            continue
+
+        key = (scheduled.optimization_run_id, scheduled.behavior_id)
+        if item.isCompleted:
+            if key in existing or key in new_logs:
+                status = "already_completed"
+            else:
+                new_logs[key] = CompletionLog(
+                    user_id=current_user.id,
+                    behavior_id=scheduled.behavior_id,
+                    optimization_run_id=scheduled.optimization_run_id,
+                    actual_duration=item.actualDuration or scheduled.scheduled_duration,
+                    completed_at=item.completedAt or now,
+                    satisfaction_score=item.satisfactionScore,
+                    notes=item.notes,
+                )
+                status = "completed"
+        elif key in existing or key in new_logs:
+            stale_logs.extend(existing.pop(key, []))
+            new_logs.pop(key, None)
+            status = "uncompleted"
+        else:
+            status = "not_completed"
+        results.append(BulkCompletionItemResult(scheduledBehaviorId=scheduled_id, status=status))
+
+    # 4. Apply all changes with a single commit
+    if new_logs or stale_logs:
+        if stale_logs:
+            await remove_completions(db, current_user.id, stale_logs)
+            await db.execute(delete(CompletionLog).where(CompletionLog.id.in_([log.id for log in stale_logs])))
+        db.add_all(new_logs.values())
+        await record_completions(db, current_user.id, new_logs.values())
+        await db.commit()
+        await cache.invalidate_user(current_user.id, "completions")
+
+    counts = Counter(r.status for r in results)
+
+    return ApiResponse(
+        data=BulkCompletionResponse(
+            completed=counts["completed"],
+            uncompleted=counts["uncompleted"],
+            unchanged=counts["already_completed"] + counts["not_completed"],
+            notFound=counts["not_found"],
+            results=results,
+        ),
+        message=f"Synced {len(results)} completion changes"
+    )
+
+
 @router.post("/{scheduled_behavior_id}/complete", response_model=ApiResponse[dict])
 async def mark_complete(
     scheduled_behavior_id: UUID,
@@ -183,7 +321,9 @@ async def mark_complete(
         completed_at=datetime.now(timezone.utc),
     )
     db.add(completion_log)
+    await record_completions(db, current_user.id, [completion_log])
     await db.commit()
+    await cache.invalidate_user(current_user.id, "completions")
 
     return ApiResponse(
         success=True,
@@ -217,8 +357,10 @@ async def mark_incomplete(
     )
     log = log_result.scalars().first()
     if log:
+        await remove_completions(db, current_user.id, [log])
         await db.delete(log)
         await db.commit()
+        await cache.invalidate_user(current_user.id, "completions")
 
     return ApiResponse(
         success=True,
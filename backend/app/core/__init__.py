@@ -23,7 +23,12 @@ from .security import (
     get_token_payload,
     hash_password,
     verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    password_hash_pool,
 )
+from .cache import cache, Cache, MemoryCacheBackend, RedisCacheBackend
 
 __all__ = [
     "settings",
@@ -47,4 +52,12 @@ __all__ = [
     "get_token_payload",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
+    "password_needs_rehash",
+    "password_hash_pool",
+    "cache",
+    "Cache",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
 ]
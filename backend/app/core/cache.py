@@ -0,0 +1,337 @@
+"""Shared cache layer with pluggable backends.
+
+Values are stored as JSON together with the versions of the tags they depend
+on. Invalidating a tag replaces its version with the current time in
+nanoseconds, which makes every entry that recorded the old version stale
+without enumerating keys, so invalidation works the same on the in-process
+backend and on Redis shared by all workers. Because versions are timestamps
+they also serve as per-user data versions for conditional GETs.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .config import settings
+from .exceptions import CacheError
+from .metrics import cache_requests_total
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+# Tag versions outlive entries so a bump is seen by anything still cached
+TAG_TTL_SECONDS = 86400
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend for development and tests."""
+
+    def __init__(self, max_entries: int = 10000):
+        """Initialize backend."""
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: Optional[int]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Get several values at once."""
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        self._set(key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """Set a value only if the key does not exist."""
+        if self._get(key) is not None:
+            return False
+        self._set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        """Delete a key."""
+        self._data.pop(key, None)
+
+    async def ping(self) -> bool:
+        """Check backend availability."""
+        return True
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+
+class RedisCacheBackend:
+    """Redis backend shared across uvicorn workers."""
+
+    def __init__(self, client):
+        """Initialize backend with a ``redis.asyncio`` compatible client."""
+        self._redis = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        """Create backend from a Redis URL."""
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(str(url)))
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Get several values at once."""
+        return await self._redis.mget(list(keys))
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        await self._redis.set(key, value, ex=ttl)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """Set a value only if the key does not exist."""
+        return bool(await self._redis.set(key, value, ex=ttl, nx=True))
+
+    async def delete(self, key: str) -> None:
+        """Delete a key."""
+        await self._redis.delete(key)
+
+    async def ping(self) -> bool:
+        """Check backend availability."""
+        return bool(await self._redis.ping())
+
+    def clear(self) -> None:
+        """Redis entries expire on their own."""
+
+
+class Cache:
+    """Namespaced cache with TTLs, tag invalidation and single-flight loading.
+
+    Backend errors are logged and treated as misses so an unavailable cache
+    only costs performance.
+    """
+
+    def __init__(self, backend, namespace: str = "habitos", default_ttl: int = 300):
+        """Initialize cache."""
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _record(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        else:
+            self.errors += 1
+        cache_requests_total.labels(result=result).inc()
+
+    def user_key(self, user_id, *parts: Any) -> str:
+        """Build a cache key scoped to a user."""
+        return ":".join([self.namespace, "u", str(user_id), *(str(p) for p in parts)])
+
+    def user_tag(self, user_id, name: str) -> str:
+        """Build a tag scoped to a user."""
+        return f"u:{user_id}:{name}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    async def _resolve_versions(self, tags: Sequence[str], versions: List[Any]) -> List[str]:
+        versions = [v.decode() if isinstance(v, bytes) else v for v in versions]
+
+        # Tags seen for the first time (or evicted) get a fresh unique version
+        for i, version in enumerate(versions):
+            if version is None:
+                fresh = str(time.time_ns())
+                tag_key = self._tag_key(tags[i])
+                if not await self.backend.add(tag_key, fresh.encode(), TAG_TTL_SECONDS):
+                    stored = (await self.backend.get_many([tag_key]))[0]
+                    fresh = stored.decode() if isinstance(stored, bytes) else stored
+                versions[i] = fresh
+        return versions
+
+    async def _read(self, key: str, tags: Sequence[str]) -> Tuple[Optional[Any], List[str]]:
+        """Return (value or None, current tag versions)."""
+        raw, *versions = await self.backend.get_many([key, *(self._tag_key(t) for t in tags)])
+        versions = await self._resolve_versions(tags, versions)
+
+        if raw is None:
+            return None, versions
+        entry = json.loads(raw)
+        if entry["t"] != versions:
+            return None, versions
+        return entry["v"], versions
+
+    async def _write(self, key: str, value: Any, versions: List[str], ttl: Optional[int]) -> None:
+        payload = json.dumps({"t": versions, "v": value}, default=str).encode()
+        await self.backend.set(key, payload, ttl or self.default_ttl)
+
+    async def get(self, key: str, tags: Sequence[str] = ()) -> Optional[Any]:
+        """Get a value if present and none of its tags were invalidated."""
+        try:
+            value, _ = await self._read(key, tags)
+        except Exception as e:
+            self._record("error")
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        if value is None:
+            self._record("miss")
+        else:
+            self._record("hit")
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Sequence[str] = ()) -> None:
+        """Store a JSON-serializable value."""
+        try:
+            _, versions = await self._read(key, tags)
+            await self._write(key, value, versions, ttl)
+        except Exception as e:
+            self._record("error")
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    async def delete(self, key: str) -> None:
+        """Delete a single key."""
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            self._record("error")
+            logger.warning(f"Cache delete failed for {key}: {str(e)}")
+
+    async def tag_versions(self, tags: Sequence[str]) -> Optional[List[str]]:
+        """Get current versions (nanosecond timestamps) of tags, or None on error."""
+        try:
+            versions = await self.backend.get_many([self._tag_key(t) for t in tags])
+            return await self._resolve_versions(tags, versions)
+        except Exception as e:
+            self._record("error")
+            logger.warning(f"Cache tag lookup failed: {str(e)}")
+            return None
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Make every entry depending on any of ``tags`` stale."""
+        for tag in tags:
+            try:
+                await self.backend.set(self._tag_key(tag), str(time.time_ns()).encode(), TAG_TTL_SECONDS)
+            except Exception as e:
+                self._record("error")
+                logger.warning(f"Cache invalidation failed for {tag}: {str(e)}")
+
+    async def invalidate_user(self, user_id, *names: str) -> None:
+        """Invalidate user-scoped tags by name."""
+        await self.invalidate_tags(*(self.user_tag(user_id, name) for name in names))
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+    ) -> Any:
+        """Return a cached value, loading it once per key on a miss.
+
+        Concurrent misses for the same key in this process share one loader
+        call (single-flight) instead of stampeding the database.
+        """
+        versions = None
+        try:
+            value, versions = await self._read(key, tags)
+        except Exception as e:
+            self._record("error")
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            value = None
+        if value is not None:
+            self._record("hit")
+            return value
+        self._record("miss")
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if versions is not None:
+            try:
+                await self._write(key, value, versions, ttl)
+            except Exception as e:
+                self._record("error")
+                logger.warning(f"Cache write failed for {key}: {str(e)}")
+        return value
+
+    async def get_or_set_model(
+        self,
+        key: str,
+        model_cls: Type[M],
+        loader: Callable[[], Awaitable[M]],
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+    ) -> M:
+        """Cache a Pydantic model by its JSON dump."""
+        async def load_dump():
+            return (await loader()).model_dump(mode="json")
+
+        return model_cls.model_validate(await self.get_or_set(key, load_dump, ttl, tags))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def build_cache() -> Cache:
+    """Create the cache configured by settings."""
+    backend_name = settings.CACHE_BACKEND
+    if backend_name == "auto":
+        backend_name = "redis" if settings.REDIS_URL else "memory"
+
+    if backend_name == "redis":
+        if not settings.REDIS_URL:
+            raise CacheError("CACHE_BACKEND=redis requires REDIS_URL")
+        backend = RedisCacheBackend.from_url(settings.REDIS_URL)
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    else:
+        raise CacheError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+
+    return Cache(backend, namespace=settings.CACHE_NAMESPACE, default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS)
+
+
+cache = build_cache()
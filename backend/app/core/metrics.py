@@ -0,0 +1,126 @@
+"""Prometheus metrics for the hot paths.
+
+Each uvicorn worker is a separate process. When ``PROMETHEUS_MULTIPROC_DIR``
+points at a directory shared by the workers (and emptied before they
+start), samples are written there and ``/metrics`` aggregates every worker;
+without it, each worker reports only its own samples.
+"""
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SOLVE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+# HTTP
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+
+# Database
+db_queries_total = Counter("db_queries_total", "SQL statements executed", ["pool"])
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["pool"],
+    buckets=QUERY_BUCKETS,
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=COUNT_BUCKETS,
+)
+db_query_seconds_per_request = Histogram(
+    "db_query_seconds_per_request",
+    "Total SQL time per HTTP request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=QUERY_BUCKETS,
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+db_pool_timeouts_total = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a connection",
+    ["pool"],
+)
+
+# Solver
+solver_queue_depth = Gauge(
+    "solver_queue_depth",
+    "Solves running or waiting for a solver worker",
+    multiprocess_mode="livesum",
+)
+solver_queue_wait_seconds = Histogram(
+    "solver_queue_wait_seconds",
+    "Time solves wait for a solver worker",
+    buckets=SOLVE_BUCKETS,
+)
+solver_solve_duration_seconds = Histogram(
+    "solver_solve_duration_seconds",
+    "Solver run time",
+    ["outcome"],
+    buckets=SOLVE_BUCKETS,
+)
+solver_rejected_total = Counter("solver_rejected_total", "Solves rejected because the queue was full")
+
+# Cache
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ["result"],
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Drop live gauges of this worker from the shared multiprocess directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
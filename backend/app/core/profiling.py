@@ -0,0 +1,206 @@
+"""Opt-in cProfile capture of individual requests.
+
+Only one request per worker process is profiled at a time: cProfile hooks
+the whole interpreter (Python 3.12+) or the event loop thread, so coroutines
+of concurrent requests interleaved on the loop also show up in a profile.
+Solver runs happen in worker threads; on Python < 3.12 they are profiled
+separately via ``profile_thread`` and merged into the request's profile.
+Cross-thread attribution is patchy on 3.12, so the solver's wall time is
+also recorded as an explicit span.
+
+Profiles are written to ``PROFILING_DIR`` (a ``.prof`` pstats dump plus a
+``.json`` summary) so any worker can serve them to the admin endpoints.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+# Python 3.12 profilers see every thread, older ones only the enabling thread
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class RequestProfile:
+    """Call profile of one request, including work it hands to threads."""
+
+    def __init__(self, trigger: str):
+        """Initialize profile."""
+        self.id = uuid4().hex
+        self.trigger = trigger
+        self.profiler = cProfile.Profile()
+        self.thread_profiles: List[cProfile.Profile] = []
+        # Wall time of named off-loop phases (e.g. "solver"), in seconds
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """Accumulate wall time of a named phase."""
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_thread_profile(self, profiler: cProfile.Profile) -> None:
+        """Merge a profile captured in a worker thread."""
+        with self._lock:
+            self.thread_profiles.append(profiler)
+
+    def stats(self) -> pstats.Stats:
+        """Combined statistics."""
+        stats = pstats.Stats(self.profiler)
+        with self._lock:
+            for profiler in self.thread_profiles:
+                stats.add(profiler)
+        return stats
+
+
+# The profile of the request being served in this context, if any
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+_busy = threading.Lock()
+
+
+def choose_trigger(headers: Dict[str, str]) -> Optional[str]:
+    """Decide whether to profile a request; returns the trigger or None."""
+    if not settings.PROFILING_ENABLED:
+        return None
+    token = headers.get(PROFILE_HEADER)
+    if token and settings.PROFILING_TOKEN and token == settings.PROFILING_TOKEN:
+        return "header"
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+@contextmanager
+def profile_request(trigger: str) -> Iterator[Optional[RequestProfile]]:
+    """Profile the enclosed block; yields None when another profile is running."""
+    if not _busy.acquire(blocking=False):
+        yield None
+        return
+
+    profile = RequestProfile(trigger)
+    try:
+        profile.profiler.enable()
+    except ValueError as e:
+        # Another profiler (e.g. a debugger or coverage tool) owns the hook
+        logger.warning(f"Request profiling unavailable: {e}")
+        _busy.release()
+        yield None
+        return
+
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        profile.profiler.disable()
+        current_profile.reset(token)
+        _busy.release()
+
+
+@contextmanager
+def profile_thread(profile: Optional[RequestProfile]) -> Iterator[None]:
+    """Profile work a request runs in a worker thread (no-op when not needed)."""
+    if profile is None or PROFILER_SEES_ALL_THREADS:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profile.add_thread_profile(profiler)
+
+
+class ProfileStore:
+    """Profiles on disk, newest ``max_stored`` kept."""
+
+    def __init__(self, directory: str, max_stored: int):
+        """Initialize store."""
+        self.directory = directory
+        self.max_stored = max_stored
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        if not profile_id.isalnum():
+            raise ValueError("Invalid profile id")
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def save(self, profile: RequestProfile, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a profile and its summary; prune the oldest beyond the limit."""
+        os.makedirs(self.directory, exist_ok=True)
+        stats = profile.stats()
+        summary = {
+            "id": profile.id,
+            "trigger": profile.trigger,
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "totalCalls": stats.total_calls,
+            "spansMs": {name: round(seconds * 1000, 2) for name, seconds in profile.spans.items()},
+            **summary,
+        }
+        stats.dump_stats(self._path(profile.id, ".prof"))
+        with open(self._path(profile.id, ".json"), "w") as f:
+            json.dump(summary, f)
+        self.prune()
+        return summary
+
+    def prune(self) -> None:
+        """Delete profiles beyond ``max_stored``, oldest first."""
+        for summary in self.list()[self.max_stored:]:
+            for suffix in (".prof", ".json"):
+                try:
+                    os.remove(self._path(summary["id"], suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    summaries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(summaries, key=lambda s: s["createdAt"], reverse=True)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Summary of one profile."""
+        try:
+            with open(self._path(profile_id, ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def report(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> str:
+        """Text report of the top functions, as printed by pstats."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.prof_path(profile_id), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def prof_path(self, profile_id: str) -> str:
+        """Path of the raw pstats dump (for snakeviz and friends)."""
+        return self._path(profile_id, ".prof")
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_STORED)
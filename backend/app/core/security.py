@@ -1,11 +1,15 @@
 """Security utilities for authentication and authorization."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 
 import bcrypt
 from jwt import encode, decode, InvalidTokenError
 
 from .config import settings
+from .exceptions import RateLimitExceededError
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -69,3 +73,93 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses a different cost than BCRYPT_ROUNDS."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
+
+
+class PasswordHashPool:
+    """Bounded thread pool that keeps bcrypt work off the event loop.
+
+    At most ``max_workers`` hashes run concurrently; once ``max_pending`` calls
+    are in flight or queued, new ones are rejected with a 429 instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """Initialize pool."""
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run a blocking hash function in the pool."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise RateLimitExceededError(
+                "Too many concurrent authentication requests",
+                detail="Authentication is busy, please retry shortly",
+            )
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, waited, ran = await loop.run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_wait_seconds += waited
+        self.total_run_seconds += ran
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get queue and latency metrics."""
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self.pending, self.max_workers),
+            "queued": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": (self.total_wait_seconds / self.completed * 1000) if self.completed else 0.0,
+            "avg_run_ms": (self.total_run_seconds / self.completed * 1000) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker threads."""
+        self._executor.shutdown(wait=False)
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash password without blocking the event loop."""
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password without blocking the event loop."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
@@ -1,58 +1,298 @@
 """Database initialization and management."""
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Set
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import NullPool
 
+from app.core.cache import cache
 from app.core.config import settings
+from app.db.instrumentation import TimedAsyncAdaptedQueuePool, instrument_engine
 
 # Check if using SQLite
 is_sqlite = str(settings.DATABASE_URL).startswith("sqlite")
 
-# Engine configuration
-engine_kwargs = {
-    "echo": settings.DEBUG,
-}
+logger = logging.getLogger(__name__)
 
-if is_sqlite:
-    from sqlalchemy.pool import StaticPool
-    engine_kwargs.update({
-        "poolclass": StaticPool,
-        "connect_args": {"check_same_thread": False},
-    })
-else:
-    engine_kwargs.update({
-        "pool_size": settings.DATABASE_POOL_SIZE,
-        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
-        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
-    })
 
-if settings.TESTING and not is_sqlite:
-    engine_kwargs["poolclass"] = NullPool
+def async_database_url(url: str) -> str:
+    """Point postgres URLs at the asyncpg driver."""
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://") and "+asyncpg" not in url:
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
 
 # Fix DATABASE_URL for asyncpg
-database_url = str(settings.DATABASE_URL)
-if database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
-elif database_url.startswith("postgresql://") and "+asyncpg" not in database_url:
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+database_url = async_database_url(str(settings.DATABASE_URL))
+
 
-# Create async engine
+def engine_options(
+    workload: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int,
+    sqlite: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Build create_async_engine keyword arguments for one workload."""
+    options: Dict[str, Any] = {"echo": settings.DEBUG}
+
+    if is_sqlite if sqlite is None else sqlite:
+        from sqlalchemy.pool import StaticPool
+        options.update({
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        })
+        return options
+
+    options.update({
+        "poolclass": NullPool if settings.TESTING else TimedAsyncAdaptedQueuePool,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "connect_args": {
+            # asyncpg's own statement cache and SQLAlchemy's prepared statement
+            # cache; set both to 0 behind PgBouncer in transaction mode
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "application_name": f"habitos-{workload}",
+                "statement_timeout": str(statement_timeout_ms),
+            },
+        },
+    })
+    if not settings.TESTING:
+        options.update({
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        })
+    return options
+
+
+# Short request/response queries
 engine = create_async_engine(
     database_url,
-    **engine_kwargs
+    **engine_options(
+        "oltp",
+        settings.DATABASE_POOL_SIZE,
+        settings.DATABASE_MAX_OVERFLOW,
+        settings.DATABASE_STATEMENT_TIMEOUT_MS,
+    )
 )
+instrument_engine(engine, "oltp")
+
+# Long aggregate queries get their own small pool and a longer statement
+# timeout, so they cannot starve OLTP requests of connections. SQLite (tests
+# and local development) has a single connection, shared by both.
+if is_sqlite:
+    analytics_engine = engine
+else:
+    analytics_engine = create_async_engine(
+        database_url,
+        **engine_options(
+            "analytics",
+            settings.ANALYTICS_DATABASE_POOL_SIZE,
+            settings.ANALYTICS_DATABASE_MAX_OVERFLOW,
+            settings.ANALYTICS_STATEMENT_TIMEOUT_MS,
+        )
+    )
+    instrument_engine(analytics_engine, "analytics")
 
-# Create async session factory
+# Create async session factories
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+analytics_session_maker = async_sessionmaker(
+    analytics_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+ENGINES = {"oltp": engine, "analytics": analytics_engine}
+MAX_OVERFLOW = {
+    "oltp": settings.DATABASE_MAX_OVERFLOW,
+    "analytics": settings.ANALYTICS_DATABASE_MAX_OVERFLOW,
+}
+
+# Read replicas (optional), used by read-only dependencies
+replica_session_makers = []
+for index, replica_url in enumerate(settings.DATABASE_REPLICA_URLS):
+    workload = f"replica{index}"
+    replica_engine = create_async_engine(
+        async_database_url(replica_url),
+        **engine_options(
+            workload,
+            settings.DATABASE_REPLICA_POOL_SIZE,
+            settings.DATABASE_REPLICA_MAX_OVERFLOW,
+            settings.ANALYTICS_STATEMENT_TIMEOUT_MS,
+            sqlite=replica_url.startswith("sqlite"),
+        )
+    )
+    instrument_engine(replica_engine, workload)
+    ENGINES[workload] = replica_engine
+    MAX_OVERFLOW[workload] = settings.DATABASE_REPLICA_MAX_OVERFLOW
+    replica_session_makers.append(
+        async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+
+
+# User ids whose write markers must reach the shared cache before the
+# current request's response goes out (see ``defer_shared_writes``)
+_deferred_writers: ContextVar[Optional[Set]] = ContextVar("deferred_writers", default=None)
+
+
+@contextmanager
+def defer_shared_writes() -> Iterator[Set]:
+    """Collect writers committed in the current context instead of sharing them in the background."""
+    writers: Set = set()
+    token = _deferred_writers.set(writers)
+    try:
+        yield writers
+    finally:
+        _deferred_writers.reset(token)
+
+
+class ReplicaRouter:
+    """Chooses a read replica for read-only sessions.
+
+    Replicas lag the primary, so a user who has just written is pinned to the
+    primary for ``stickiness_seconds`` (read-your-writes). Writes are recorded
+    locally at once and in the shared cache for the other workers; within a
+    request the shared marker is written before the response is sent (see
+    ``SharedWriteMiddleware``), elsewhere in the background.
+    """
+
+    def __init__(self, replicas: List[async_sessionmaker], stickiness_seconds: int):
+        """Initialize router."""
+        self.replicas = replicas
+        self.stickiness_seconds = stickiness_seconds
+        self._cycle = itertools.cycle(replicas) if replicas else None
+        self._sticky_until: Dict[str, float] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def _key(self, user_id) -> str:
+        return cache.user_key(user_id, "last_write")
+
+    def mark_write(self, user_id) -> None:
+        """Pin a user to the primary for the stickiness window."""
+        if not self.replicas:
+            return
+        self._sticky_until[str(user_id)] = time.monotonic() + self.stickiness_seconds
+        if len(self._sticky_until) > 10000:
+            now = time.monotonic()
+            self._sticky_until = {k: v for k, v in self._sticky_until.items() if v > now}
+
+        deferred = _deferred_writers.get()
+        if deferred is not None:
+            deferred.add(user_id)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._share_write(user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def share_writes(self, writers: Set) -> None:
+        """Write the shared markers of collected writers and forget them."""
+        user_ids = list(writers)
+        writers.clear()
+        await asyncio.gather(*(self._share_write(user_id) for user_id in user_ids))
+
+    async def _share_write(self, user_id) -> None:
+        try:
+            await cache.backend.set(self._key(user_id), b"1", self.stickiness_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to share write marker: {str(e)}")
+
+    async def is_sticky(self, user_id) -> bool:
+        """Whether a user wrote within the stickiness window (errors count as yes)."""
+        if self._sticky_until.get(str(user_id), 0.0) > time.monotonic():
+            return True
+        try:
+            marker, = await cache.backend.get_many([self._key(user_id)])
+        except Exception:
+            return True
+        return marker is not None
+
+    async def replica_for(self, user_id) -> Optional[async_sessionmaker]:
+        """Session factory of the replica to read from, or None for the primary."""
+        if not self.replicas or await self.is_sticky(user_id):
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        return next(self._cycle)
+
+    def reset(self) -> None:
+        """Forget recorded writes (for tests)."""
+        self._sticky_until.clear()
+
+
+replica_router = ReplicaRouter(replica_session_makers, settings.DATABASE_REPLICA_STICKINESS_SECONDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writers(session, flush_context):
+    """Remember whose rows a session is changing."""
+    if not replica_router.replicas:
+        return
+    writers = session.info.setdefault("writer_ids", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        owner = obj.id if getattr(obj, "__tablename__", None) == "users" else getattr(obj, "user_id", None)
+        if owner is not None:
+            writers.add(owner)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    """Attribute bulk DML to the session's authenticated user."""
+    if not replica_router.replicas:
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        user_id = orm_execute_state.session.info.get("user_id")
+        if user_id is not None:
+            orm_execute_state.session.info.setdefault("writer_ids", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_writers(session):
+    for user_id in session.info.pop("writer_ids", ()):
+        replica_router.mark_write(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writers(session):
+    session.info.pop("writer_ids", None)
+
+
+def pool_status(workload: str = "oltp") -> Dict[str, Any]:
+    """Get connection pool occupancy (None for pools that do not track it)."""
+    pool = ENGINES[workload].sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__, "size": None, "checked_out": None, "overflow": None, "max_overflow": None}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": MAX_OVERFLOW[workload],
+    }
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -64,6 +304,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_analytics_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a session from the analytics pool (longer statement timeout)."""
+    async with analytics_session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db() -> None:
     """Initialize database on startup."""
     # Import models to register them
@@ -74,6 +323,7 @@ async def init_db() -> None:
         Constraint,
         OptimizationRun,
         CompletionLog,
+        CompletionRollup,
     )
     
     # Create tables
@@ -82,8 +332,9 @@ async def init_db() -> None:
 
 
 async def close_db() -> None:
-    """Close database connection on shutdown."""
-    await engine.dispose()
+    """Close database connections on shutdown."""
+    for db_engine in set(ENGINES.values()):
+        await db_engine.dispose()
 
 
 # Import Base for metadata
@@ -0,0 +1,192 @@
+"""SQLAlchemy instrumentation: query timing, per-request stats and pool metrics."""
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import (
+    db_queries_total,
+    db_query_duration_seconds,
+    db_pool_checkout_wait_seconds,
+    db_pool_checked_out,
+    db_pool_overflow,
+    db_pool_timeouts_total,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|(?<!:):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so statements differing only in values group together.
+
+    Literals and bind placeholders become ``?`` and IN lists of any length
+    collapse to ``IN (...)``, so an N+1 pattern shows up as one fingerprint
+    executed N times.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _POSTCOMPILE.sub("(...)", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed within a tracked scope (usually one request)."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    # fingerprint -> [executions, total seconds]
+    by_fingerprint: Dict[str, List[float]] = field(default_factory=dict)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Add one executed statement."""
+        self.count += 1
+        self.total_seconds += elapsed
+        entry = self.by_fingerprint.setdefault(fingerprint(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def top(self, limit: int = 5) -> List[Tuple[str, int, float]]:
+        """Most expensive fingerprints as (fingerprint, executions, seconds)."""
+        ranked = sorted(self.by_fingerprint.items(), key=lambda item: (item[1][1], item[1][0]), reverse=True)
+        return [(sql, int(count), seconds) for sql, (count, seconds) in ranked[:limit]]
+
+    def summary(self, limit: int = 5) -> str:
+        """Human readable list of the most expensive fingerprints."""
+        return "\n".join(
+            f"  {count}x {seconds * 1000:.1f}ms {sql[:300]}" for sql, count, seconds in self.top(limit)
+        )
+
+
+# Every active tracker receives each statement, so the metrics middleware,
+# the query budget middleware and test assertions can nest independently
+_active_trackers: ContextVar[Tuple[QueryStats, ...]] = ContextVar("active_query_trackers", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statements executed in the current context until exit."""
+    stats = QueryStats()
+    token = _active_trackers.set(_active_trackers.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_trackers.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail when more than ``limit`` statements run inside the block.
+
+    Intended for tests guarding endpoints against N+1 regressions::
+
+        with assert_max_queries(4):
+            await client.get("/api/v1/behaviors")
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} queries, {stats.count} were executed:\n{stats.summary(10)}"
+        )
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    # Metrics label, set by instrument_engine
+    workload = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts_total.labels(pool=self.workload).inc()
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.labels(pool=self.workload).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.workload = self.workload
+        return pool
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, statement, queries, durations):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    queries.inc()
+    durations.observe(elapsed)
+
+    for stats in _active_trackers.get():
+        stats.record(statement, elapsed)
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 > settings.SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f}ms): {fingerprint(statement)[:500]}")
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: AsyncEngine, workload: str = "default") -> None:
+    """Attach query and pool listeners to an async engine, labelled by workload."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    if isinstance(pool, TimedAsyncAdaptedQueuePool):
+        pool.workload = workload
+    queries = db_queries_total.labels(pool=workload)
+    durations = db_query_duration_seconds.labels(pool=workload)
+    checked_out = db_pool_checked_out.labels(pool=workload)
+    overflow = db_pool_overflow.labels(pool=workload)
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _after_cursor_execute(conn, statement, queries, durations)
+
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+    def sample_overflow() -> None:
+        # engine.dispose() replaces the pool, so look it up each time
+        current = sync_engine.pool
+        if hasattr(current, "overflow"):
+            overflow.set(max(0, current.overflow()))
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+        sample_overflow()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+        sample_overflow()
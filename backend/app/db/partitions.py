@@ -0,0 +1,303 @@
+"""Completion log partition maintenance and archival.
+
+``completion_logs`` is append-only and read mostly by recent time windows.
+On PostgreSQL it is range partitioned by month (see the
+``partition_completion_logs`` migration); ``ensure_completion_log_partitions``
+creates upcoming months ahead of time, moving rows that already landed in
+the default partition when it falls behind.
+
+``archive_completion_logs`` moves months older than the retention window to
+gzip-compressed NDJSON files, folds them into ``completion_rollups`` so
+all-time statistics stay correct, and then drops the month: a whole
+partition is detached and dropped on PostgreSQL, rows are deleted elsewhere.
+"""
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import CompletionLog, CompletionRollup
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 5000
+
+# Catches rows outside every monthly partition (see the migration)
+DEFAULT_PARTITION = "completion_logs_default"
+
+
+def month_start(day: date) -> date:
+    """First day of the month containing ``day``."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Shift a first-of-month date by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """Half-open UTC ``[start, end)`` range of a month, for pruning-friendly predicates."""
+    start = datetime.combine(month, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc)
+    return start, end
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding a month."""
+    return f"completion_logs_y{month.year:04d}m{month.month:02d}"
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    """Whether completion_logs is a partitioned PostgreSQL table."""
+    if db.bind.dialect.name != "postgresql":
+        return False
+    result = await db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'completion_logs'"
+    ))
+    return result.first() is not None
+
+
+async def _create_partition(db: AsyncSession, month: date, has_default: bool) -> int:
+    """Create a month's partition; returns the rows moved into it from the default partition.
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows in its range, which happens when the job has not run for
+    longer than the pre-created horizon. The default partition is then
+    detached, its rows for the month moved and it is re-attached, all in the
+    caller's transaction so concurrent writes wait on the lock instead of
+    failing.
+    """
+    name = partition_name(month)
+    start, end = month_bounds(month)
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF completion_logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    in_month = {"start": start, "end": end}
+    stray = has_default and (await db.execute(text(
+        f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE completed_at >= :start AND completed_at < :end LIMIT 1"
+    ), in_month)).first() is not None
+    if not stray:
+        await db.execute(create)
+        return 0
+
+    await db.execute(text(f"ALTER TABLE completion_logs DETACH PARTITION {DEFAULT_PARTITION}"))
+    await db.execute(create)
+    moved = await db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        "WHERE completed_at >= :start AND completed_at < :end RETURNING *) "
+        "INSERT INTO completion_logs SELECT * FROM moved"
+    ), in_month)
+    await db.execute(text(f"ALTER TABLE completion_logs ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved.rowcount
+
+
+async def ensure_completion_log_partitions(db: AsyncSession, months_ahead: Optional[int] = None) -> List[str]:
+    """Create monthly partitions from this month up to ``months_ahead`` ahead."""
+    if not await is_partitioned(db):
+        return []
+    months_ahead = settings.COMPLETION_LOG_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+
+    existing = {row[0] for row in (await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'completion_logs'"
+    ))).all()}
+
+    created = []
+    current = month_start(datetime.now(timezone.utc).date())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        moved = await _create_partition(db, month, DEFAULT_PARTITION in existing)
+        if moved:
+            logger.warning(f"Moved {moved} completion logs for {month:%Y-%m} out of {DEFAULT_PARTITION}")
+        created.append(name)
+    await db.commit()
+    if created:
+        logger.info(f"Created completion log partitions: {', '.join(created)}")
+    return created
+
+
+@dataclass
+class ArchivedMonth:
+    """Outcome of archiving one month of completion logs."""
+
+    month: date
+    rows: int
+    path: str
+    dropped_partition: bool
+
+
+def _log_record(log: CompletionLog) -> Dict:
+    return {
+        "id": str(log.id),
+        "user_id": str(log.user_id),
+        "behavior_id": str(log.behavior_id),
+        "optimization_run_id": str(log.optimization_run_id) if log.optimization_run_id else None,
+        "actual_duration": log.actual_duration,
+        "completed_at": log.completed_at.isoformat(),
+        "satisfaction_score": log.satisfaction_score,
+        "notes": log.notes,
+        "context": log.context,
+        "created_at": log.created_at.isoformat() if log.created_at else None,
+    }
+
+
+async def _export_month(db: AsyncSession, month: date, directory: str) -> Tuple[int, str]:
+    """Write a month of logs to a gzip NDJSON file; returns (rows, path)."""
+    start, end = month_bounds(month)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(directory, f"completion_logs_{month:%Y_%m}_{stamp}.ndjson.gz")
+    partial = path + ".partial"
+
+    rows = 0
+    last: Optional[Tuple[datetime, object]] = None
+    with gzip.open(partial, "wt", encoding="utf-8") as f:
+        # Keyset batches so a large month never sits in memory at once
+        while True:
+            query = (
+                select(CompletionLog)
+                .where(CompletionLog.completed_at >= start, CompletionLog.completed_at < end)
+                .order_by(CompletionLog.completed_at, CompletionLog.id)
+                .limit(EXPORT_BATCH_SIZE)
+            )
+            if last is not None:
+                query = query.where(
+                    (CompletionLog.completed_at > last[0])
+                    | ((CompletionLog.completed_at == last[0]) & (CompletionLog.id > last[1]))
+                )
+            batch = (await db.execute(query)).scalars().all()
+            for log in batch:
+                f.write(json.dumps(_log_record(log)) + "\n")
+            rows += len(batch)
+            if len(batch) < EXPORT_BATCH_SIZE:
+                break
+            last = (batch[-1].completed_at, batch[-1].id)
+            db.expunge_all()
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return rows, path
+
+
+async def _fold_into_rollups(db: AsyncSession, month: date) -> None:
+    """Add a month's per-behavior totals to completion_rollups."""
+    start, end = month_bounds(month)
+    totals = (await db.execute(
+        select(
+            CompletionLog.behavior_id,
+            CompletionLog.user_id,
+            func.count(CompletionLog.id),
+            func.coalesce(func.sum(CompletionLog.actual_duration), 0),
+            func.coalesce(func.sum(CompletionLog.satisfaction_score), 0),
+            func.count(CompletionLog.satisfaction_score),
+            func.max(CompletionLog.completed_at),
+        )
+        .where(CompletionLog.completed_at >= start, CompletionLog.completed_at < end)
+        .group_by(CompletionLog.behavior_id, CompletionLog.user_id)
+    )).all()
+
+    # Late rows for an already archived month are added to its existing rollup
+    existing = {
+        rollup.behavior_id: rollup
+        for rollup in (await db.execute(
+            select(CompletionRollup).where(CompletionRollup.month == month)
+        )).scalars().all()
+    }
+    for behavior_id, user_id, count, duration, sat_total, sat_count, last_completed in totals:
+        rollup = existing.get(behavior_id)
+        if rollup is None:
+            rollup = CompletionRollup(
+                behavior_id=behavior_id,
+                month=month,
+                user_id=user_id,
+                completions=0,
+                total_duration=0,
+                satisfaction_total=0,
+                satisfaction_count=0,
+            )
+            db.add(rollup)
+        rollup.completions += count
+        rollup.total_duration += int(duration)
+        rollup.satisfaction_total += int(sat_total)
+        rollup.satisfaction_count += sat_count
+        if rollup.last_completed_at is None or last_completed > rollup.last_completed_at:
+            rollup.last_completed_at = last_completed
+
+
+async def _drop_month(db: AsyncSession, month: date, partitioned: bool) -> bool:
+    """Remove a month's raw logs; returns True if a whole partition was dropped."""
+    if partitioned:
+        name = partition_name(month)
+        exists = (await db.execute(
+            text("SELECT 1 FROM pg_class WHERE relname = :name"), {"name": name}
+        )).first()
+        if exists:
+            await db.execute(text(f"ALTER TABLE completion_logs DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            return True
+
+    # No dedicated partition (plain table, or rows in the default partition)
+    start, end = month_bounds(month)
+    await db.execute(
+        delete(CompletionLog).where(CompletionLog.completed_at >= start, CompletionLog.completed_at < end)
+    )
+    return False
+
+
+async def archive_completion_logs(
+    db: AsyncSession,
+    retention_months: Optional[int] = None,
+    directory: Optional[str] = None,
+    today: Optional[date] = None,
+) -> List[ArchivedMonth]:
+    """Archive every month older than the retention window.
+
+    Each month is exported, rolled up and dropped in its own transaction; the
+    export file is fsynced before anything is deleted.
+    """
+    retention_months = settings.COMPLETION_LOG_RETENTION_MONTHS if retention_months is None else retention_months
+    directory = directory or settings.COMPLETION_LOG_ARCHIVE_DIR
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -retention_months)
+    cutoff_start, _ = month_bounds(cutoff)
+    partitioned = await is_partitioned(db)
+
+    oldest = (await db.execute(
+        select(func.min(CompletionLog.completed_at)).where(CompletionLog.completed_at < cutoff_start)
+    )).scalar()
+    await db.commit()
+    if oldest is None:
+        return []
+
+    archived = []
+    month = month_start(oldest.date())
+    while month < cutoff:
+        rows, path = await _export_month(db, month, directory)
+        if rows == 0:
+            os.remove(path)
+            month = add_months(month, 1)
+            continue
+
+        await _fold_into_rollups(db, month)
+        dropped = await _drop_month(db, month, partitioned)
+        await db.commit()
+
+        logger.info(f"Archived {rows} completion logs for {month:%Y-%m} to {path}")
+        archived.append(ArchivedMonth(month=month, rows=rows, path=path, dropped_partition=dropped))
+        month = add_months(month, 1)
+    return archived
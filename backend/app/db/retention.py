@@ -0,0 +1,169 @@
+"""Optimization run retention.
+
+Every solve inserts a run whose ``results`` JSON repeats the schedule already
+stored in ``scheduled_behaviors``, and re-optimizing the same day supersedes
+the previous run. Once runs are older than the retention grace period:
+
+* the latest run per user and start date is kept, as is any run referenced
+  by ``completion_logs``; superseded runs that nothing references are
+  deleted in batches together with their scheduled behaviors;
+* kept runs are compacted: the duplicated ``schedule_items`` and the solver
+  diagnostics are dropped from ``results``, leaving what the API reads
+  (status and objective contributions).
+"""
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Text, and_, cast, delete, exists, func, null, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache
+from app.core.config import settings
+from app.models import CompletionLog, OptimizationRun, OptimizationStatus, ScheduledBehavior
+
+logger = logging.getLogger(__name__)
+
+# Keys of ``results`` duplicated elsewhere (scheduled_behaviors, diagnostics column)
+COMPACTED_KEYS = ("schedule_items", "diagnostics")
+
+# Runs still being solved are never touched
+FINISHED_STATUSES = (OptimizationStatus.COMPLETED, OptimizationStatus.FAILED)
+
+
+@dataclass
+class RetentionReport:
+    """What a retention pass removed."""
+
+    runs_deleted: int = 0
+    scheduled_behaviors_deleted: int = 0
+    runs_compacted: int = 0
+    # Serialized size of the JSON payloads removed (row overhead not included)
+    bytes_reclaimed: int = 0
+
+
+def _payload_size():
+    """SQL expression for the serialized size of a run's JSON columns."""
+    return (
+        func.coalesce(func.length(cast(OptimizationRun.results, Text)), 0)
+        + func.coalesce(func.length(cast(OptimizationRun.diagnostics, Text)), 0)
+    )
+
+
+def _superseded_runs(cutoff: datetime, limit: int):
+    """Old runs that are neither the latest for their date nor referenced."""
+    ranked = (
+        select(
+            OptimizationRun.id,
+            func.row_number().over(
+                partition_by=(OptimizationRun.user_id, OptimizationRun.start_date),
+                order_by=(OptimizationRun.created_at.desc(), OptimizationRun.id.desc()),
+            ).label("rank"),
+        )
+        .subquery()
+    )
+    return (
+        select(OptimizationRun.id, OptimizationRun.user_id, _payload_size())
+        .join(ranked, ranked.c.id == OptimizationRun.id)
+        .where(
+            ranked.c.rank > 1,
+            OptimizationRun.created_at < cutoff,
+            OptimizationRun.status.in_(FINISHED_STATUSES),
+            ~exists().where(CompletionLog.optimization_run_id == OptimizationRun.id),
+        )
+        .order_by(OptimizationRun.created_at, OptimizationRun.id)
+        .limit(limit)
+    )
+
+
+async def delete_superseded_runs(db: AsyncSession, cutoff: datetime, batch_size: int, report: RetentionReport) -> None:
+    """Delete superseded runs in batches, one transaction per batch."""
+    while True:
+        batch = (await db.execute(_superseded_runs(cutoff, batch_size))).all()
+        if not batch:
+            return
+        run_ids = [row[0] for row in batch]
+
+        # Explicit child delete: SQLite does not enforce ON DELETE CASCADE by default
+        scheduled = await db.execute(
+            delete(ScheduledBehavior).where(ScheduledBehavior.optimization_run_id.in_(run_ids))
+        )
+        await db.execute(delete(OptimizationRun).where(OptimizationRun.id.in_(run_ids)))
+        await db.commit()
+
+        report.runs_deleted += len(run_ids)
+        report.scheduled_behaviors_deleted += scheduled.rowcount
+        report.bytes_reclaimed += sum(row[2] or 0 for row in batch)
+        for user_id in {row[1] for row in batch}:
+            await cache.invalidate_user(user_id, "runs")
+        if len(batch) < batch_size:
+            return
+
+
+async def compact_runs(db: AsyncSession, cutoff: datetime, batch_size: int, report: RetentionReport) -> None:
+    """Strip duplicated payloads from old runs, one transaction per batch."""
+    last: Optional[tuple] = None
+    while True:
+        query = (
+            select(OptimizationRun.id, OptimizationRun.created_at, OptimizationRun.results, _payload_size())
+            .where(
+                OptimizationRun.created_at < cutoff,
+                OptimizationRun.status.in_(FINISHED_STATUSES),
+                # Cheap pre-filter so already compacted runs are not loaded again
+                or_(
+                    cast(OptimizationRun.results, Text).like('%"schedule_items"%'),
+                    OptimizationRun.diagnostics.is_not(None),
+                ),
+            )
+            .order_by(OptimizationRun.created_at, OptimizationRun.id)
+            .limit(batch_size)
+        )
+        if last is not None:
+            query = query.where(
+                or_(
+                    OptimizationRun.created_at > last[0],
+                    and_(OptimizationRun.created_at == last[0], OptimizationRun.id > last[1]),
+                )
+            )
+        batch = (await db.execute(query)).all()
+        if not batch:
+            return
+
+        for run_id, _, results, size in batch:
+            compacted = {k: v for k, v in results.items() if k not in COMPACTED_KEYS} if results else None
+            await db.execute(
+                update(OptimizationRun)
+                .where(OptimizationRun.id == run_id)
+                .values(results=compacted if compacted is not None else null(), diagnostics=null())
+            )
+            report.runs_compacted += 1
+            report.bytes_reclaimed += max(0, (size or 0) - len(json.dumps(compacted) if compacted else ""))
+        await db.commit()
+
+        if len(batch) < batch_size:
+            return
+        last = (batch[-1][1], batch[-1][0])
+
+
+async def apply_run_retention(
+    db: AsyncSession,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> RetentionReport:
+    """Delete superseded runs and compact the rest, for runs older than the grace period."""
+    retention_days = settings.OPTIMIZATION_RUN_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.OPTIMIZATION_RUN_RETENTION_BATCH_SIZE
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+
+    report = RetentionReport()
+    await delete_superseded_runs(db, cutoff, batch_size, report)
+    await compact_runs(db, cutoff, batch_size, report)
+    logger.info(
+        f"Run retention: deleted {report.runs_deleted} runs "
+        f"({report.scheduled_behaviors_deleted} scheduled behaviors), "
+        f"compacted {report.runs_compacted}, reclaimed ~{report.bytes_reclaimed} bytes"
+    )
+    return report
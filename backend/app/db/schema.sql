@@ -143,8 +143,10 @@ CREATE INDEX idx_scheduled_behaviors_optimization_run_id ON scheduled_behaviors
 CREATE INDEX idx_scheduled_behaviors_behavior_id ON scheduled_behaviors (behavior_id);
 
 -- Completion Logs table (tracking actual completions)
+-- Range partitioned by month; scripts/archive_completion_logs.py creates
+-- upcoming partitions and archives old ones into completion_rollups
 CREATE TABLE completion_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
     behavior_id UUID NOT NULL REFERENCES behaviors (id) ON DELETE CASCADE,
     optimization_run_id UUID REFERENCES optimization_runs (id) ON DELETE SET NULL,
@@ -155,13 +157,50 @@ CREATE TABLE completion_logs (
     context JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT valid_satisfaction CHECK (satisfaction_score IS NULL OR (satisfaction_score >= 1 AND satisfaction_score <= 5)),
-    CONSTRAINT valid_duration CHECK (actual_duration > 0)
-);
+    CONSTRAINT valid_duration CHECK (actual_duration > 0),
+    PRIMARY KEY (id, completed_at)
+) PARTITION BY RANGE (completed_at);
+
+CREATE TABLE completion_logs_default PARTITION OF completion_logs DEFAULT;
 
 CREATE INDEX idx_completion_logs_user_id ON completion_logs (user_id);
 CREATE INDEX idx_completion_logs_behavior_id ON completion_logs (behavior_id);
 CREATE INDEX idx_completion_logs_completed_at ON completion_logs (completed_at DESC);
 CREATE INDEX idx_completion_logs_optimization_run_id ON completion_logs (optimization_run_id);
+CREATE INDEX idx_completion_logs_user_completed_at ON completion_logs (user_id, completed_at);
+
+-- Monthly per-behavior totals of archived completion logs
+CREATE TABLE completion_rollups (
+    behavior_id UUID NOT NULL REFERENCES behaviors (id) ON DELETE CASCADE,
+    month DATE NOT NULL,
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    completions INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+    satisfaction_total INT NOT NULL DEFAULT 0,
+    satisfaction_count INT NOT NULL DEFAULT 0,
+    last_completed_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (behavior_id, month)
+);
+
+CREATE INDEX idx_completion_rollups_user_id ON completion_rollups (user_id);
+
+-- Per-user daily completion totals, kept up to date as completions are logged
+CREATE TABLE daily_progress (
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    completions INT NOT NULL DEFAULT 0,
+    total_duration INT NOT NULL DEFAULT 0,
+    energy_spent FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_health FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_productivity FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_learning FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_wellness FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_social FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_financial FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_creativity FLOAT NOT NULL DEFAULT 0.0,
+    impact_on_mindfulness FLOAT NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (user_id, day)
+);
 
 -- Views for Analytics
 CREATE VIEW behavior_statistics AS
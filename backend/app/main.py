@@ -8,17 +8,27 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from app.core import settings, BehaviorOptimizationException
+from app.core import settings, BehaviorOptimizationException, password_hash_pool
+from app.core.metrics import mark_worker_dead
 from app.core.exceptions import ValidationError, DatabaseError
 from app.db.database import init_db, close_db
+from app.optimization import solver_pool
+from app.api.health import router as health_router
+from app.api.metrics import MetricsMiddleware, router as metrics_router
+from app.api.profiling import ProfilingMiddleware, router as profiling_router
+from app.api.query_budget import QueryBudgetMiddleware
+from app.api.rate_limit import RateLimitMiddleware, rate_limiter
+from app.api.shared_writes import SharedWriteMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.v1 import (
     auth_router,
     behaviors_router,
     optimization_router,
     schedule_router,
     analytics_router,
+    exports_router,
 )
-from app.schemas import HealthCheckResponse, ErrorResponse
+from app.schemas import ErrorResponse
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +45,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application")
     await close_db()
     logger.info("Database connection closed")
+    password_hash_pool.shutdown()
+    solver_pool.shutdown()
+    mark_worker_dead()
 
 
 # Create application
@@ -43,8 +56,15 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Operations Research + AI Engineering for Behavioral Optimization",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Share replica read-your-writes markers before responses go out
+app.add_middleware(SharedWriteMiddleware)
+
+# Rate limiting middleware (added before CORS so 429s still carry CORS headers)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # CORS middleware
 if settings.CORS_ORIGINS:
     app.add_middleware(
@@ -53,8 +73,21 @@ if settings.CORS_ORIGINS:
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=["ETag", "Last-Modified"],
     )
 
+# Request profiling (opt-in; sampled or requested with the X-Profile header)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Query budget logging
+if settings.QUERY_BUDGET_MAX_QUERIES or settings.QUERY_BUDGET_MAX_DB_MS:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Metrics middleware (outermost so rejected and failed requests are measured)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Exception handlers
 @app.exception_handler(BehaviorOptimizationException)
@@ -140,16 +173,12 @@ async def root():
     }
 
 
-@app.get("/api/health", response_model=HealthCheckResponse, tags=["health"])
-async def health_check():
-    """Health check endpoint."""
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.APP_VERSION,
-        environment=settings.ENVIRONMENT,
-        database="connected",
-    )
+# Health probes
+app.include_router(health_router)
 
+# Metrics
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 # API routes
 app.include_router(auth_router, prefix="/api/v1")
@@ -157,6 +186,10 @@ app.include_router(behaviors_router, prefix="/api/v1")
 app.include_router(optimization_router, prefix="/api/v1")
 app.include_router(schedule_router, prefix="/api/v1")
 app.include_router(analytics_router, prefix="/api/v1")
+app.include_router(exports_router, prefix="/api/v1")
+
+# Admin
+app.include_router(profiling_router)
 
 
 if __name__ == "__main__":
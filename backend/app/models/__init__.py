@@ -4,7 +4,7 @@ from .behavior import Behavior, BehaviorCategory, TimeSlot
 from .objective import Objective, ObjectiveType
 from .constraint import Constraint, ConstraintType
 from .optimization import OptimizationRun, OptimizationStatus, SolverType, ScheduledBehavior
-from .tracking import CompletionLog
+from .tracking import CompletionLog, CompletionRollup, DailyProgress
 
 __all__ = [
     "User",
@@ -20,4 +20,6 @@ __all__ = [
     "SolverType",
     "ScheduledBehavior",
     "CompletionLog",
+    "CompletionRollup",
+    "DailyProgress",
 ]
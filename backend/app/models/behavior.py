@@ -80,21 +80,15 @@ class Behavior(Base):
         Index("idx_behaviors_user_id", "user_id"),
         Index("idx_behaviors_category", "category"),
         Index("idx_behaviors_is_active", "is_active"),
+        Index("idx_behaviors_user_created_at", "user_id", "created_at", "id"),
     )
 
     def get_impact(self, objective_type: str) -> float:
-        """Get impact for specific objective type."""
-        impacts = {
-            "health": self.impact_on_health,
-            "productivity": self.impact_on_productivity,
-            "learning": self.impact_on_learning,
-            "wellness": self.impact_on_wellness,
-            "social": self.impact_on_social,
-            "financial": self.impact_on_financial,
-            "creativity": self.impact_on_creativity,
-            "mindfulness": self.impact_on_mindfulness,
-        }
-        return impacts.get(objective_type, 0.0)
+        """Get impact for specific objective type.
+
+        For many behaviors, use ``app.optimization.ImpactMatrix`` instead.
+        """
+        return getattr(self, f"impact_on_{objective_type}", 0.0)
 
     def get_all_impacts(self) -> dict:
         """Get all impacts as dictionary."""
@@ -62,6 +62,7 @@ class OptimizationRun(Base):
         Index("idx_optimization_runs_user_id", "user_id"),
         Index("idx_optimization_runs_status", "status"),
         Index("idx_optimization_runs_created_at", "created_at", postgresql_using="btree", postgresql_ops={"created_at": "DESC"}),
+        Index("idx_optimization_runs_user_created_at", "user_id", "created_at", "id"),
     )
 
 
@@ -1,16 +1,23 @@
 """Completion tracking model."""
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import String, DateTime, ForeignKey, JSON, Integer, Text, Index
+from sqlalchemy import Date, DateTime, Float, ForeignKey, JSON, Integer, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.database import Base
 
 
 class CompletionLog(Base):
-    """Completion log model for tracking behavior completions."""
+    """Completion log model for tracking behavior completions.
+
+    On PostgreSQL the table is range partitioned by month on ``completed_at``
+    (the primary key there is ``(id, completed_at)``); filter on
+    ``completed_at`` ranges so queries only touch the partitions they need.
+    Months older than the retention window are archived to files and kept as
+    ``CompletionRollup`` rows.
+    """
 
     __tablename__ = "completion_logs"
 
@@ -39,4 +46,50 @@ class CompletionLog(Base):
         Index("idx_completion_logs_behavior_id", "behavior_id"),
         Index("idx_completion_logs_completed_at", "completed_at"),
         Index("idx_completion_logs_optimization_run_id", "optimization_run_id"),
+        Index("idx_completion_logs_user_completed_at", "user_id", "completed_at"),
+    )
+
+
+class CompletionRollup(Base):
+    """Monthly per-behavior totals of archived completion logs."""
+
+    __tablename__ = "completion_rollups"
+
+    behavior_id: Mapped[UUID] = mapped_column(ForeignKey("behaviors.id", ondelete="CASCADE"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)  # first day of the month
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    completions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_duration: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    satisfaction_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    satisfaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_completion_rollups_user_id", "user_id"),
     )
+
+
+class DailyProgress(Base):
+    """Per-user daily totals of logged completions.
+
+    Kept in step with completion_logs as completions are added or removed
+    (see ``app.analytics.progress``), so analytics read one row per day
+    instead of scanning logs. ``impact_on_<type>`` is the completed
+    behaviors' impact x actual duration summed over the day.
+    """
+
+    __tablename__ = "daily_progress"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    completions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_duration: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    energy_spent: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_health: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_productivity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_learning: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_wellness: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_social: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_financial: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_creativity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    impact_on_mindfulness: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
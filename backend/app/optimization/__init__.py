@@ -7,8 +7,12 @@ from .models import (
     ConstraintInput,
     ScheduleItem,
     ObjectiveContribution,
+    SolverProgress,
 )
+from .encoding import RunResults, decode_results, encode_results
+from .impacts import IMPACT_COLUMNS, OBJECTIVE_INDEX, OBJECTIVE_TYPES, ImpactMatrix, objective_impacts
 from .solvers.linear import LinearSolver
+from .pool import SolverPool, solver_pool
 
 __all__ = [
     "OptimizationProblem",
@@ -18,5 +22,16 @@ __all__ = [
     "ConstraintInput",
     "ScheduleItem",
     "ObjectiveContribution",
+    "SolverProgress",
+    "IMPACT_COLUMNS",
+    "OBJECTIVE_INDEX",
+    "OBJECTIVE_TYPES",
+    "ImpactMatrix",
+    "objective_impacts",
+    "RunResults",
+    "decode_results",
+    "encode_results",
     "LinearSolver",
+    "SolverPool",
+    "solver_pool",
 ]
@@ -0,0 +1,84 @@
+"""Compact storage format for optimization run results.
+
+``OptimizationSolution.to_dict()`` stores every schedule item as a dict with
+a stringified UUID and the behavior name, which makes ``results`` the
+largest part of a run row. The schedule is already stored row by row in
+``scheduled_behaviors``, so the stored format (``format: 2``) keeps only the
+small header readers need: status, totals and objective contributions.
+Runs stored in the old format are read through the same interface.
+"""
+from typing import Any, Dict, Iterator, Optional
+
+from .models import OptimizationSolution
+
+RESULTS_FORMAT = 2
+
+
+def encode_results(solution: OptimizationSolution) -> Dict[str, Any]:
+    """Build the stored ``results`` of a solution.
+
+    The schedule is omitted (it lives in ``scheduled_behaviors``), as are
+    diagnostics, which have their own column.
+    """
+    return {
+        "format": RESULTS_FORMAT,
+        "status": solution.status,
+        "solver": solution.solver,
+        "total_objective_value": solution.total_objective_value,
+        "total_scheduled_duration": solution.total_scheduled_duration,
+        "scheduled_behavior_count": solution.scheduled_behavior_count,
+        "execution_time_seconds": solution.execution_time_seconds,
+        "objective_contributions": {
+            obj_type: {
+                "contribution": contrib.contribution,
+                "weight": contrib.weight,
+            }
+            for obj_type, contrib in solution.objective_contributions.items()
+        },
+    }
+
+
+class RunResults:
+    """Read-only view of stored run results of any format.
+
+    Header fields are available through ``get`` / ``[]``.
+    """
+
+    def __init__(self, raw: Dict[str, Any]):
+        """Initialize view."""
+        self.raw = raw
+
+    @property
+    def format(self) -> int:
+        """Storage format version (1 for the original dict-per-item layout)."""
+        return self.raw.get("format", 1)
+
+    @property
+    def status(self) -> Optional[str]:
+        """Solver status."""
+        return self.raw.get("status")
+
+    @property
+    def objective_contributions(self) -> Dict[str, Dict[str, float]]:
+        """Contribution and weight per objective type."""
+        return self.raw.get("objective_contributions") or {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Header field, like ``dict.get``."""
+        return self.raw.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.raw[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.raw)
+
+
+def decode_results(raw: Optional[Dict[str, Any]]) -> Optional[RunResults]:
+    """Wrap stored results (any format) in a view; None stays None."""
+    if raw is None:
+        return None
+    return RunResults(raw)
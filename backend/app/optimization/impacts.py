@@ -0,0 +1,121 @@
+"""Dense behavior x objective impact matrix.
+
+Impacts are stored as one ``impact_on_<type>`` column per objective type.
+``ImpactMatrix`` reads them once into a ``(behaviors, objective types)``
+float array so the solver, response mapping and analytics can score any
+number of behaviors with a single matrix-vector product instead of building
+a dict per behavior per lookup.
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+# Column order of the matrix
+OBJECTIVE_TYPES: Tuple[str, ...] = (
+    "health",
+    "productivity",
+    "learning",
+    "wellness",
+    "social",
+    "financial",
+    "creativity",
+    "mindfulness",
+)
+OBJECTIVE_INDEX: Dict[str, int] = {obj_type: i for i, obj_type in enumerate(OBJECTIVE_TYPES)}
+IMPACT_COLUMNS: Tuple[str, ...] = tuple(f"impact_on_{obj_type}" for obj_type in OBJECTIVE_TYPES)
+
+
+class ImpactMatrix:
+    """Impacts of a set of behaviors, one row per behavior."""
+
+    def __init__(self, behavior_ids: Sequence[UUID], values: np.ndarray):
+        """Initialize matrix."""
+        if values.shape != (len(behavior_ids), len(OBJECTIVE_TYPES)):
+            raise ValueError(f"Impact matrix shape {values.shape} does not match {len(behavior_ids)} behaviors")
+        self.behavior_ids = list(behavior_ids)
+        self.index = {behavior_id: i for i, behavior_id in enumerate(self.behavior_ids)}
+        self.values = values
+
+    @classmethod
+    def from_behaviors(cls, behaviors: Iterable) -> "ImpactMatrix":
+        """Build from ``Behavior`` models (or anything with ``impact_on_*`` attributes)."""
+        behaviors = list(behaviors)
+        values = np.array(
+            [[getattr(b, column) or 0.0 for column in IMPACT_COLUMNS] for b in behaviors],
+            dtype=np.float64,
+        ).reshape(len(behaviors), len(OBJECTIVE_TYPES))
+        return cls([b.id for b in behaviors], values)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "ImpactMatrix":
+        """Build from ``(id, impact_on_health, ..., impact_on_mindfulness)`` rows."""
+        rows = list(rows)
+        values = np.array(
+            [[value or 0.0 for value in row[1:]] for row in rows], dtype=np.float64
+        ).reshape(len(rows), len(OBJECTIVE_TYPES))
+        return cls([row[0] for row in rows], values)
+
+    @classmethod
+    def from_impact_dicts(cls, items: Iterable[Tuple[UUID, Mapping[str, float]]]) -> "ImpactMatrix":
+        """Build from ``(id, {objective type: impact})`` pairs (unknown types are ignored)."""
+        items = list(items)
+        values = np.zeros((len(items), len(OBJECTIVE_TYPES)), dtype=np.float64)
+        for i, (_, impacts) in enumerate(items):
+            for obj_type, impact in impacts.items():
+                column = OBJECTIVE_INDEX.get(obj_type)
+                if column is not None:
+                    values[i, column] = impact or 0.0
+        return cls([behavior_id for behavior_id, _ in items], values)
+
+    def __len__(self) -> int:
+        return len(self.behavior_ids)
+
+    def __contains__(self, behavior_id: UUID) -> bool:
+        return behavior_id in self.index
+
+    def row(self, behavior_id: UUID) -> np.ndarray:
+        """Impacts of one behavior, in ``OBJECTIVE_TYPES`` order."""
+        return self.values[self.index[behavior_id]]
+
+    def impacts(self, behavior_id: UUID) -> Dict[str, float]:
+        """Impacts of one behavior as ``{objective type: impact}``."""
+        return dict(zip(OBJECTIVE_TYPES, self.row(behavior_id).tolist()))
+
+    @staticmethod
+    def weight_vector(weights: Mapping[str, float]) -> np.ndarray:
+        """Objective weights as a vector aligned with the matrix columns."""
+        vector = np.zeros(len(OBJECTIVE_TYPES), dtype=np.float64)
+        for obj_type, weight in weights.items():
+            column = OBJECTIVE_INDEX.get(obj_type)
+            if column is not None:
+                vector[column] = weight or 0.0
+        return vector
+
+    def scores(self, weights: Mapping[str, float]) -> np.ndarray:
+        """Weighted impact of every behavior (one matrix-vector product)."""
+        return self.values @ self.weight_vector(weights)
+
+    def contributions(self, minutes: np.ndarray) -> np.ndarray:
+        """Impact per objective type of spending ``minutes[i]`` on behavior ``i``."""
+        return minutes @ self.values
+
+    def subset(self, behavior_ids: Sequence[UUID]) -> "ImpactMatrix":
+        """Rows for the given behaviors, in that order."""
+        return ImpactMatrix(behavior_ids, self.values[[self.index[b] for b in behavior_ids]])
+
+
+def objective_impacts(
+    matrix: ImpactMatrix, behavior_id: UUID, objective_map: Optional[Mapping[str, UUID]]
+) -> List[Tuple[str, UUID, float]]:
+    """Non-zero ``(objective type, objective id, impact)`` of a behavior for the user's objectives."""
+    if not objective_map:
+        return []
+    row = matrix.row(behavior_id)
+    result = []
+    for obj_type, obj_id in objective_map.items():
+        column = OBJECTIVE_INDEX.get(obj_type)
+        impact = float(row[column]) if column is not None else 0.0
+        if impact != 0:
+            result.append((obj_type, obj_id, impact))
+    return result
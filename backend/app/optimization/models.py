@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Optional
 from uuid import UUID
 from datetime import date
 
+from .impacts import ImpactMatrix
+
 
 @dataclass
 class BehaviorScheduleInput:
@@ -47,6 +49,8 @@ class OptimizationProblem:
     start_date: date
     end_date: date
     time_periods: int
+    # Impacts of ``behaviors`` when the caller already built them (e.g. from the models)
+    impact_matrix: Optional[ImpactMatrix] = None
 
     def __post_init__(self):
         """Validate problem specification."""
@@ -69,6 +73,13 @@ class OptimizationProblem:
         """Get active constraints."""
         return [c for c in self.constraints if c.is_active]
 
+    def impacts(self) -> ImpactMatrix:
+        """Impact matrix with rows in ``behaviors`` order."""
+        behavior_ids = [b.id for b in self.behaviors]
+        if self.impact_matrix is not None and all(b in self.impact_matrix for b in behavior_ids):
+            return self.impact_matrix.subset(behavior_ids)
+        return ImpactMatrix.from_impact_dicts((b.id, b.impacts) for b in self.behaviors)
+
 
 @dataclass
 class ScheduleItem:
@@ -90,6 +101,23 @@ class ObjectiveContribution:
     weight: float
 
 
+@dataclass
+class SolverProgress:
+    """Snapshot of solver progress (incumbent and bound in the problem's sense)."""
+
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    nodes: Optional[int] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def gap(self) -> Optional[float]:
+        """Get relative gap between incumbent and bound."""
+        if self.objective is None or self.best_bound is None:
+            return None
+        return abs(self.best_bound - self.objective) / max(abs(self.objective), 1e-9)
+
+
 @dataclass
 class OptimizationSolution:
     """Complete optimization solution."""
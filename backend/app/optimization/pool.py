@@ -0,0 +1,134 @@
+"""Bounded worker pool for running solvers off the event loop."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitExceededError
+from app.core.profiling import current_profile, profile_thread
+from app.core.metrics import (
+    solver_queue_depth,
+    solver_queue_wait_seconds,
+    solver_rejected_total,
+    solver_solve_duration_seconds,
+)
+from app.optimization.models import OptimizationProblem, OptimizationSolution, SolverProgress
+
+
+class SolverPool:
+    """Runs blocking solver calls in worker threads.
+
+    CBC itself runs as a subprocess, so a thread per solve is enough to keep
+    the event loop free. At most ``max_workers`` solves run concurrently;
+    once ``max_pending`` are running or queued, new ones are rejected with a
+    429 instead of queueing behind a long backlog.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """Initialize pool."""
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solver")
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_solve_seconds = 0.0
+
+    def ensure_capacity(self) -> None:
+        """Raise RateLimitExceededError if no more solves can be queued."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            solver_rejected_total.inc()
+            raise RateLimitExceededError(
+                "Too many optimization requests in progress",
+                detail="The optimizer is busy, please retry shortly",
+            )
+
+    async def solve(
+        self,
+        solver,
+        problem: OptimizationProblem,
+        optimization_run_id: UUID,
+        on_start: Optional[Callable[[], None]] = None,
+        on_progress: Optional[Callable[[SolverProgress], None]] = None,
+    ) -> OptimizationSolution:
+        """Solve a problem in the pool.
+
+        ``on_start`` and ``on_progress`` are invoked on the event loop thread,
+        so they may safely touch asyncio objects such as queues.
+        """
+        self.ensure_capacity()
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        profile = current_profile.get()
+
+        progress_callback = None
+        if on_progress is not None:
+            def progress_callback(progress: SolverProgress) -> None:
+                snapshot = SolverProgress(**vars(progress))
+                loop.call_soon_threadsafe(on_progress, snapshot)
+
+        def timed():
+            started = time.perf_counter()
+            if on_start is not None:
+                loop.call_soon_threadsafe(on_start)
+            solver_queue_wait_seconds.observe(started - submitted)
+            outcome = "error"
+            try:
+                with profile_thread(profile):
+                    solution = solver.solve(problem, optimization_run_id, progress_callback)
+                outcome = solution.status
+            finally:
+                ran = time.perf_counter() - started
+                self.total_solve_seconds += ran
+                solver_solve_duration_seconds.labels(outcome=outcome).observe(ran)
+            return solution, started - submitted, ran
+
+        self.pending += 1
+        solver_queue_depth.inc()
+        try:
+            solution, waited, ran = await loop.run_in_executor(self._executor, timed)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            solver_queue_depth.dec()
+
+        self.completed += 1
+        self.total_wait_seconds += waited
+        if profile is not None:
+            profile.add_span("solver", ran)
+        if solution.execution_time_seconds is None:
+            solution.execution_time_seconds = ran
+        return solution
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get queue and latency metrics."""
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self.pending, self.max_workers),
+            "queued": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": (self.total_wait_seconds / self.completed * 1000) if self.completed else 0.0,
+            "avg_solve_ms": (self.total_solve_seconds / finished * 1000) if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker threads."""
+        self._executor.shutdown(wait=False)
+
+
+solver_pool = SolverPool(
+    max_workers=settings.SOLVER_WORKERS,
+    max_pending=settings.SOLVER_MAX_PENDING,
+)
@@ -1,9 +1,15 @@
 """Linear programming solver for behavior optimization."""
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Any
 from uuid import UUID
 from datetime import date
 
+import numpy as np
 from pulp import (
     LpMaximize,
     LpProblem,
@@ -19,15 +25,115 @@ from app.core.exceptions import (
     SolverTimeoutError,
     SolverError,
 )
+from app.optimization.impacts import OBJECTIVE_TYPES
 from app.optimization.models import (
     OptimizationProblem,
     OptimizationSolution,
     ScheduleItem,
     ObjectiveContribution,
+    SolverProgress,
 )
 
 logger = logging.getLogger(__name__)
 
+# CBC log lines carrying progress. CBC minimizes internally, so with ``-max``
+# the Cbc* values are negated; the summary lines use the problem's own sense.
+CBC_INCUMBENT = re.compile(r"Cbc00(?:04|12)I Integer solution of (\S+)")
+CBC_NODES = re.compile(r"Cbc0010I After (\d+) nodes, \d+ on tree, (\S+) best solution, best possible (\S+)")
+CBC_ROOT_BOUND = re.compile(r"Cbc0013I At root node, .* to (\S+) in")
+CBC_CONTINUOUS = re.compile(r"Continuous objective value is (\S+)")
+CBC_FINAL = re.compile(r"Objective value:\s+(\S+)")
+
+# CBC reports "no solution yet" as 1e50
+CBC_INFINITY = 1e49
+
+
+class CbcLogWatcher(threading.Thread):
+    """Tails a CBC log file and reports incumbent/bound improvements."""
+
+    def __init__(
+        self,
+        path: str,
+        callback: Callable[[SolverProgress], None],
+        sense: int = -1,
+        poll_seconds: float = 0.2,
+    ):
+        """Initialize watcher; ``sense`` is -1 for maximization problems."""
+        super().__init__(name="cbc-log-watcher", daemon=True)
+        self.path = path
+        self.callback = callback
+        self.sense = sense
+        self.poll_seconds = poll_seconds
+        self.progress = SolverProgress()
+        self._started_at = time.monotonic()
+        self._offset = 0
+        self._buffer = ""
+        self._optimal = False
+        self._stop_event = threading.Event()
+
+    def _value(self, raw: str, cbc_sense: bool = True) -> Optional[float]:
+        try:
+            value = float(raw)
+        except ValueError:
+            return None
+        if abs(value) >= CBC_INFINITY:
+            return None
+        return value * self.sense if cbc_sense else value
+
+    def parse_line(self, line: str) -> bool:
+        """Update progress from one log line; return True if it changed."""
+        progress = self.progress
+        before = (progress.objective, progress.best_bound, progress.nodes)
+
+        if match := CBC_INCUMBENT.search(line):
+            progress.objective = self._value(match.group(1))
+        elif match := CBC_NODES.search(line):
+            progress.nodes = int(match.group(1))
+            progress.objective = self._value(match.group(2))
+            progress.best_bound = self._value(match.group(3))
+        elif match := CBC_ROOT_BOUND.search(line):
+            progress.best_bound = self._value(match.group(1))
+        elif match := CBC_CONTINUOUS.search(line):
+            progress.best_bound = self._value(match.group(1), cbc_sense=False)
+        elif line.startswith("Result - Optimal"):
+            self._optimal = True
+        elif match := CBC_FINAL.search(line):
+            progress.objective = self._value(match.group(1), cbc_sense=False)
+            if self._optimal:
+                progress.best_bound = progress.objective
+
+        return (progress.objective, progress.best_bound, progress.nodes) != before
+
+    def _read_new_lines(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+                self._offset = f.tell()
+        except FileNotFoundError:
+            return
+
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            if self.parse_line(line):
+                self.progress.elapsed_seconds = time.monotonic() - self._started_at
+                try:
+                    self.callback(self.progress)
+                except Exception as e:
+                    logger.warning(f"Solver progress callback failed: {str(e)}")
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.poll_seconds):
+            self._read_new_lines()
+
+    def stop(self) -> None:
+        """Stop polling and process whatever the solver wrote last."""
+        self._stop_event.set()
+        self.join()
+        self._buffer += "\n"
+        self._read_new_lines()
+
 
 class LinearSolver:
     """Linear programming solver using PuLP."""
@@ -40,8 +146,14 @@ class LinearSolver:
         self,
         problem: OptimizationProblem,
         optimization_run_id: UUID,
+        progress_callback: Optional[Callable[[SolverProgress], None]] = None,
     ) -> OptimizationSolution:
-        """Solve the optimization problem."""
+        """Solve the optimization problem.
+
+        When ``progress_callback`` is given, CBC logs to a temporary file that
+        is tailed on a helper thread, and the callback receives incumbent
+        objective / bound updates as the search improves.
+        """
         try:
             # Create LP problem
             lp_problem = LpProblem(f"BehaviorOptimization_{optimization_run_id}", LpMaximize)
@@ -66,18 +178,16 @@ class LinearSolver:
                         cat="Continuous",
                     )
 
-            # Objective: weighted sum of objective contributions
-            objective = 0
-            for obj_type, weight in problem.objectives.items():
-                obj_value = 0
-                for b_idx, behavior in enumerate(behaviors):
-                    impact = behavior.impacts.get(obj_type, 0.0)
-                    for t in range(time_periods):
-                        obj_value += impact * d[(b_idx, t)]
-
-                objective += weight * obj_value
-
-            lp_problem += objective
+            # Objective: weighted sum of objective contributions. The weights
+            # fold into one coefficient per behavior (impacts @ weights).
+            impacts = problem.impacts()
+            coefficients = impacts.scores(problem.objectives).tolist()
+            lp_problem += lpSum(
+                coefficients[b_idx] * d[(b_idx, t)]
+                for b_idx in range(len(behaviors))
+                if coefficients[b_idx]
+                for t in range(time_periods)
+            )
 
             # Constraints
             # 1. Duration bounds for scheduled behaviors
@@ -127,8 +237,20 @@ class LinearSolver:
                         logger.warning(f"Behavior {behavior_id} not found for frequency constraint")
 
             # Solve
-            solver = PULP_CBC_CMD(timeLimit=self.timeout_seconds, msg=0)
-            lp_problem.solve(solver)
+            log_path = None
+            watcher = None
+            if progress_callback is not None:
+                fd, log_path = tempfile.mkstemp(prefix="cbc_", suffix=".log")
+                os.close(fd)
+                watcher = CbcLogWatcher(log_path, progress_callback)
+                watcher.start()
+            try:
+                solver = PULP_CBC_CMD(timeLimit=self.timeout_seconds, msg=0, logPath=log_path)
+                lp_problem.solve(solver)
+            finally:
+                if watcher is not None:
+                    watcher.stop()
+                    os.unlink(log_path)
 
             # Check status
             status = LpStatus[lp_problem.status]
@@ -157,18 +279,18 @@ class LinearSolver:
                                 )
                             )
 
-            # Calculate objective contributions
+            # Calculate objective contributions: minutes per behavior @ impacts
             objective_contributions = {}
             total_value = lp_problem.objective.value() if status == "Optimal" else 0
 
-            for obj_type, weight in problem.objectives.items():
-                contribution = 0
-                for b_idx, behavior in enumerate(behaviors):
-                    impact = behavior.impacts.get(obj_type, 0.0)
-                    for t in range(time_periods):
-                        if d[(b_idx, t)].varValue:
-                            contribution += impact * d[(b_idx, t)].varValue
+            minutes = np.array([
+                sum(d[(b_idx, t)].varValue or 0.0 for t in range(time_periods))
+                for b_idx in range(len(behaviors))
+            ])
+            per_objective = dict(zip(OBJECTIVE_TYPES, impacts.contributions(minutes).tolist()))
 
+            for obj_type, weight in problem.objectives.items():
+                contribution = per_objective.get(obj_type, 0.0)
                 objective_contributions[obj_type] = ObjectiveContribution(
                     objective_type=obj_type,
                     contribution=contribution * weight if weight else 0,
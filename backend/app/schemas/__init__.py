@@ -14,6 +14,9 @@ from .behavior import (
     BehaviorResponse,
     BehaviorListResponse,
     BehaviorStatistics,
+    BehaviorImportRequest,
+    BehaviorImportItemResult,
+    BehaviorImportResponse,
     ObjectiveImpactCreate,
     ObjectiveImpactResponse,
 )
@@ -22,6 +25,7 @@ from .optimization import (
     OptimizationResult,
     OptimizationRunResponse,
     OptimizationHistoryResponse,
+    OptimizationProgress,
     ScheduledBehaviorResponse,
     ObjectiveContributionSchema,
     InfeasibilityDiagnostics,
@@ -30,12 +34,20 @@ from .tracking import (
     CompletionLogCreate,
     CompletionLogUpdate,
     CompletionLogResponse,
+    BulkCompletionItem,
+    BulkCompletionRequest,
+    BulkCompletionItemResult,
+    BulkCompletionResponse,
 )
 from .common import (
     ErrorResponse,
     SuccessResponse,
     PaginationParams,
     HealthCheckResponse,
+    HealthCheckResult,
+    ReadinessResponse,
+    ProfileSummary,
+    ProfileReport,
 )
 from .api import ApiResponse
 
@@ -52,20 +64,32 @@ __all__ = [
     "BehaviorResponse",
     "BehaviorListResponse",
     "BehaviorStatistics",
+    "BehaviorImportRequest",
+    "BehaviorImportItemResult",
+    "BehaviorImportResponse",
     "ObjectiveImpactSchema",
     "OptimizationRequest",
     "OptimizationResult",
     "OptimizationRunResponse",
     "OptimizationHistoryResponse",
+    "OptimizationProgress",
     "ScheduledBehaviorResponse",
     "ObjectiveContributionSchema",
     "InfeasibilityDiagnostics",
     "CompletionLogCreate",
     "CompletionLogUpdate",
     "CompletionLogResponse",
+    "BulkCompletionItem",
+    "BulkCompletionRequest",
+    "BulkCompletionItemResult",
+    "BulkCompletionResponse",
     "ErrorResponse",
     "SuccessResponse",
     "PaginationParams",
     "HealthCheckResponse",
+    "HealthCheckResult",
+    "ReadinessResponse",
+    "ProfileSummary",
+    "ProfileReport",
     "ApiResponse",
 ]
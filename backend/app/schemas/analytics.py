@@ -1,6 +1,6 @@
 """Analytics schemas."""
 from datetime import date, datetime
-from typing import List, Literal
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -100,10 +100,14 @@ class AnalyticsData(BaseModel):
     """Analytics data."""
 
     period: str
+    # Size of each point of the series below: one day, week or month
+    bucket: Literal["day", "week", "month"] = "day"
     behaviorCompletions: List[BehaviorCompletion] = Field(..., validation_alias="behavior_completions", serialization_alias="behaviorCompletions")
     objectiveProgress: List[ObjectiveProgress] = Field(..., validation_alias="objective_progress", serialization_alias="objectiveProgress")
     categoryDistribution: List[CategoryDistribution] = Field(..., validation_alias="category_distribution", serialization_alias="categoryDistribution")
     energyUsage: List[EnergyUsage] = Field(..., validation_alias="energy_usage", serialization_alias="energyUsage")
+    # Share of scheduled behaviors completed in the period (None when nothing was scheduled)
+    adherence: Optional[float] = None
 
     class Config:
         populate_by_name = True
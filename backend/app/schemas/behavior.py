@@ -1,5 +1,5 @@
 """Behavior schemas."""
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -109,7 +109,37 @@ class BehaviorResponse(BaseModel):
 class BehaviorListResponse(BaseModel):
     """Behavior list response."""
 
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    nextCursor: Optional[str] = None
     data: List[BehaviorResponse]
+
+
+class BehaviorImportRequest(BaseModel):
+    """Bulk behavior import request.
+
+    Items have the shape of ``BehaviorCreate`` and are validated one by one,
+    so an invalid item is reported without rejecting the batch.
+    """
+
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=500)
+
+
+class BehaviorImportItemResult(BaseModel):
+    """Outcome of a single item in a bulk behavior import."""
+
+    index: int
+    status: Literal["created", "invalid", "duplicate"]
+    id: Optional[UUID] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class BehaviorImportResponse(BaseModel):
+    """Bulk behavior import response."""
+
+    created: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    results: List[BehaviorImportItemResult] = Field(default_factory=list)
+
@@ -1,4 +1,5 @@
 """Common schemas."""
+from datetime import datetime
 from typing import Optional, List, Any, Dict
 from pydantic import BaseModel, Field
 
@@ -38,3 +39,44 @@ class HealthCheckResponse(BaseModel):
     version: str
     environment: str
     database: str = "connected"
+
+
+class HealthCheckResult(BaseModel):
+    """Result of one readiness check."""
+
+    status: str  # ok, degraded, fail
+    latencyMs: Optional[float] = None
+    detail: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response."""
+
+    status: str  # ready, degraded, not_ready
+    version: str
+    checks: Dict[str, HealthCheckResult]
+
+
+class ProfileSummary(BaseModel):
+    """A stored request profile."""
+
+    id: str
+    trigger: str  # header, sampled
+    createdAt: datetime
+    method: str
+    path: str
+    route: str
+    status: int
+    durationMs: float
+    dbQueries: int
+    dbMs: float
+    totalCalls: int
+    spansMs: Dict[str, float] = {}
+    topQueries: List[Dict[str, Any]] = []
+
+
+class ProfileReport(ProfileSummary):
+    """A stored request profile with its pstats report."""
+
+    report: str
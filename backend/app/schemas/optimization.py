@@ -87,12 +87,25 @@ class OptimizationResult(BaseModel):
     schedule: Optional["DailySchedule"] = None
 
 
+class OptimizationProgress(BaseModel):
+    """Streamed optimization status / progress event."""
+
+    runId: UUID
+    status: str  # queued, running, saving, completed, failed
+    objective: Optional[float] = None
+    bestBound: Optional[float] = None
+    gap: Optional[float] = None
+    nodes: Optional[int] = None
+    elapsedSeconds: Optional[float] = None
+
+
 class OptimizationHistoryResponse(BaseModel):
     """Optimization history response."""
 
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    nextCursor: Optional[str] = None
     data: List[OptimizationRunResponse]
 
 
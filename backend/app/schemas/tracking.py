@@ -1,6 +1,6 @@
 """Tracking schemas."""
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -45,3 +45,37 @@ class CompletionLogResponse(CompletionLogBase):
         """Pydantic config."""
 
         from_attributes = True
+
+
+class BulkCompletionItem(BaseModel):
+    """Single completion state change in a bulk sync."""
+
+    scheduledBehaviorId: UUID
+    isCompleted: bool = True
+    actualDuration: Optional[int] = Field(None, gt=0)
+    completedAt: Optional[datetime] = None
+    satisfactionScore: Optional[int] = Field(None, ge=1, le=5)
+    notes: Optional[str] = None
+
+
+class BulkCompletionRequest(BaseModel):
+    """Bulk completion sync request."""
+
+    items: List[BulkCompletionItem] = Field(..., min_length=1, max_length=500)
+
+
+class BulkCompletionItemResult(BaseModel):
+    """Outcome of a single item in a bulk completion sync."""
+
+    scheduledBehaviorId: UUID
+    status: Literal["completed", "already_completed", "uncompleted", "not_completed", "not_found"]
+
+
+class BulkCompletionResponse(BaseModel):
+    """Bulk completion sync response."""
+
+    completed: int = 0
+    uncompleted: int = 0
+    unchanged: int = 0
+    notFound: int = 0
+    results: List[BulkCompletionItemResult] = Field(default_factory=list)
@@ -0,0 +1,35 @@
+"""Create upcoming completion log partitions and archive old months.
+
+Intended to run daily (cron / scheduled job). Run from the backend directory:
+    python -m scripts.archive_completion_logs [--retention-months 12] [--directory ./archive]
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.database import async_session_maker, close_db
+from app.db.partitions import archive_completion_logs, ensure_completion_log_partitions
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(retention_months, directory, months_ahead) -> None:
+    async with async_session_maker() as session:
+        created = await ensure_completion_log_partitions(session, months_ahead)
+        archived = await archive_completion_logs(session, retention_months, directory)
+    await close_db()
+
+    logger.info(f"Created {len(created)} partitions")
+    for month in archived:
+        action = "dropped partition" if month.dropped_partition else "deleted rows"
+        logger.info(f"{month.month:%Y-%m}: {month.rows} rows -> {month.path} ({action})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retention-months", type=int, default=None)
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--months-ahead", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.retention_months, args.directory, args.months_ahead))
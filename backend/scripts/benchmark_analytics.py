@@ -0,0 +1,94 @@
+"""Benchmark the analytics engine on large completion histories.
+
+Times building the columnar history from fetched rows and computing the
+per-day totals daily_progress rebuilds and recomputations write, against the
+per-row Python loops it replaced.
+
+Run from the backend directory:
+    python -m scripts.benchmark_analytics [--rows 1000000] [--days 365] [--behaviors 50]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+
+from app.analytics import CompletionHistory, summarize_objectives
+from app.analytics.progress import history_totals
+from app.optimization import OBJECTIVE_TYPES
+
+
+def build_rows(rows: int, days: int, behaviors: int, start: date):
+    behavior_rows = [
+        (uuid4(), float(random.randint(1, 10)), *(round(random.uniform(-1, 1), 2) for _ in OBJECTIVE_TYPES))
+        for _ in range(behaviors)
+    ]
+    origin = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+    completion_rows = [
+        (
+            origin + timedelta(minutes=random.randrange(days * 1440)),
+            behavior_rows[random.randrange(behaviors)][0],
+            random.randint(5, 120),
+            random.choice((None, 1, 2, 3, 4, 5)),
+        )
+        for _ in range(rows)
+    ]
+    return completion_rows, behavior_rows
+
+
+def loop_aggregates(completions, behaviors, start: date, days: int):
+    """The straightforward per-row implementation, for comparison."""
+    by_id = {row[0]: row for row in behaviors}
+    energy = defaultdict(float)
+    impact = defaultdict(float)
+    for completed_at, behavior_id, duration, _ in completions:
+        behavior = by_id[behavior_id]
+        day = completed_at.date()
+        energy[day] += behavior[1]
+        for i, obj_type in enumerate(OBJECTIVE_TYPES):
+            impact[(day, obj_type)] += behavior[2 + i] * duration
+    return energy, impact
+
+
+def timed(label: str, fn, rounds: int = 1):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    elapsed = (time.perf_counter() - started) / rounds
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main(rows: int, days: int, behaviors: int) -> None:
+    random.seed(42)
+    start = date(2025, 1, 1)
+    print(f"Generating {rows:,} completions over {days} days for {behaviors} behaviors...")
+    completions, behavior_rows = build_rows(rows, days, behaviors, start)
+
+    history = timed("columnar history from rows", lambda: CompletionHistory.from_rows(
+        start, days, completions, behavior_rows
+    ))
+    timed("daily completions / energy / minutes", lambda: (
+        history.daily_completions(), history.daily_energy(), history.daily_minutes()
+    ), rounds=5)
+    timed("daily_progress totals of active days", lambda: history_totals(history), rounds=5)
+    timed("objective progress + trends", lambda: summarize_objectives(history.daily_objective_impact(), OBJECTIVE_TYPES), rounds=5)
+    timed("per-row Python loop (energy + impact)", lambda: loop_aggregates(
+        completions, behavior_rows, start, days
+    ))
+
+    energy, _ = loop_aggregates(completions[:1000], behavior_rows, start, days)
+    check = CompletionHistory.from_rows(start, days, completions[:1000], behavior_rows).daily_energy()
+    assert np.allclose([energy.get(start + timedelta(days=i), 0.0) for i in range(days)], check)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--behaviors", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rows, args.days, args.behaviors)
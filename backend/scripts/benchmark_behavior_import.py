@@ -0,0 +1,95 @@
+"""Benchmark creating behaviors one request at a time vs the bulk import.
+
+Drives the API in-process against a temporary SQLite database and reports
+behaviors created per second for ``POST /behaviors`` in a loop and for
+``POST /behaviors/import`` in batches.
+
+Run from the backend directory:
+    python -m scripts.benchmark_behavior_import [--behaviors 500] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Per-request rate limits would throttle the one-at-a-time loop
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.database import Base, get_analytics_db, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def behavior_item(i: int, objective_ids) -> dict:
+    return {
+        "name": f"Habit {i}",
+        "category": "health",
+        "energyCost": 1 + i % 10,
+        "durationMin": 10,
+        "durationMax": 30 + i % 30,
+        "objectiveImpacts": [
+            {"objectiveId": objective_id, "impactScore": 0.5} for objective_id in objective_ids[: 1 + i % 3]
+        ],
+    }
+
+
+async def register(client: AsyncClient, email: str) -> list:
+    """Register and log in a user; returns their objective ids."""
+    await client.post("/api/v1/auth/register", json={"email": email, "name": "Bench", "password": "Password123"})
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": "Password123"})
+    client.headers["Authorization"] = f"Bearer {response.json()['accessToken']}"
+    objectives = (await client.get("/api/v1/behaviors/objectives")).json()["data"]
+    return [o["id"] for o in objectives]
+
+
+async def main(behaviors: int, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def get_bench_db():
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = get_bench_db
+        app.dependency_overrides[get_analytics_db] = get_bench_db
+        transport = ASGITransport(app=app)
+        try:
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                objective_ids = await register(client, "single@example.com")
+                started = time.perf_counter()
+                for i in range(behaviors):
+                    response = await client.post("/api/v1/behaviors", json=behavior_item(i, objective_ids))
+                    assert response.status_code == 201, response.text
+                single = time.perf_counter() - started
+
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                objective_ids = await register(client, "bulk@example.com")
+                items = [behavior_item(i, objective_ids) for i in range(behaviors)]
+                started = time.perf_counter()
+                for offset in range(0, behaviors, batch_size):
+                    response = await client.post(
+                        "/api/v1/behaviors/import", json={"items": items[offset:offset + batch_size]}
+                    )
+                    assert response.json()["data"]["created"] == len(items[offset:offset + batch_size])
+                bulk = time.perf_counter() - started
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+    print(f"{'POST /behaviors, one per request':<40} {single * 1000:10.1f} ms {behaviors / single:10.0f} behaviors/s")
+    print(f"{f'POST /behaviors/import, {batch_size} per batch':<40} {bulk * 1000:10.1f} ms {behaviors / bulk:10.0f} behaviors/s")
+    print(f"Speedup: {single / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--behaviors", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.behaviors, args.batch_size))
@@ -0,0 +1,121 @@
+"""Benchmark response serialization: FastAPI default path vs model_response.
+
+Run from the backend directory:
+    python -m scripts.benchmark_serialization [--items 1000] [--rounds 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.responses import model_response
+from app.schemas.api import ApiResponse
+from app.schemas.behavior import BehaviorListResponse, BehaviorResponse, BehaviorStatistics, ObjectiveImpactResponse
+from app.schemas.optimization import (
+    ObjectiveContributionSchema,
+    OptimizationHistoryResponse,
+    OptimizationRunResponse,
+)
+
+
+def build_behavior_list(count: int) -> ApiResponse[BehaviorListResponse]:
+    now = datetime.now(timezone.utc)
+    items = [
+        BehaviorResponse(
+            id=uuid4(),
+            user_id=uuid4(),
+            name=f"Behavior {i}",
+            description="Benchmark behavior",
+            category="health",
+            energy_cost=3,
+            duration_min=15,
+            duration_max=60,
+            preferred_time_slots=["morning", "evening"],
+            objective_impacts=[
+                ObjectiveImpactResponse(objectiveId=uuid4(), objectiveName="Health", impactScore=0.8),
+                ObjectiveImpactResponse(objectiveId=uuid4(), objectiveName="Productivity", impactScore=0.3),
+            ],
+            is_active=True,
+            frequency="daily",
+            created_at=now,
+            updated_at=now,
+            statistics=BehaviorStatistics(total_completions=12, avg_duration=30.5, last_completed=now),
+        )
+        for i in range(count)
+    ]
+    return ApiResponse[BehaviorListResponse](
+        data=BehaviorListResponse(total=count, skip=0, limit=count, data=items),
+        message=f"Retrieved {count} behaviors",
+    )
+
+
+def build_history(count: int) -> ApiResponse[OptimizationHistoryResponse]:
+    now = datetime.now(timezone.utc)
+    items = [
+        OptimizationRunResponse(
+            id=uuid4(),
+            userId=uuid4(),
+            status="completed",
+            solverStatus="optimal",
+            objectiveContributions=[
+                ObjectiveContributionSchema(objectiveId=uuid4(), objectiveName=name, contribution=12.5, percentage=25.0)
+                for name in ("Health", "Productivity", "Learning", "Wellness")
+            ],
+            totalScore=50.0,
+            executionTimeMs=120,
+            constraintsSatisfied=40,
+            constraintsTotal=40,
+            createdAt=now,
+            completedAt=now,
+        )
+        for _ in range(count)
+    ]
+    return ApiResponse[OptimizationHistoryResponse](
+        data=OptimizationHistoryResponse(total=count, skip=0, limit=count, data=items),
+        message=f"Retrieved {count} optimization runs",
+    )
+
+
+async def default_path(field, model) -> bytes:
+    """What FastAPI does when a handler returns ``model.dict(exclude_none=True)``."""
+    content = await serialize_response(field=field, response_content=model.model_dump(exclude_none=True), is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def measure(name: str, model, rounds: int) -> None:
+    field = create_response_field(name="response", type_=type(model))
+
+    # Both paths must produce the same document
+    assert json.loads(await default_path(field, model)) == json.loads(model_response(model).body)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await default_path(field, model)
+    default_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        model_response(model)
+    fast_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    print(f"{name}: default {default_ms:.2f} ms, fast {fast_ms:.2f} ms ({default_ms / fast_ms:.1f}x)")
+
+
+async def main(items: int, rounds: int) -> None:
+    print(f"Serializing {items} items, {rounds} rounds")
+    await measure("BehaviorListResponse", build_behavior_list(items), rounds)
+    await measure("OptimizationHistoryResponse", build_history(items), rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.rounds))
@@ -0,0 +1,33 @@
+"""Delete superseded optimization runs and compact the ones that are kept.
+
+Intended to run daily (cron / scheduled job). Run from the backend directory:
+    python -m scripts.compact_optimization_runs [--retention-days 14] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.database import async_session_maker, close_db
+from app.db.retention import apply_run_retention
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(retention_days, batch_size) -> None:
+    async with async_session_maker() as session:
+        report = await apply_run_retention(session, retention_days, batch_size)
+    await close_db()
+
+    logger.info(
+        f"Deleted {report.runs_deleted} runs and {report.scheduled_behaviors_deleted} scheduled behaviors, "
+        f"compacted {report.runs_compacted} runs, reclaimed ~{report.bytes_reclaimed / 1024:.1f} KiB of JSON"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.retention_days, args.batch_size))
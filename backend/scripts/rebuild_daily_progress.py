@@ -0,0 +1,42 @@
+"""Recompute daily progress totals from completion logs.
+
+Totals are maintained as completions are logged and removed and as
+behaviors are edited; run this to repair them, e.g. after writing
+completion_logs outside the API. Days in archived months are left as they
+are. Run from the backend directory:
+    python -m scripts.rebuild_daily_progress [--user-id UUID]
+"""
+import argparse
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.analytics import rebuild_daily_progress
+from app.db.database import async_session_maker, close_db
+from app.models import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: Optional[UUID]) -> None:
+    async with async_session_maker() as session:
+        if user_id is None:
+            user_ids = (await session.execute(select(User.id))).scalars().all()
+        else:
+            user_ids = [user_id]
+        for uid in user_ids:
+            days = await rebuild_daily_progress(session, uid)
+            await session.commit()
+            logger.info(f"Rebuilt {days} days of progress for user {uid}")
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
@@ -11,6 +11,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import text
+from app.analytics import rebuild_daily_progress
 from app.db.database import async_session_maker, init_db
 from app.core.security import hash_password
 from app.models import (
@@ -40,6 +41,8 @@ async def seed_data():
     async with async_session_maker() as session:
         logger.info("Cleaning up existing data...")
         tables = [
+            "daily_progress",
+            "completion_rollups",
             "completion_logs",
             "scheduled_behaviors",
             "optimization_runs",
@@ -237,6 +240,8 @@ async def seed_data():
         ]
         session.add_all(constraints)
 
+        await session.flush()
+        await rebuild_daily_progress(session, test_user.id)
         await session.commit()
         logger.info("Seeding complete! User: test@example.com / password123")
 
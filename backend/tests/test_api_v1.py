@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from datetime import date, datetime, timezone
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_analytics_db, get_db, get_current_active_user
 from app.main import app
 from app.models import User
 
@@ -36,6 +36,7 @@ async def override_get_current_active_user():
     return mock_user
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_analytics_db] = override_get_db
 app.dependency_overrides[get_current_active_user] = override_get_current_active_user
 
 @pytest.mark.asyncio
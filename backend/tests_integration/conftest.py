@@ -9,7 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.db.database import Base, get_db
+from app.api.rate_limit import rate_limiter
+from app.core import cache
+from app.db.database import Base, get_analytics_db, get_db
+from app.db.instrumentation import instrument_engine
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -19,6 +22,7 @@ engine = create_async_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+instrument_engine(engine, "oltp")
 
 TestingSessionLocal = async_sessionmaker(
     engine,
@@ -27,6 +31,14 @@ TestingSessionLocal = async_sessionmaker(
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Start every test with full rate limit buckets and an empty cache."""
+    rate_limiter.reset()
+    cache.backend.clear()
+    yield
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def init_test_db():
     """Initialize test database."""
@@ -53,6 +65,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_analytics_db] = _get_test_db
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
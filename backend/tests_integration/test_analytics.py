@@ -1,5 +1,24 @@
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import numpy as np
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics import (
+    AnalyticsWindow,
+    CompletionHistory,
+    adherence,
+    rebuild_daily_progress,
+    record_completions,
+    remove_completions,
+    summarize_objectives,
+)
+from app.analytics.progress import history_totals
+from app.api.v1 import behaviors
+from app.models import CompletionLog, CompletionRollup, DailyProgress, User
 
 @pytest.mark.asyncio
 async def test_get_analytics_summary(auth_client: AsyncClient):
@@ -20,3 +39,287 @@ async def test_get_analytics_details(auth_client: AsyncClient):
     assert "behaviorCompletions" in data
     assert "objectiveProgress" in data
     assert "categoryDistribution" in data
+
+
+def test_completion_history_aggregates():
+    """Test daily energy, objective impact and trends from columnar completions."""
+    start = date(2026, 1, 1)
+    run, read = uuid4(), uuid4()
+    behaviors = [
+        # id, energy_cost, health, productivity, learning, wellness, social, financial, creativity, mindfulness
+        (run, 3.0, 1.0, 0, 0, 0, 0, 0, 0, 0),
+        (read, 1.0, 0, 0, 0.5, 0, 0, 0, 0, 0),
+    ]
+    completions = [
+        (datetime(2026, 1, 1, 7, tzinfo=timezone.utc), run, 10, 4),
+        (datetime(2026, 1, 2, 7, tzinfo=timezone.utc), run, 20, None),
+        (datetime(2026, 1, 3, 7, tzinfo=timezone.utc), run, 30, 2),
+        (datetime(2026, 1, 3, 21, tzinfo=timezone.utc), read, 40, None),
+        # Outside the window and of an unknown behavior: ignored
+        (datetime(2026, 1, 9, 7, tzinfo=timezone.utc), run, 99, None),
+        (datetime(2026, 1, 2, 7, tzinfo=timezone.utc), uuid4(), 99, None),
+    ]
+    history = CompletionHistory.from_rows(start, 4, completions, behaviors)
+
+    assert len(history) == 4
+    assert history.daily_completions().tolist() == [1, 1, 2, 0]
+    assert history.daily_energy().tolist() == [3.0, 3.0, 4.0, 0.0]
+    assert history.average_satisfaction() == 3.0
+    # daily_progress keeps only days with completions
+    days, totals = history_totals(history)
+    assert days == [date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)]
+    assert totals[:, 2].tolist() == [3.0, 3.0, 4.0]
+
+    summaries = {s.objective_type: s for s in summarize_objectives(history.daily_objective_impact(), ["health", "learning", "social"])}
+    assert summaries["health"].impact == 60.0
+    assert summaries["learning"].impact == 20.0
+    assert summaries["health"].progress == pytest.approx(75.0)
+    assert summaries["social"].progress == 0.0
+    assert summaries["social"].trend == "stable"
+    # 10, 20, 30, 0 minutes of running: least-squares slope of -2/day over a mean of 15
+    assert summaries["health"].slope == pytest.approx(-2.0)
+    assert summaries["health"].trend == "down"
+
+    assert adherence(np.array([1, 3, 0]), np.array([2, 2, 0])) == 0.75
+    assert adherence(np.array([1]), np.array([0])) is None
+
+
+@pytest.mark.asyncio
+async def test_analytics_energy_and_progress(auth_client: AsyncClient, db_session: AsyncSession):
+    """Test energy usage and objective progress come from logged completions."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health = next(o["id"] for o in objectives if o["name"] == "health")
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Run",
+            "category": "health",
+            "energyCost": 4,
+            "durationMin": 10,
+            "durationMax": 60,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 0.9}],
+        },
+    )
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+    log = CompletionLog(
+        user_id=user.id,
+        behavior_id=UUID(created.json()["data"]["id"]),
+        actual_duration=30,
+        completed_at=datetime.now(timezone.utc),
+    )
+    db_session.add(log)
+    await record_completions(db_session, user.id, [log])
+    await db_session.commit()
+
+    response = await auth_client.get("/api/v1/analytics?period=7d")
+    data = response.json()["data"]
+    assert len(data["energyUsage"]) == 7
+    assert data["energyUsage"][-1]["energySpent"] == 4
+    progress = {p["objectiveName"]: p["progress"] for p in data["objectiveProgress"]}
+    assert progress["Health"] == 100.0
+
+
+async def daily_progress_rows(db_session: AsyncSession, user_id) -> list:
+    result = await db_session.execute(
+        select(
+            DailyProgress.day,
+            DailyProgress.completions,
+            DailyProgress.total_duration,
+            DailyProgress.energy_spent,
+            DailyProgress.impact_on_health,
+        ).where(DailyProgress.user_id == user_id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+@pytest.mark.asyncio
+async def test_daily_progress_follows_completion_writes(auth_client: AsyncClient, db_session: AsyncSession):
+    """Test daily totals are kept in step with completions and match a rebuild from the logs."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health = next(o["id"] for o in objectives if o["name"] == "health")
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Stretching",
+            "category": "health",
+            "energyCost": 2,
+            "durationMin": 15,
+            "durationMax": 30,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 0.5}],
+        },
+    )
+    today = date.today().isoformat()
+    await auth_client.post("/api/v1/optimization/solve", json={"targetDate": today})
+    schedule = (await auth_client.get(f"/api/v1/schedule?date={today}")).json()["data"]
+    scheduled_id = schedule["scheduledBehaviors"][0]["id"]
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+
+    response = await auth_client.post(
+        "/api/v1/schedule/completions",
+        json={"items": [{
+            "scheduledBehaviorId": scheduled_id,
+            "isCompleted": True,
+            "actualDuration": 20,
+            "completedAt": "2026-01-05T07:30:00Z",
+        }]},
+    )
+    assert response.json()["data"]["completed"] == 1
+    expected = [(date(2026, 1, 5), 1, 20, 2.0, pytest.approx(10.0))]
+    assert await daily_progress_rows(db_session, user.id) == expected
+
+    assert await rebuild_daily_progress(db_session, user.id) == 1
+    await db_session.commit()
+    assert await daily_progress_rows(db_session, user.id) == expected
+
+    # Removing the completion removes the day
+    await auth_client.post(f"/api/v1/schedule/{scheduled_id}/incomplete")
+    assert await daily_progress_rows(db_session, user.id) == []
+
+
+
+@pytest.mark.asyncio
+async def test_daily_progress_follows_behavior_edits(auth_client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test edits revalue logged days, removals don't drift and rebuilds keep archived months."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health = next(o["id"] for o in objectives if o["name"] == "health")
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Rowing",
+            "category": "health",
+            "energyCost": 2,
+            "durationMin": 10,
+            "durationMax": 60,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 0.5}],
+        },
+    )
+    behavior_id = UUID(created.json()["data"]["id"])
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+    logs = [
+        CompletionLog(
+            user_id=user.id,
+            behavior_id=behavior_id,
+            actual_duration=20,
+            completed_at=datetime(2026, 2, 3, hour, tzinfo=timezone.utc),
+        )
+        for hour in (8, 18)
+    ]
+    db_session.add_all(logs)
+    await record_completions(db_session, user.id, logs)
+    await db_session.commit()
+
+    # A rename resending the same energy and impacts leaves the days alone
+    refreshed = []
+    monkeypatch.setattr(behaviors, "refresh_behavior_progress", lambda *args: refreshed.append(args))
+    await auth_client.put(
+        f"/api/v1/behaviors/{behavior_id}",
+        json={
+            "name": "Indoor rowing",
+            "energyCost": 2,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 0.5}],
+        },
+    )
+    assert refreshed == []
+    monkeypatch.undo()
+
+    await auth_client.put(
+        f"/api/v1/behaviors/{behavior_id}",
+        json={"energyCost": 5, "objectiveImpacts": [{"objectiveId": health, "impactScore": 1.0}]},
+    )
+    assert await daily_progress_rows(db_session, user.id) == [(date(2026, 2, 3), 2, 40, 10.0, pytest.approx(40.0))]
+
+    await remove_completions(db_session, user.id, logs[:1])
+    await db_session.delete(logs[0])
+    await db_session.commit()
+    assert await daily_progress_rows(db_session, user.id) == [(date(2026, 2, 3), 1, 20, 5.0, pytest.approx(20.0))]
+
+    # January is archived: its totals survive a rebuild though its logs are gone
+    db_session.add_all([
+        CompletionRollup(
+            behavior_id=behavior_id,
+            month=date(2026, 1, 1),
+            user_id=user.id,
+            completions=1,
+            total_duration=30,
+            satisfaction_total=0,
+            satisfaction_count=0,
+        ),
+        DailyProgress(user_id=user.id, day=date(2026, 1, 9), completions=1, total_duration=30, energy_spent=2.0),
+    ])
+    await db_session.commit()
+    assert await rebuild_daily_progress(db_session, user.id) == 1
+    await db_session.commit()
+    assert sorted(await daily_progress_rows(db_session, user.id)) == [
+        (date(2026, 1, 9), 1, 30, 2.0, 0.0),
+        (date(2026, 2, 3), 1, 20, 5.0, pytest.approx(20.0)),
+    ]
+
+
+def test_analytics_window_buckets():
+    """Test periods in days, weeks, months and years pick a bounded bucket size."""
+    today = date(2026, 3, 31)  # a Tuesday
+
+    week = AnalyticsWindow.from_period("7d", today)
+    assert (week.start, week.bucket, len(week.bucket_dates)) == (date(2026, 3, 25), "day", 7)
+    assert AnalyticsWindow.from_period("bogus", today) == week
+    assert AnalyticsWindow.from_period("2w", today).start == date(2026, 3, 18)
+    assert AnalyticsWindow.from_period("1m", today).start == date(2026, 3, 1)
+
+    quarter = AnalyticsWindow.from_period("3m", today)
+    # Aligned to the Monday of the week the period starts in
+    assert (quarter.start, quarter.bucket) == (date(2025, 12, 29), "week")
+    assert quarter.bucket_days()[-1] == 2
+
+    decade = AnalyticsWindow.from_period("3650d", today)
+    assert (decade.start, decade.bucket) == (date(2016, 4, 1), "month")
+    assert len(AnalyticsWindow.from_period("99999999999d", today).bucket_dates) <= 121
+    # The in-progress month is left out of trend fitting
+    assert len(decade.trend_series(np.zeros((len(decade.bucket_dates), 8)))) == 12
+
+
+@pytest.mark.asyncio
+async def test_analytics_long_period_is_bucketed(auth_client: AsyncClient, db_session: AsyncSession):
+    """Test long periods report per-week totals grouped in SQL."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health = next(o["id"] for o in objectives if o["name"] == "health")
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Swim",
+            "category": "health",
+            "energyCost": 3,
+            "durationMin": 10,
+            "durationMax": 60,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 1.0}],
+        },
+    )
+    behavior_id = UUID(created.json()["data"]["id"])
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+    today = date.today()
+    days_ago = [40, 40, 100]
+    logs = [
+        CompletionLog(
+            user_id=user.id,
+            behavior_id=behavior_id,
+            actual_duration=30,
+            completed_at=datetime.combine(today - timedelta(days=n), datetime.min.time(), tzinfo=timezone.utc),
+        )
+        for n in days_ago
+    ]
+    db_session.add_all(logs)
+    await record_completions(db_session, user.id, logs)
+    await db_session.commit()
+
+    data = (await auth_client.get("/api/v1/analytics?period=6m")).json()["data"]
+    window = AnalyticsWindow.from_period("6m", today)
+    assert data["bucket"] == "week"
+    assert [e["date"] for e in data["energyUsage"]] == [d.isoformat() for d in window.bucket_dates]
+    assert data["energyUsage"][0]["energyBudget"] == 700
+
+    spent = {e["date"]: e["energySpent"] for e in data["energyUsage"] if e["energySpent"]}
+
+    def monday(day: date) -> str:
+        return (day - timedelta(days=day.weekday())).isoformat()
+
+    assert spent == {monday(today - timedelta(days=40)): 6, monday(today - timedelta(days=100)): 3}
+    assert [c["completed"] for c in data["behaviorCompletions"] if c["completed"]] == [1, 2]
@@ -78,3 +78,45 @@ async def test_refresh_token(client: AsyncClient):
     )
     assert response.status_code == 200
     assert "accessToken" in response.json()
+
+@pytest.mark.asyncio
+async def test_user_status_change_invalidates_cached_principal(auth_client: AsyncClient, db_session):
+    """Test cached principals are evicted when the user row changes."""
+    from sqlalchemy import select
+    from app.models import User
+
+    response = await auth_client.get("/api/v1/behaviors")
+    assert response.status_code == 200
+
+    result = await db_session.execute(select(User).where(User.email == "authuser@example.com"))
+    user = result.scalars().first()
+    user.status = "suspended"
+    await db_session.flush()
+
+    # Evicted only once the change commits, so the old row can't be re-cached
+    response = await auth_client.get("/api/v1/behaviors")
+    assert response.status_code == 200
+
+    await db_session.commit()
+    response = await auth_client.get("/api/v1/behaviors")
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_when_rounds_change(client: AsyncClient, db_session, monkeypatch):
+    """Test login upgrades password hashes created with a different cost."""
+    from sqlalchemy import select
+    from app.core import settings
+    from app.models import User
+
+    credentials = {"email": "rehash@example.com", "password": "Password123"}
+    await client.post("/api/v1/auth/register", json={**credentials, "name": "Rehash User"})
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    response = await client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 200
+
+    result = await db_session.execute(select(User).where(User.email == credentials["email"]))
+    assert result.scalars().first().password_hash.startswith("$2b$04$")
+
+    response = await client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 200
@@ -1,6 +1,8 @@
 import pytest
 from httpx import AsyncClient
 
+from app.db.instrumentation import assert_max_queries, track_queries
+
 async def get_objective_id(auth_client: AsyncClient, objective_type: str) -> str:
     """Helper to get objective ID by type."""
     response = await auth_client.get("/api/v1/behaviors/objectives")
@@ -111,3 +113,137 @@ async def test_delete_behavior(auth_client: AsyncClient):
     # Verify deleted
     get_resp = await auth_client.get(f"/api/v1/behaviors/{behavior_id}")
     assert get_resp.status_code == 404
+
+@pytest.mark.asyncio
+async def test_list_behaviors_cursor_pagination(auth_client: AsyncClient):
+    """Test keyset pagination over behaviors."""
+    names = [f"Habit {i}" for i in range(5)]
+    for name in names:
+        await auth_client.post(
+            "/api/v1/behaviors",
+            json={
+                "name": name,
+                "category": "wellness",
+                "energyCost": 1,
+                "durationMin": 10,
+                "durationMax": 20,
+            }
+        )
+
+    first = (await auth_client.get("/api/v1/behaviors?limit=2")).json()["data"]
+    assert first["total"] == 5
+    assert first["nextCursor"]
+
+    seen = [b["name"] for b in first["data"]]
+    cursor = first["nextCursor"]
+    while cursor:
+        page = (await auth_client.get(f"/api/v1/behaviors?limit=2&cursor={cursor}")).json()["data"]
+        assert page["total"] is None
+        seen.extend(b["name"] for b in page["data"])
+        cursor = page["nextCursor"]
+
+    assert seen == names
+
+    response = await auth_client.get("/api/v1/behaviors?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_behaviors_conditional_get(auth_client: AsyncClient):
+    """Unchanged lists answer If-None-Match with 304; writes change the ETag."""
+    first = await auth_client.get("/api/v1/behaviors")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    not_modified = await auth_client.get("/api/v1/behaviors", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    # Validators are per URL
+    other_page = await auth_client.get("/api/v1/behaviors?limit=5", headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Stretch",
+            "category": "health",
+            "energyCost": 1,
+            "durationMin": 10,
+            "durationMax": 20,
+        }
+    )
+    changed = await auth_client.get("/api/v1/behaviors", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert any(b["name"] == "Stretch" for b in changed.json()["data"]["data"])
+
+@pytest.mark.asyncio
+async def test_list_behaviors_query_count(auth_client: AsyncClient):
+    """Listing behaviors costs the same number of queries for 1 or 5 rows."""
+    async def create(name: str):
+        await auth_client.post(
+            "/api/v1/behaviors",
+            json={"name": name, "category": "wellness", "energyCost": 1, "durationMin": 10, "durationMax": 20},
+        )
+
+    await create("Habit 0")
+    with track_queries() as one:
+        await auth_client.get("/api/v1/behaviors")
+
+    for i in range(1, 5):
+        await create(f"Habit {i}")
+    with assert_max_queries(one.count):
+        response = await auth_client.get("/api/v1/behaviors")
+    assert len(response.json()["data"]["data"]) == 5
+
+
+def import_item(name: str, **fields) -> dict:
+    return {"name": name, "category": "health", "energyCost": 2, "durationMin": 10, "durationMax": 30, **fields}
+
+
+@pytest.mark.asyncio
+async def test_import_behaviors(auth_client: AsyncClient):
+    """Test a bulk import creates valid items and reports invalid and duplicate ones."""
+    health_id = await get_objective_id(auth_client, "health")
+    await auth_client.post("/api/v1/behaviors", json=import_item("Meditate"))
+
+    response = await auth_client.post(
+        "/api/v1/behaviors/import",
+        json={"items": [
+            import_item("Run", objectiveImpacts=[{"objectiveId": health_id, "impactScore": 0.7}]),
+            import_item("Broken", energyCost=11),
+            import_item("meditate"),
+            import_item("RUN"),
+            import_item("Mystery", objectiveImpacts=[
+                {"objectiveId": "00000000-0000-0000-0000-000000000000", "impactScore": 0.5}
+            ]),
+        ]},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["created"], data["invalid"], data["duplicates"]) == (1, 2, 2)
+    assert [r["status"] for r in data["results"]] == ["created", "invalid", "duplicate", "duplicate", "invalid"]
+    assert data["results"][1]["errors"][0].startswith("energyCost:")
+    assert "unknown objective" in data["results"][4]["errors"][0]
+
+    behavior = (await auth_client.get(f"/api/v1/behaviors/{data['results'][0]['id']}")).json()["data"]
+    assert behavior["name"] == "Run"
+    assert behavior["objectiveImpacts"][0]["impactScore"] == 0.7
+    assert len((await auth_client.get("/api/v1/behaviors")).json()["data"]["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_import_behaviors_query_count(auth_client: AsyncClient):
+    """Importing 50 behaviors costs the same number of queries as importing 1."""
+    await get_objective_id(auth_client, "health")
+    with track_queries() as one:
+        await auth_client.post("/api/v1/behaviors/import", json={"items": [import_item("Habit 0")]})
+
+    with assert_max_queries(one.count):
+        response = await auth_client.post(
+            "/api/v1/behaviors/import",
+            json={"items": [import_item(f"Habit {i}") for i in range(1, 51)]},
+        )
+    assert response.json()["data"]["created"] == 50
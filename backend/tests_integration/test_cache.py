@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import Cache, MemoryCacheBackend, RedisCacheBackend
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def _live(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    async def mget(self, keys):
+        return [self._live(k) for k in keys]
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        if isinstance(value, str):
+            value = value.encode()
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def ping(self):
+        return True
+
+
+@pytest.fixture(params=["memory", "redis"])
+def test_cache(request):
+    """Cache over each backend."""
+    if request.param == "memory":
+        backend = MemoryCacheBackend(max_entries=100)
+    else:
+        backend = RedisCacheBackend(FakeRedis())
+    return Cache(backend, namespace="test", default_ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_tag_invalidation(test_cache: Cache):
+    """Test bumping a tag makes dependent entries stale."""
+    key = test_cache.user_key("u1", "summary")
+    tags = [test_cache.user_tag("u1", "behaviors")]
+
+    await test_cache.set(key, {"total": 1}, tags=tags)
+    assert await test_cache.get(key, tags=tags) == {"total": 1}
+
+    await test_cache.invalidate_user("u2", "behaviors")
+    assert await test_cache.get(key, tags=tags) == {"total": 1}
+
+    await test_cache.invalidate_user("u1", "behaviors")
+    assert await test_cache.get(key, tags=tags) is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_single_flight(test_cache: Cache):
+    """Test concurrent misses share a single loader call."""
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    results = await asyncio.gather(*(test_cache.get_or_set("k", loader) for _ in range(10)))
+    assert results == [[1, 2, 3]] * 10
+    assert calls == 1
+
+    assert await test_cache.get_or_set("k", loader) == [1, 2, 3]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    """Test TTL expiry in the memory backend."""
+    backend = MemoryCacheBackend()
+    await backend.set("k", b"v", ttl=1)
+    assert await backend.get_many(["k"]) == [b"v"]
+    backend._data["k"] = (time.monotonic() - 1, b"v")
+    assert await backend.get_many(["k"]) == [None]
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_invalidated_by_writes(auth_client: AsyncClient):
+    """Test dashboard summary reflects writes despite caching."""
+    response = await auth_client.get("/api/v1/analytics/summary")
+    assert response.json()["data"]["stats"]["totalBehaviors"] == 0
+
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Journal",
+            "category": "mindfulness",
+            "energyCost": 1,
+            "durationMin": 10,
+            "durationMax": 20,
+        }
+    )
+
+    response = await auth_client.get("/api/v1/analytics/summary")
+    assert response.json()["data"]["stats"]["totalBehaviors"] == 1
@@ -0,0 +1,20 @@
+from app.core import settings
+from app.db import database
+
+
+def test_engine_options_per_workload(monkeypatch):
+    """Test Postgres pools get their own size, statement timeout and cache settings."""
+    monkeypatch.setattr(database, "is_sqlite", False)
+    monkeypatch.setattr(settings, "TESTING", False)
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_CACHE_SIZE", 0)
+    monkeypatch.setattr(settings, "DATABASE_PREPARED_STATEMENT_CACHE_SIZE", 0)
+
+    oltp = database.engine_options("oltp", 10, 5, 5000)
+    analytics = database.engine_options("analytics", 3, 2, 60000)
+
+    assert (oltp["pool_size"], oltp["max_overflow"]) == (10, 5)
+    assert (analytics["pool_size"], analytics["max_overflow"]) == (3, 2)
+    assert oltp["connect_args"]["server_settings"] == {"application_name": "habitos-oltp", "statement_timeout": "5000"}
+    assert analytics["connect_args"]["server_settings"]["statement_timeout"] == "60000"
+    assert oltp["connect_args"]["statement_cache_size"] == 0
+    assert oltp["connect_args"]["prepared_statement_cache_size"] == 0
@@ -0,0 +1,140 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+from pydantic import ValidationError
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import exports
+from app.core import settings
+from app.core.config import Settings
+from app.models import CompletionLog, User
+
+
+async def create_history(auth_client: AsyncClient, db_session: AsyncSession, completions: int) -> UUID:
+    """Create a behavior, solve today's schedule and log completions on past days."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health = next(o["id"] for o in objectives if o["name"] == "health")
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Walk, outside",
+            "category": "health",
+            "energyCost": 1,
+            "durationMin": 15,
+            "durationMax": 30,
+            "objectiveImpacts": [{"objectiveId": health, "impactScore": 0.5}],
+        },
+    )
+    behavior_id = UUID(created.json()["data"]["id"])
+    await auth_client.post("/api/v1/optimization/solve", json={})
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        CompletionLog(
+            user_id=user.id,
+            behavior_id=behavior_id,
+            actual_duration=20 + i,
+            completed_at=now - timedelta(days=completions - i),
+            context={"source": "test"} if i == 0 else None,
+        )
+        for i in range(completions)
+    )
+    await db_session.commit()
+    return behavior_id
+
+
+@pytest.mark.asyncio
+async def test_export_completions_ndjson(auth_client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test completions stream as NDJSON across several cursor batches, oldest first."""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    behavior_id = await create_history(auth_client, db_session, 5)
+
+    response = await auth_client.get("/api/v1/exports/completions")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["actual_duration"] for r in records] == [20, 21, 22, 23, 24]
+    assert records[0]["behavior_id"] == str(behavior_id)
+    assert records[0]["behavior_name"] == "Walk, outside"
+    assert records[0]["context"] == {"source": "test"}
+
+    since = (datetime.now(timezone.utc) - timedelta(days=2)).date()
+    response = await auth_client.get(f"/api/v1/exports/completions?since={since}")
+    assert len(response.text.splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_export_csv(auth_client: AsyncClient, db_session: AsyncSession):
+    """Test runs, schedules and completions export as CSV with a header row."""
+    await create_history(auth_client, db_session, 3)
+
+    response = await auth_client.get("/api/v1/exports/completions?format=csv")
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["behavior_name"] == "Walk, outside"
+    assert json.loads(rows[0]["context"]) == {"source": "test"}
+    assert rows[1]["satisfaction_score"] == ""
+
+    runs = list(csv.DictReader(io.StringIO((await auth_client.get("/api/v1/exports/runs?format=csv")).text)))
+    assert len(runs) == 1
+    assert runs[0]["status"] == "completed"
+
+    schedules = list(csv.DictReader(io.StringIO(
+        (await auth_client.get("/api/v1/exports/schedules?format=csv")).text
+    )))
+    assert schedules
+    assert {row["optimization_run_id"] for row in schedules} == {runs[0]["id"]}
+    assert schedules[0]["is_scheduled"] in ("true", "false")
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_unknown_format(auth_client: AsyncClient):
+    """Test only NDJSON and CSV are offered."""
+    response = await auth_client.get("/api/v1/exports/runs?format=xml")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_running_export_does_not_block_analytics(
+    auth_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test exports past the cap get a 429 while analytics keeps answering."""
+    await create_history(auth_client, db_session, 3)
+    monkeypatch.setattr(settings, "EXPORT_MAX_CONCURRENT", 1)
+    finish = asyncio.Event()
+    stream_rows = exports.stream_rows
+
+    async def held_rows(*args):
+        await finish.wait()
+        async for chunk in stream_rows(*args):
+            yield chunk
+
+    monkeypatch.setattr(exports, "stream_rows", held_rows)
+    running = asyncio.create_task(auth_client.get("/api/v1/exports/completions"))
+    while exports.export_slots.running == 0:
+        await asyncio.sleep(0.01)
+
+    assert (await auth_client.get("/api/v1/analytics?period=7d")).status_code == 200
+    assert (await auth_client.get("/api/v1/exports/runs")).status_code == 429
+
+    finish.set()
+    response = await running
+    assert len(response.text.splitlines()) == 3
+    assert exports.export_slots.running == 0
+    assert (await auth_client.get("/api/v1/exports/runs")).status_code == 200
+
+
+def test_exports_leave_analytics_connections():
+    """Test the export cap must stay below the analytics pool capacity."""
+    with pytest.raises(ValidationError):
+        Settings(ANALYTICS_DATABASE_POOL_SIZE=2, ANALYTICS_DATABASE_MAX_OVERFLOW=0, EXPORT_MAX_CONCURRENT=2)
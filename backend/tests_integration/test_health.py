@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+
+from app.db.database import get_db
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_liveness(client: AsyncClient):
+    """Test the liveness probe does not depend on anything."""
+    response = await client.get("/api/health/live")
+    assert response.status_code == 200
+    assert response.json()["status"] == "alive"
+
+
+@pytest.mark.asyncio
+async def test_readiness(client: AsyncClient):
+    """Test the readiness probe reports every dependency."""
+    response = await client.get("/api/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert set(data["checks"]) == {"pool", "database", "solver", "cache"}
+    assert data["checks"]["database"]["status"] == "ok"
+    assert data["checks"]["database"]["latencyMs"] is not None
+    assert "max_pending" in data["checks"]["solver"]["metrics"]
+    assert set(data["checks"]["pool"]["metrics"]) == {"oltp", "analytics"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_fails_without_database(client: AsyncClient):
+    """Test an unreachable database makes the worker not ready."""
+    class BrokenSession:
+        async def execute(self, statement):
+            raise ConnectionRefusedError("database is down")
+
+    async def _broken_db():
+        yield BrokenSession()
+
+    app.dependency_overrides[get_db] = _broken_db
+
+    response = await client.get("/api/health/ready")
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "not_ready"
+    assert data["checks"]["database"]["status"] == "fail"
+    assert data["checks"]["database"]["detail"] == "database unavailable"
+
+    response = await client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json()["database"] == "unavailable"
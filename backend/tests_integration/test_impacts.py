@@ -0,0 +1,79 @@
+from datetime import date
+from uuid import uuid4
+
+import numpy as np
+
+from app.models import Behavior
+from app.optimization import (
+    BehaviorScheduleInput,
+    ImpactMatrix,
+    LinearSolver,
+    OptimizationProblem,
+    objective_impacts,
+)
+
+
+def make_behavior(**impacts) -> Behavior:
+    return Behavior(id=uuid4(), **{f"impact_on_{name}": value for name, value in impacts.items()})
+
+
+def test_impact_matrix_scores():
+    """Test weighted scores are one matrix-vector product over the impact columns."""
+    behaviors = [
+        make_behavior(health=0.8, productivity=0.2),
+        make_behavior(learning=0.5, mindfulness=-0.1),
+        make_behavior(),
+    ]
+    matrix = ImpactMatrix.from_behaviors(behaviors)
+
+    assert matrix.values.shape == (3, 8)
+    weights = {"health": 0.5, "learning": 2.0, "mindfulness": 1.0, "unknown": 9.0}
+    expected = [
+        sum((b.get_impact(obj_type) or 0.0) * weight for obj_type, weight in weights.items()) for b in behaviors
+    ]
+    assert np.allclose(matrix.scores(weights), expected)
+    assert matrix.impacts(behaviors[0].id)["health"] == 0.8
+
+    objective_map = {"health": uuid4(), "learning": uuid4()}
+    assert objective_impacts(matrix, behaviors[0].id, objective_map) == [
+        ("health", objective_map["health"], 0.8)
+    ]
+    assert objective_impacts(matrix, behaviors[2].id, objective_map) == []
+
+
+def test_solver_uses_shared_matrix():
+    """Test solver contributions match impacts times scheduled minutes."""
+    behaviors = [make_behavior(health=1.0, learning=0.5), make_behavior(productivity=0.75)]
+    matrix = ImpactMatrix.from_behaviors(behaviors)
+    inputs = [
+        BehaviorScheduleInput(
+            id=b.id,
+            name=f"Behavior {i}",
+            min_duration=10,
+            typical_duration=20,
+            max_duration=30,
+            energy_cost=1.0,
+            impacts=matrix.impacts(b.id),
+        )
+        for i, b in enumerate(behaviors)
+    ]
+    problem = OptimizationProblem(
+        user_id=uuid4(),
+        # Reversed so the matrix rows have to be realigned to the inputs
+        behaviors=inputs[::-1],
+        objectives={"health": 0.5, "productivity": 1.0},
+        constraints=[],
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 1, 1),
+        time_periods=1,
+        impact_matrix=matrix,
+    )
+    assert problem.impacts().behavior_ids == [inputs[1].id, inputs[0].id]
+
+    solution = LinearSolver().solve(problem, uuid4())
+
+    minutes = {item.behavior_id: item.scheduled_duration for item in solution.schedule_items}
+    assert minutes == {behaviors[0].id: 30, behaviors[1].id: 30}
+    assert solution.objective_contributions["health"].contribution == 0.5 * 30
+    assert solution.objective_contributions["productivity"].contribution == 0.75 * 30
+    assert solution.total_objective_value == 0.5 * 30 + 0.75 * 30
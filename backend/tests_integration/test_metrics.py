@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def sample_value(text: str, name: str, **labels) -> float:
+    """Get one sample value from a Prometheus text exposition."""
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items()):
+                return sample.value
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(auth_client: AsyncClient):
+    """Test request, query and cache metrics are exposed per route template."""
+    before = (await auth_client.get("/metrics")).text
+
+    await auth_client.get("/api/v1/behaviors/objectives")
+    await auth_client.get("/api/v1/behaviors/objectives")
+
+    response = await auth_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+
+    route = "/api/v1/behaviors/objectives"
+    count = "http_request_duration_seconds_count"
+    assert sample_value(after, count, route=route, method="GET", status="200") - \
+        sample_value(before, count, route=route, method="GET", status="200") == 2
+    assert sample_value(after, "db_queries_per_request_count", route=route) - \
+        sample_value(before, "db_queries_per_request_count", route=route) == 2
+    assert sample_value(after, "db_queries_total", pool="oltp") > sample_value(before, "db_queries_total", pool="oltp")
+    # Second call is served from cache
+    assert sample_value(after, "cache_requests_total", result="hit") > sample_value(before, "cache_requests_total", result="hit")
+
+
+@pytest.mark.asyncio
+async def test_metrics_use_route_templates(auth_client: AsyncClient):
+    """Test path parameters do not create new label values."""
+    await auth_client.get("/api/v1/behaviors/00000000-0000-0000-0000-000000000000")
+    text = (await auth_client.get("/metrics")).text
+    assert 'route="/api/v1/behaviors/{behavior_id}"' in text
+    assert "00000000-0000-0000-0000-000000000000" not in text
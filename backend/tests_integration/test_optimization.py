@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from httpx import AsyncClient
 
@@ -42,3 +44,113 @@ async def test_get_optimization_history(auth_client: AsyncClient):
     assert data["success"] is True
     assert "data" in data["data"]
     assert "total" in data["data"]
+
+@pytest.mark.asyncio
+async def test_solve_response_matches_stored_run(auth_client: AsyncClient):
+    """Test the in-memory solve response matches the persisted run."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    learning_id = next(obj["id"] for obj in objectives if obj["name"] == "learning")
+    for name in ("Read", "Practice Piano"):
+        await auth_client.post(
+            "/api/v1/behaviors",
+            json={
+                "name": name,
+                "category": "learning",
+                "durationMin": 15,
+                "durationMax": 45,
+                "energyCost": 2,
+                "objectiveImpacts": [{"objectiveId": learning_id, "impactScore": 0.6}],
+            }
+        )
+
+    solve_resp = await auth_client.post("/api/v1/optimization/solve", json={"targetDate": "2026-02-03"})
+    assert solve_resp.status_code == 200
+    solved = solve_resp.json()["data"]
+    assert len(solved["run"]["scheduledBehaviors"]) == 2
+
+    detail_resp = await auth_client.get(f"/api/v1/optimization/history/{solved['run']['id']}")
+    assert detail_resp.status_code == 200
+    stored = detail_resp.json()["data"]
+    assert [s["id"] for s in stored["run"]["scheduledBehaviors"]] == [s["id"] for s in solved["run"]["scheduledBehaviors"]]
+    assert stored["schedule"]["totalDuration"] == solved["schedule"]["totalDuration"]
+
+def parse_sse(body: str):
+    """Parse a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+@pytest.mark.asyncio
+async def test_solve_stream(auth_client: AsyncClient):
+    """Test streaming optimization status, progress and result."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health_id = next(obj["id"] for obj in objectives if obj["name"] == "health")
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Swim",
+            "category": "health",
+            "durationMin": 20,
+            "durationMax": 60,
+            "energyCost": 4,
+            "objectiveImpacts": [{"objectiveId": health_id, "impactScore": 0.9}],
+        }
+    )
+
+    response = await auth_client.post("/api/v1/optimization/solve/stream", json={"targetDate": "2026-02-03"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    statuses = [data["status"] for name, data in events if name == "status"]
+    assert statuses == ["queued", "running", "saving", "completed"]
+
+    result = next(data for name, data in events if name == "result")["data"]
+    run_id = events[0][1]["runId"]
+    assert result["run"]["id"] == run_id
+
+    progress = [data for name, data in events if name == "progress"]
+    assert progress and progress[-1]["objective"] == pytest.approx(result["run"]["totalScore"])
+    assert progress[-1]["gap"] == pytest.approx(0.0)
+
+    detail = await auth_client.get(f"/api/v1/optimization/history/{run_id}")
+    assert detail.status_code == 200
+
+@pytest.mark.asyncio
+async def test_solve_stream_rolls_back_failed_save(auth_client: AsyncClient, db_session, monkeypatch):
+    """Test a save that fails part way is rolled back and reported as an error event."""
+    from sqlalchemy import func, select
+    from app.api.v1 import optimization
+    from app.models import OptimizationRun, SolverType
+
+    async def failing_save(db, current_user, problem, *args):
+        db.add(OptimizationRun(
+            user_id=current_user.id,
+            solver=SolverType.LINEAR,
+            start_date=problem.start_date,
+            end_date=problem.end_date,
+            time_periods=problem.time_periods,
+        ))
+        await db.flush()
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(optimization, "save_optimization_result", failing_save)
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={"name": "Read", "category": "learning", "durationMin": 20, "durationMax": 40, "energyCost": 2},
+    )
+
+    response = await auth_client.post("/api/v1/optimization/solve/stream", json={"targetDate": "2026-02-03"})
+    events = parse_sse(response.text)
+    assert [data["status"] for name, data in events if name == "status"][-1] == "failed"
+    assert next(data for name, data in events if name == "error")["detail"] == "Optimization failed: disk full"
+    assert (await db_session.execute(select(func.count(OptimizationRun.id)))).scalar() == 0
+
+@pytest.mark.asyncio
+async def test_solve_stream_requires_behaviors(auth_client: AsyncClient):
+    """Test validation errors are returned before the stream starts."""
+    response = await auth_client.post("/api/v1/optimization/solve/stream", json={"targetDate": "2026-02-03"})
+    assert response.status_code == 422
@@ -0,0 +1,120 @@
+import gzip
+import json
+import os
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import _create_partition, add_months, archive_completion_logs, month_bounds, partition_name
+from app.models import CompletionLog, CompletionRollup, User
+
+
+def test_month_helpers():
+    """Test month arithmetic and partition naming."""
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert month_bounds(date(2025, 12, 1)) == (
+        datetime(2025, 12, 1, tzinfo=timezone.utc),
+        datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    assert partition_name(date(2025, 3, 1)) == "completion_logs_y2025m03"
+
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session, recording the SQL it runs (up to any WHERE)."""
+
+    def __init__(self, stray_rows: int):
+        self.rowcount = stray_rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement).split(" WHERE ")[0])
+        return self
+
+    def first(self):
+        return (1,) if self.rowcount else None
+
+
+@pytest.mark.asyncio
+async def test_create_partition_moves_default_rows():
+    """Test rows already in the default partition are moved into a new month's partition."""
+    create = (
+        "CREATE TABLE completion_logs_y2026m05 PARTITION OF completion_logs "
+        "FOR VALUES FROM ('2026-05-01T00:00:00+00:00') TO ('2026-06-01T00:00:00+00:00')"
+    )
+    db = RecordingSession(stray_rows=0)
+    assert await _create_partition(db, date(2026, 5, 1), has_default=True) == 0
+    assert db.statements[1:] == [create]
+
+    db = RecordingSession(stray_rows=3)
+    assert await _create_partition(db, date(2026, 5, 1), has_default=True) == 3
+    assert db.statements[1:] == [
+        "ALTER TABLE completion_logs DETACH PARTITION completion_logs_default",
+        create,
+        "WITH moved AS (DELETE FROM completion_logs_default",
+        "ALTER TABLE completion_logs ATTACH PARTITION completion_logs_default DEFAULT",
+    ]
+
+
+async def behavior_statistics(auth_client: AsyncClient) -> dict:
+    response = await auth_client.get("/api/v1/behaviors")
+    assert response.status_code == 200
+    return response.json()["data"]["data"][0]["statistics"]
+
+
+@pytest.mark.asyncio
+async def test_archive_keeps_statistics(auth_client: AsyncClient, db_session: AsyncSession, tmp_path):
+    """Test archived months move to gzip files while behavior statistics stay intact."""
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={"name": "Journal", "category": "wellness", "energyCost": 1, "durationMin": 10, "durationMax": 30},
+    )
+    behavior_id = UUID(created.json()["data"]["id"])
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+
+    completions = [
+        (datetime(2025, 1, 5, 8, tzinfo=timezone.utc), 10, 4),
+        (datetime(2025, 1, 20, 8, tzinfo=timezone.utc), 20, None),
+        (datetime(2025, 3, 2, 8, tzinfo=timezone.utc), 30, 2),
+        (datetime(2026, 6, 1, 8, tzinfo=timezone.utc), 15, 5),
+    ]
+    for completed_at, duration, satisfaction in completions:
+        db_session.add(CompletionLog(
+            user_id=user.id,
+            behavior_id=behavior_id,
+            actual_duration=duration,
+            completed_at=completed_at,
+            satisfaction_score=satisfaction,
+        ))
+    await db_session.commit()
+    before = await behavior_statistics(auth_client)
+
+    archived = await archive_completion_logs(
+        db_session, retention_months=12, directory=str(tmp_path), today=date(2026, 7, 15)
+    )
+
+    assert [(m.month, m.rows) for m in archived] == [(date(2025, 1, 1), 2), (date(2025, 3, 1), 1)]
+    assert not any(m.dropped_partition for m in archived)
+    with gzip.open(archived[0].path, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["actual_duration"] for r in records] == [10, 20]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".partial")]
+
+    remaining = await db_session.execute(select(func.count(CompletionLog.id)))
+    assert remaining.scalar() == 1
+    rollups = (await db_session.execute(
+        select(CompletionRollup).order_by(CompletionRollup.month)
+    )).scalars().all()
+    assert [(r.month, r.completions, r.total_duration, r.satisfaction_count) for r in rollups] == [
+        (date(2025, 1, 1), 2, 30, 1),
+        (date(2025, 3, 1), 1, 30, 1),
+    ]
+
+    assert await behavior_statistics(auth_client) == before
+    assert before["totalCompletions"] == 4
+    assert before["totalDuration"] == 75
+    assert before["avgSatisfaction"] == pytest.approx(11 / 3)
@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.api.profiling import ProfilingMiddleware
+from app.core import settings
+from app.core.profiling import profile_store
+from app.main import app
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """Enable header-triggered profiling into a temporary store."""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "profile-me")
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["authuser@example.com"])
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_profile_solve_request(auth_client: AsyncClient, profiling):
+    """Test a header-triggered profile covers the solver and is retrievable by admins."""
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={"name": "Work", "category": "productivity", "durationMin": 60, "durationMax": 240, "energyCost": 5},
+    )
+
+    transport = ASGITransport(app=ProfilingMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test", headers=auth_client.headers) as client:
+        response = await client.post(
+            "/api/v1/optimization/solve",
+            json={"targetDate": "2026-02-03"},
+            headers={"X-Profile": "profile-me"},
+        )
+        assert response.status_code == 200
+        # Without the token nothing is captured
+        await client.get("/api/v1/behaviors")
+        await client.get("/api/v1/behaviors", headers={"X-Profile": "wrong"})
+
+    listed = (await auth_client.get("/api/admin/profiles")).json()["data"]
+    assert len(listed) == 1
+    summary = listed[0]
+    assert summary["trigger"] == "header"
+    assert summary["route"] == "/api/v1/optimization/solve"
+    assert summary["status"] == 200
+    assert summary["dbQueries"] > 0
+    assert summary["topQueries"]
+    assert summary["spansMs"]["solver"] > 0
+
+    detail = await auth_client.get(f"/api/admin/profiles/{summary['id']}", params={"limit": 1000})
+    assert detail.status_code == 200
+    report = detail.json()["data"]["report"]
+    assert "(solve)" in report
+    assert "serialize_response" in report
+
+    raw = await auth_client.get(f"/api/admin/profiles/{summary['id']}/raw")
+    assert raw.status_code == 200
+    assert raw.content
+
+    assert (await auth_client.get("/api/admin/profiles/missing")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profiles_require_admin(auth_client: AsyncClient, profiling, monkeypatch):
+    """Test non-admin users cannot read profiles."""
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", [])
+    response = await auth_client.get("/api/admin/profiles")
+    assert response.status_code == 403
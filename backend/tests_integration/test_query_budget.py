@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.api.query_budget import QueryBudgetMiddleware
+from app.db.instrumentation import assert_max_queries, fingerprint
+from app.main import app
+
+
+def test_fingerprint_normalizes_values():
+    """Statements differing only in values share a fingerprint."""
+    first = fingerprint("SELECT * FROM behaviors WHERE id = 'a1' AND score > 3 AND kind IN (?, ?)")
+    second = fingerprint("SELECT *  FROM behaviors\nWHERE id = 'b''2' AND score > 10 AND kind IN (?, ?, ?, ?)")
+    assert first == second == "SELECT * FROM behaviors WHERE id = ? AND score > ? AND kind IN (...)"
+    assert fingerprint("SELECT x::text FROM t WHERE y = :y_1") == "SELECT x::text FROM t WHERE y = ?"
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries_reports_fingerprints(auth_client: AsyncClient):
+    """Test the helper fails with the offending statements listed."""
+    with pytest.raises(AssertionError, match=r"Expected at most 0 queries.*\n.*SELECT"):
+        with assert_max_queries(0):
+            await auth_client.get("/api/v1/behaviors/objectives")
+
+
+@pytest.mark.asyncio
+async def test_over_budget_request_is_logged(auth_client: AsyncClient, caplog):
+    """Test requests above the query budget are logged with their SQL."""
+    budgeted = QueryBudgetMiddleware(app, max_queries=1, max_db_ms=0)
+    transport = ASGITransport(app=budgeted)
+    async with AsyncClient(transport=transport, base_url="http://test", headers=auth_client.headers) as client:
+        with caplog.at_level(logging.WARNING, logger="app.api.query_budget"):
+            response = await client.get("/api/v1/behaviors")
+
+    assert response.status_code == 200
+    messages = [r.getMessage() for r in caplog.records if r.name == "app.api.query_budget"]
+    assert len(messages) == 1
+    assert "Query budget exceeded: GET /api/v1/behaviors ran" in messages[0]
+    assert "FROM behaviors" in messages[0]
@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient
+
+from app.api.rate_limit import InMemoryRateLimitBackend, RateLimitRule, rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_anonymous_requests_limited_per_ip(client: AsyncClient, monkeypatch):
+    """Test anonymous callers share a per-IP bucket."""
+    monkeypatch.setattr(rate_limiter, "default_rule", RateLimitRule("default", 2))
+
+    for _ in range(2):
+        response = await client.get("/api/v1/behaviors/objectives")
+        assert response.status_code != 429
+        assert "x-ratelimit-remaining" in response.headers
+
+    response = await client.get("/api/v1/behaviors/objectives")
+    assert response.status_code == 429
+    assert response.json()["error"] == "RateLimitExceededError"
+    assert int(response.headers["retry-after"]) >= 1
+
+    # Health probes are never limited
+    response = await client.get("/api/health")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_solve_has_stricter_per_user_budget(auth_client: AsyncClient, monkeypatch):
+    """Test the solve route uses its own per-user bucket."""
+    monkeypatch.setitem(rate_limiter.route_rules, "/api/v1/optimization/solve", RateLimitRule("solve", 1))
+
+    response = await auth_client.post("/api/v1/optimization/solve", json={})
+    assert response.status_code != 429
+    response = await auth_client.post("/api/v1/optimization/solve", json={})
+    assert response.status_code == 429
+
+    # Other routes still have budget
+    response = await auth_client.get("/api/v1/behaviors")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_denied_request_refunds_route_budget(auth_client: AsyncClient, monkeypatch):
+    """Test a solve denied by the default bucket does not spend the solve budget."""
+    monkeypatch.setitem(rate_limiter.route_rules, "/api/v1/optimization/solve", RateLimitRule("solve", 1))
+    monkeypatch.setattr(rate_limiter, "default_rule", RateLimitRule("default", 1))
+
+    # Spends the only default token
+    await auth_client.get("/api/v1/behaviors")
+    response = await auth_client.post("/api/v1/optimization/solve", json={})
+    assert response.status_code == 429
+
+    monkeypatch.setattr(rate_limiter, "default_rule", RateLimitRule("default-refilled", 5))
+    response = await auth_client.post("/api/v1/optimization/solve", json={})
+    assert response.status_code != 429
+
+
+def test_rate_limits_must_be_positive():
+    """Test a zero budget is rejected instead of dividing by zero on refill."""
+    from pydantic import ValidationError
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(RATE_LIMIT_SOLVE_REQUESTS_PER_MINUTE=0)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_evicts_idle_keys():
+    """Test idle and overflow buckets are evicted."""
+    backend = InMemoryRateLimitBackend(max_keys=2, idle_seconds=60)
+    for key in ("a", "b", "c"):
+        await backend.consume(key, rate=1.0, capacity=5.0)
+    assert len(backend) == 2
+
+    backend.idle_seconds = 0
+    await backend.consume("d", rate=1.0, capacity=5.0)
+    assert len(backend) == 0
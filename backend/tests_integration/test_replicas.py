@@ -0,0 +1,94 @@
+import asyncio
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.core import cache
+from app.db import database
+from app.db.database import Base, ReplicaRouter
+from app.models import OptimizationRun, User
+from app.models.optimization import OptimizationStatus, SolverType
+
+
+@pytest_asyncio.fixture
+async def replica(monkeypatch):
+    """Route reads to a second in-memory SQLite database standing in for a replica."""
+    replica_engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    replica_maker = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    router = ReplicaRouter([replica_maker], stickiness_seconds=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(deps, "replica_router", router)
+    yield router, replica_maker
+    await replica_engine.dispose()
+
+
+async def history_total(auth_client: AsyncClient) -> int:
+    response = await auth_client.get("/api/v1/optimization/history")
+    assert response.status_code == 200
+    return response.json()["data"]["total"]
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_until_user_writes(
+    auth_client: AsyncClient, db_session: AsyncSession, replica, monkeypatch
+):
+    """Test history reads hit the replica, except right after the user writes."""
+    router, replica_maker = replica
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+
+    # Only the replica has this run, so totals show which database answered.
+    # (Inserted with Core so seeding does not count as a write by the user.)
+    async with replica_maker() as session:
+        await session.execute(insert(OptimizationRun.__table__).values(
+            user_id=user.id,
+            status=OptimizationStatus.COMPLETED,
+            solver=SolverType.LINEAR,
+            start_date=date(2026, 2, 3),
+            end_date=date(2026, 2, 3),
+            time_periods=1,
+        ))
+        await session.commit()
+
+    assert await history_total(auth_client) == 1
+    assert router.replica_reads == 1
+
+    # A write pins the user to the primary (read-your-writes); a slow shared
+    # cache shows the marker is written before the response goes out
+    cache_set = cache.backend.set
+
+    async def slow_set(key, *args, **kwargs):
+        if key == router._key(user.id):
+            await asyncio.sleep(0.2)
+        await cache_set(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache.backend, "set", slow_set)
+    response = await auth_client.post(
+        "/api/v1/behaviors",
+        json={"name": "Read", "category": "learning", "energyCost": 1, "durationMin": 10, "durationMax": 30},
+    )
+    assert response.status_code == 201
+    marker, = await cache.backend.get_many([router._key(user.id)])
+    assert marker is not None
+    assert await history_total(auth_client) == 0
+    assert router.primary_reads == 1
+
+    # Other workers see the marker through the cache
+    router.reset()
+    assert await router.is_sticky(user.id)
+
+    # Once the window has passed, reads go back to the replica
+    cache.backend.clear()
+    assert await history_total(auth_client) == 1
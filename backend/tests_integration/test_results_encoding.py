@@ -0,0 +1,66 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.optimization import (
+    ObjectiveContribution,
+    OptimizationSolution,
+    ScheduleItem,
+    decode_results,
+    encode_results,
+)
+
+
+def make_solution(items: int) -> OptimizationSolution:
+    behaviors = [(uuid4(), f"Behavior {i}") for i in range(10)]
+    return OptimizationSolution(
+        optimization_run_id=uuid4(),
+        status="optimal",
+        solver="linear",
+        total_objective_value=12.5,
+        schedule_items=[
+            ScheduleItem(
+                behavior_id=behaviors[i % 10][0],
+                behavior_name=behaviors[i % 10][1],
+                time_period=i * 4,
+                scheduled_duration=15 + i % 4 * 15,
+                is_scheduled=i % 7 != 0,
+            )
+            for i in range(items)
+        ],
+        objective_contributions={"health": ObjectiveContribution("health", 3.0, 0.5)},
+        execution_time_seconds=0.2,
+        diagnostics={"solver_status": "Optimal"},
+    )
+
+
+@pytest.mark.parametrize("items", [0, 3, 200])
+def test_results_keep_header_only(items: int):
+    """Test stored results keep the header and contributions but not the schedule."""
+    solution = make_solution(items)
+    # Stored results go through JSON like the database column
+    stored = json.loads(json.dumps(encode_results(solution)))
+
+    results = decode_results(stored)
+    assert results.format == 2
+    assert results.status == "optimal"
+    assert results["scheduled_behavior_count"] == solution.scheduled_behavior_count
+    assert results.objective_contributions == {"health": {"contribution": 3.0, "weight": 0.5}}
+    assert set(stored) & {"schedule", "schedule_items", "diagnostics"} == set()
+
+
+def test_results_smaller_than_dict_format():
+    """Test the stored format is a fraction of the original layout."""
+    solution = make_solution(500)
+    assert len(json.dumps(encode_results(solution))) * 20 < len(json.dumps(solution.to_dict()))
+
+
+def test_legacy_results_read_through_same_view():
+    """Test runs stored with to_dict() decode through the same interface."""
+    legacy = make_solution(5).to_dict()
+    results = decode_results(legacy)
+    assert results.format == 1
+    assert results.get("status") == "optimal"
+    assert results.objective_contributions == {"health": {"contribution": 3.0, "weight": 0.5}}
+    assert decode_results(None) is None
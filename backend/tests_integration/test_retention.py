@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.retention import apply_run_retention
+from app.models import CompletionLog, OptimizationRun, ScheduledBehavior, User
+from app.models.optimization import OptimizationStatus, SolverType
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def results_for(behavior_id: UUID) -> dict:
+    return {
+        "status": "optimal",
+        "schedule_items": [{"behavior_id": str(behavior_id), "time_period": 32, "scheduled_duration": 30}],
+        "objective_contributions": {"wellness": {"contribution": 1.5, "weight": 0.5}},
+        "diagnostics": {"solver_status": "Optimal"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_retention(auth_client: AsyncClient, db_session: AsyncSession):
+    """Test superseded runs are deleted and kept runs compacted."""
+    created = await auth_client.post(
+        "/api/v1/behaviors",
+        json={"name": "Read", "category": "learning", "energyCost": 1, "durationMin": 10, "durationMax": 30},
+    )
+    behavior_id = UUID(created.json()["data"]["id"])
+    user = (await db_session.execute(select(User).where(User.email == "authuser@example.com"))).scalar_one()
+
+    def add_run(day: date, created_at: datetime) -> OptimizationRun:
+        run = OptimizationRun(
+            user_id=user.id,
+            status=OptimizationStatus.COMPLETED,
+            solver=SolverType.LINEAR,
+            start_date=day,
+            end_date=day,
+            time_periods=96,
+            results=results_for(behavior_id),
+            diagnostics={"solver_status": "Optimal"},
+            created_at=created_at,
+        )
+        db_session.add(run)
+        return run
+
+    old = NOW - timedelta(days=30)
+    superseded = add_run(date(2026, 1, 30), old)
+    latest = add_run(date(2026, 1, 30), old + timedelta(hours=1))
+    referenced = add_run(date(2026, 1, 31), old)
+    latest_next_day = add_run(date(2026, 1, 31), old + timedelta(hours=1))
+    recent_superseded = add_run(date(2026, 2, 28), NOW - timedelta(days=1))
+    add_run(date(2026, 2, 28), NOW - timedelta(hours=1))
+    await db_session.flush()
+
+    db_session.add(ScheduledBehavior(
+        optimization_run_id=superseded.id, behavior_id=behavior_id, time_period=32, scheduled_duration=30
+    ))
+    db_session.add(CompletionLog(
+        user_id=user.id,
+        behavior_id=behavior_id,
+        optimization_run_id=referenced.id,
+        actual_duration=30,
+        completed_at=old,
+    ))
+    await db_session.commit()
+    run_ids = {
+        "superseded": superseded.id,
+        "latest": latest.id,
+        "referenced": referenced.id,
+        "latest_next_day": latest_next_day.id,
+        "recent_superseded": recent_superseded.id,
+    }
+
+    report = await apply_run_retention(db_session, retention_days=14, batch_size=2, now=NOW)
+
+    assert report.runs_deleted == 1
+    assert report.scheduled_behaviors_deleted == 1
+    assert report.runs_compacted == 3
+    assert report.bytes_reclaimed > 0
+
+    db_session.expire_all()
+    remaining = {
+        run.id: run for run in (await db_session.execute(select(OptimizationRun))).scalars().all()
+    }
+    assert run_ids["superseded"] not in remaining
+    assert len(remaining) == 5
+    for name in ("latest", "referenced", "latest_next_day"):
+        run = remaining[run_ids[name]]
+        assert run.diagnostics is None
+        assert run.results == {
+            "status": "optimal",
+            "objective_contributions": {"wellness": {"contribution": 1.5, "weight": 0.5}},
+        }
+    assert "schedule_items" in remaining[run_ids["recent_superseded"]].results
+    orphans = await db_session.execute(select(func.count(ScheduledBehavior.id)))
+    assert orphans.scalar() == 0
+
+    # A second pass has nothing left to do
+    again = await apply_run_retention(db_session, retention_days=14, batch_size=2, now=NOW)
+    assert (again.runs_deleted, again.runs_compacted) == (0, 0)
@@ -26,3 +26,62 @@ async def test_mark_behavior_completion(auth_client: AsyncClient, db_session):
     
     response = await auth_client.post(f"/api/v1/schedule/{invalid_id}/incomplete")
     assert response.status_code == 404
+
+async def create_scheduled_behavior(auth_client: AsyncClient) -> tuple:
+    """Helper to solve an optimization and return (date, scheduled behavior id)."""
+    objectives = (await auth_client.get("/api/v1/behaviors/objectives")).json()["data"]
+    health_id = next(obj["id"] for obj in objectives if obj["name"] == "health")
+    await auth_client.post(
+        "/api/v1/behaviors",
+        json={
+            "name": "Stretching",
+            "category": "health",
+            "energyCost": 1,
+            "durationMin": 15,
+            "durationMax": 30,
+            "objectiveImpacts": [{"objectiveId": health_id, "impactScore": 0.5}],
+        }
+    )
+    today = date.today().isoformat()
+    solve_resp = await auth_client.post("/api/v1/optimization/solve", json={"targetDate": today})
+    assert solve_resp.status_code == 200
+    schedule = (await auth_client.get(f"/api/v1/schedule?date={today}")).json()["data"]
+    assert schedule["scheduledBehaviors"]
+    return today, schedule["scheduledBehaviors"][0]["id"]
+
+@pytest.mark.asyncio
+async def test_sync_completions(auth_client: AsyncClient):
+    """Test bulk completion sync."""
+    today, scheduled_id = await create_scheduled_behavior(auth_client)
+    missing_id = "00000000-0000-0000-0000-000000000000"
+
+    response = await auth_client.post(
+        "/api/v1/schedule/completions",
+        json={"items": [
+            {"scheduledBehaviorId": scheduled_id, "isCompleted": True},
+            {"scheduledBehaviorId": missing_id, "isCompleted": True},
+        ]}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["completed"] == 1
+    assert data["notFound"] == 1
+
+    schedule = (await auth_client.get(f"/api/v1/schedule?date={today}")).json()["data"]
+    assert schedule["scheduledBehaviors"][0]["isCompleted"] is True
+
+    # Re-sending is idempotent, and incomplete removes the log
+    response = await auth_client.post(
+        "/api/v1/schedule/completions",
+        json={"items": [{"scheduledBehaviorId": scheduled_id, "isCompleted": True}]}
+    )
+    assert response.json()["data"]["unchanged"] == 1
+
+    response = await auth_client.post(
+        "/api/v1/schedule/completions",
+        json={"items": [{"scheduledBehaviorId": scheduled_id, "isCompleted": False}]}
+    )
+    assert response.json()["data"]["uncompleted"] == 1
+
+    schedule = (await auth_client.get(f"/api/v1/schedule?date={today}")).json()["data"]
+    assert schedule["scheduledBehaviors"][0]["isCompleted"] is False
@@ -54,6 +54,7 @@ export interface DashboardSummary {
 
 export interface AnalyticsData {
   period: string;
+  bucket?: "day" | "week" | "month";
   behaviorCompletions: Array<{
     date: string;
     completed: number;
@@ -74,4 +75,5 @@ export interface AnalyticsData {
     energySpent: number;
     energyBudget: number;
   }>;
+  adherence?: number | null;
 }